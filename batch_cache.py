@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""변환 결과 캐시 (문장 묶음 내용 해시 → 변환된 PostgreSQL 텍스트)
+
+매일 내보내는 덤프는 대부분의 GO 배치(템플릿 목록 등)가 바이트 단위로 같다.
+묶음 원문을 blake2b 로 해시해 키로 쓰고, 변환 결과(convert_chunk 반환값)를
+디렉터리에 파일 하나씩 pickle 로 저장해 두었다가 다음 실행에서 재사용한다.
+
+- 키에는 출력 형식 서명(형식 이름, upsert, 이미지 경로 등)도 섞으므로
+  옵션을 바꾸면 자동으로 다른 키가 된다.
+- --spill-images 로 빼낸 이미지 파일은 캐시 적중 시 다시 쓰지 않는다
+  (이미지 디렉터리가 그대로 있다고 가정).
+- 전체 크기 상한을 넘으면 put() 에서 바로 가장 오래 쓰지 않은 항목부터
+  지운다 (처음 순서는 파일 mtime).
+"""
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+# 변환 코드가 바뀌어 예전 결과를 쓰면 안 될 때 올림
+CACHE_VERSION = 1
+CACHE_SIZE = 1 << 30
+
+
+class BatchCache:
+    """디렉터리 기반 LRU 캐시"""
+
+    def __init__(self, directory, max_bytes=CACHE_SIZE, signature=()):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.salt = repr((CACHE_VERSION,) + tuple(signature)).encode('utf-8')
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # 키 → 크기, 오래 쓰지 않은 것부터 순서대로
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith('.pkl'):
+                st = os.stat(os.path.join(directory, name))
+                found.append((st.st_mtime, name[:-4], st.st_size))
+        self._entries = OrderedDict((key, size) for _, key, size in sorted(found))
+        self._total = sum(self._entries.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def key(self, statements):
+        """문장 묶음의 캐시 키 (형식 서명 + 원문 해시)"""
+        h = hashlib.blake2b(self.salt, digest_size=20)
+        for stmt in statements:
+            h.update(stmt.encode('utf-8', 'surrogatepass'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def get(self, key):
+        """캐시된 결과 (없으면 None). 읽은 항목은 최근 사용으로 표시"""
+        if key in self._entries:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                # 깨진 항목은 미스로 보고 지움
+                self._remove(key)
+            else:
+                os.utime(path)
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """결과를 저장하고, 크기 상한을 넘으면 바로 오래된 항목을 지움"""
+        path = self._path(key)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        size = os.stat(path).st_size
+        self._total += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def _remove(self, key):
+        self._total -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self):
+        return self._total
+
+    def evict(self):
+        """크기 상한을 넘으면 오래 쓰지 않은 항목부터 지움"""
+        while self._entries and self._total > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return (f"적중 {self.hits} / 미스 {self.misses} ({rate:.1f}%), "
+                f"제거 {self.evictions}, {self.size() / (1 << 20):.1f}MB")
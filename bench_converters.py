@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""변환 스크립트 전체 벤치마크 (처리량, 최대 메모리, 출력 행 수 → JSON 기준선)
+
+각 변환 진입점을 별도 프로세스로 실행해 벽시계 시간, 최대 RSS(os.wait4),
+출력 파일의 행 수(verify_migration.iter_output_rows 로 셈)를 잰다. 입력 경로가
+고정된 스크립트(convert_sql.py)도 돌릴 수 있도록 임시 작업 디렉터리에
+attached_assets/script1_...sql 을 벤치마크 덤프로 연결하고 그 안에서 실행한다.
+
+사용법:
+  python bench_converters.py --reports 20000 -o bench_baseline.json
+  python bench_converters.py --dump /tmp/tbm_big.sql --compare bench_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from generate_test_dump import generate
+from prisma_mapping import load_text_binaries
+from tbm_schema import DumpSchema
+from verify_migration import build_canons, iter_output_rows
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DUMP = 'attached_assets/script1_1760403229620.sql'
+PRISMA_SCHEMA = 'FoodieMatch/prisma/schema.prisma'
+
+# (이름, 스크립트와 인자) — {dump}/{out} 은 실행할 때 채움
+ENTRY_POINTS = [
+    ('final_sql_convert insert', ['final_sql_convert.py', '{dump}', '-o', '{out}']),
+    ('final_sql_convert insert-batch', ['final_sql_convert.py', '{dump}', '-o', '{out}', '--format', 'insert-batch']),
+    ('final_sql_convert copy', ['final_sql_convert.py', '{dump}', '-o', '{out}', '--format', 'copy']),
+    ('final_sql_convert copy --mmap', ['final_sql_convert.py', '{dump}', '-o', '{out}', '--format', 'copy', '--mmap']),
+    ('final_sql_convert copy --queue-depth 0', ['final_sql_convert.py', '{dump}', '-o', '{out}', '--format', 'copy', '--queue-depth', '0']),
+    ('final_sql_convert copy -j 0', ['final_sql_convert.py', '{dump}', '-o', '{out}', '--format', 'copy', '-j', '0']),
+    ('convert_sql', ['convert_sql.py']),
+    ('convert_and_insert_data', ['convert_and_insert_data.py', '{dump}', '-o', '{out}']),
+    ('convert_multiline_sql', ['convert_multiline_sql.py', '{dump}', '-o', '{out}']),
+    ('parse_sql_properly', ['parse_sql_properly.py', '{dump}', '-o', '{out}']),
+]
+
+# 출력 경로를 받지 않는 스크립트의 고정 출력 (작업 디렉터리 기준)
+FIXED_OUTPUTS = {'convert_sql.py': 'FoodieMatch/initial_data.sql'}
+
+# 기준선 대비 이만큼 나빠지면 회귀로 표시
+SLOWER = 1.10
+MORE_MEMORY = 1.20
+
+
+def make_workdir(dump):
+    """고정 경로를 쓰는 스크립트용 임시 작업 디렉터리"""
+    workdir = tempfile.mkdtemp(prefix='tbm_bench_')
+    os.makedirs(os.path.join(workdir, 'attached_assets'))
+    os.makedirs(os.path.join(workdir, 'FoodieMatch', 'prisma'))
+    os.symlink(os.path.abspath(dump), os.path.join(workdir, SAMPLE_DUMP))
+    shutil.copy(os.path.join(REPO_DIR, PRISMA_SCHEMA), os.path.join(workdir, PRISMA_SCHEMA))
+    return workdir
+
+
+def run_once(argv, workdir):
+    """프로세스 하나를 실행해 (초, 최대 RSS 바이트, 종료 코드, 표준 출력)"""
+    with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(argv, cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - started
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        log.seek(0)
+        output = log.read()
+    # Linux 는 KB, macOS 는 바이트 단위
+    rss = usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+    return elapsed, rss, proc.returncode, output
+
+
+def count_rows(path, canons):
+    """변환 결과 파일의 데이터 행 수 (INSERT / insert-batch / COPY 모두)"""
+    return sum(1 for _ in iter_output_rows(path, canons))
+
+
+def bench(dump, repeat=1, names=None):
+    """진입점마다 repeat 번 실행해 가장 빠른 결과를 기록"""
+    size = os.path.getsize(dump)
+    schema = DumpSchema.scan(dump)
+    canons = build_canons(schema, list(schema.tables),
+                          load_text_binaries(schema, os.path.join(REPO_DIR, PRISMA_SCHEMA)))
+    workdir = make_workdir(dump)
+    results = []
+    try:
+        for name, args in ENTRY_POINTS:
+            if names and name not in names:
+                continue
+            out = os.path.join(workdir, FIXED_OUTPUTS.get(args[0], 'out.sql'))
+            argv = [sys.executable, os.path.join(REPO_DIR, args[0])]
+            argv += [a.format(dump=os.path.abspath(dump), out=out) for a in args[1:]]
+            best = None
+            for _ in range(repeat):
+                if os.path.exists(out):
+                    os.remove(out)
+                run = run_once(argv, workdir)
+                if best is None or run[0] < best[0]:
+                    best = run
+            elapsed, rss, returncode, output = best
+            rows = count_rows(out, canons) if returncode == 0 and os.path.exists(out) else None
+            result = {
+                'name': name,
+                'seconds': round(elapsed, 3),
+                'mb_per_s': round(size / 1e6 / elapsed, 2),
+                'rows': rows,
+                'rows_per_s': round(rows / elapsed) if rows else None,
+                'peak_rss_mb': round(rss / (1 << 20), 1),
+                'returncode': returncode,
+            }
+            results.append(result)
+            status = '✅' if returncode == 0 else '❌'
+            print(f"{status} {name}: {elapsed:.2f}초, {result['mb_per_s']} MB/s, "
+                  f"{rows}행, 최대 {result['peak_rss_mb']} MB")
+            if returncode != 0:
+                print('   ' + output.strip().splitlines()[-1] if output.strip() else '')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline):
+    """기준선과 비교해 회귀 목록 (문자열) 을 돌려줌"""
+    previous = {r['name']: r for r in baseline['results']}
+    problems = []
+    for r in results:
+        old = previous.get(r['name'])
+        if old is None:
+            continue
+        if r['seconds'] > old['seconds'] * SLOWER:
+            problems.append(f"{r['name']}: {old['seconds']}초 → {r['seconds']}초")
+        if r['peak_rss_mb'] > old['peak_rss_mb'] * MORE_MEMORY:
+            problems.append(f"{r['name']}: 메모리 {old['peak_rss_mb']} MB → {r['peak_rss_mb']} MB")
+        if r['rows'] != old['rows']:
+            problems.append(f"{r['name']}: 행 수 {old['rows']} → {r['rows']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='변환 스크립트 벤치마크')
+    parser.add_argument('--dump', help='벤치마크할 덤프 (없으면 generate_test_dump 로 생성)')
+    parser.add_argument('--reports', type=int, default=5000, help='생성할 DailyReports 수')
+    parser.add_argument('--signature-kb', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=1, help='진입점별 반복 횟수 (가장 빠른 값 기록)')
+    parser.add_argument('--only', action='append', help='이 이름의 진입점만 실행 (여러 번 지정 가능)')
+    parser.add_argument('-o', '--output', default='bench_baseline.json', help='결과 JSON')
+    parser.add_argument('--compare', metavar='JSON', help='이전 기준선과 비교')
+    args = parser.parse_args()
+
+    generated = None
+    dump = args.dump
+    if dump is None:
+        fd, generated = tempfile.mkstemp(prefix='tbm_bench_', suffix='.sql')
+        os.close(fd)
+        counts = generate(generated, reports=args.reports, signature_kb=args.signature_kb)
+        dump = generated
+        print(f"📝 덤프 생성: {sum(counts.values())}개 INSERT 문")
+
+    try:
+        size = os.path.getsize(dump)
+        print(f"📊 {dump} ({size / 1e6:.1f} MB)")
+        results = bench(dump, args.repeat, args.only)
+    finally:
+        if generated:
+            os.remove(generated)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'dump': {'path': args.dump or 'generated', 'bytes': size,
+                 'reports': None if args.dump else args.reports},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"✅ 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            problems = compare(results, json.load(f))
+        if problems:
+            print(f"⚠️  기준선 대비 회귀 {len(problems)}건")
+            for problem in problems:
+                print(f"   - {problem}")
+            sys.exit(1)
+        print("✅ 기준선 대비 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
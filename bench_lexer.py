@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""기존 re.sub 체인과 단일 패스 렉서(tsql_lexer) 속도/결과 비교
+
+사용법: python bench_lexer.py [덤프 경로] [반복 횟수]
+"""
+import re
+import sys
+import time
+
+from sql_dump_reader import iter_statements
+from tsql_lexer import convert_statement, statement_table
+
+# parse_sql_properly.py 가 쓰던 중첩 대안 패턴
+NESTED_VALUES = re.compile(
+    r'INSERT\s+\[dbo\]\.\[(\w+)\]\s+\([^\)]+\)\s+VALUES\s+\((?:[^()]|\([^)]*\))*\)',
+    re.DOTALL | re.IGNORECASE)
+
+
+def regex_pipeline(stmt):
+    """final_sql_convert.py / parse_sql_properly.py 의 기존 변환 체인"""
+    match = NESTED_VALUES.match(stmt.strip())
+    if match:
+        stmt = match.group(0)
+    stmt = re.sub(r'\s+', ' ', stmt.strip())
+    stmt = re.sub(r'INSERT \[dbo\]\.\[(\w+)\]', r'INSERT INTO "\1"', stmt)
+    stmt = re.sub(r'\[(\w+)\]', r'"\1"', stmt)
+    stmt = re.sub(r"CAST\(N'([^']+)' AS DateTime2\)", r"'\1'::timestamp", stmt)
+    stmt = re.sub(r"N'", r"'", stmt)
+    if not stmt.endswith(';'):
+        stmt += ';'
+    return stmt
+
+
+def lexer_pipeline(stmt):
+    # 비교를 위해 리터럴 안 공백도 기존처럼 접는다
+    return convert_statement(re.sub(r'\s+', ' ', stmt))
+
+
+def _timeit(func, statements, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for stmt in statements:
+            func(stmt)
+    return time.perf_counter() - start
+
+
+def _tricky_statements():
+    """리터럴 안에 ; ) N' [x] 가 들어간 행과 27KB 서명 행"""
+    return [
+        "INSERT [dbo].[TemplateItems] ([ItemID], [Description]) VALUES (1, N'괄호) 닫힘; 그리고 [대괄호]')",
+        "INSERT [dbo].[TemplateItems] ([ItemID], [Description]) VALUES (2, N'따옴표 N''인용'' 포함')",
+        "INSERT [dbo].[ReportSignatures] ([SignatureID], [SignatureImage]) VALUES (1, 0x"
+        + '89504E47' * 6750 + ")",
+    ]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'attached_assets/script1_1760403229620.sql'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    statements = [s for s in iter_statements(path) if statement_table(s)]
+    total_bytes = sum(len(s.encode('utf-8')) for s in statements)
+    print(f"📊 {len(statements)} 개 INSERT 문, {total_bytes / 1e6:.2f} MB x {repeat}회")
+
+    for name, func in (('regex 체인', regex_pipeline),
+                       ('단일 패스 렉서', lexer_pipeline),
+                       ('렉서 (리터럴 보존)', convert_statement)):
+        elapsed = _timeit(func, statements, repeat)
+        mb_per_s = total_bytes * repeat / elapsed / 1e6
+        print(f"   - {name}: {elapsed:.3f}초 ({mb_per_s:.1f} MB/s)")
+
+    diffs = sum(1 for s in statements if regex_pipeline(s) != lexer_pipeline(s))
+    print(f"   - 결과가 다른 문장: {diffs}개")
+
+    print("\n🔎 리터럴 안 특수문자 처리")
+    for stmt in _tricky_statements():
+        old = regex_pipeline(stmt)
+        new = lexer_pipeline(stmt)
+        status = '같음' if old == new else '다름'
+        print(f"   [{status}] regex: {old[:90]}")
+        print(f"          렉서:  {new[:90]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""gzip / xz / bz2 로 압축된 덤프와 출력 파일을 스트림으로 읽고 쓰기
+
+현장에서 받은 .sql.gz / .sql.xz 를 먼저 풀어 두지 않고 바로 읽고,
+출력 파일 이름이 .gz / .xz / .bz2 로 끝나면 압축해서 쓴다.
+입력은 확장자가 아니라 파일 앞의 매직 바이트로 판별한다.
+
+압축 풀기/압축은 백그라운드 스레드에서 돌리고 크기가 정해진 큐로
+주고받는다 (stream_pipeline 과 같은 방식). zlib/lzma/bz2 는 작업 중에
+GIL 을 놓으므로 변환과 실제로 겹쳐 돈다. 압축되지 않은 파일은 예전처럼
+open() 그대로 연다.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+from stream_pipeline import PIPELINE_DEPTH, pipelined
+
+BLOCK_SIZE = 1 << 20  # 스레드 사이로 넘기는 블록 크기
+
+# 압축 방식 → (매직 바이트, 출력 확장자, 여는 함수)
+COMPRESSIONS = {
+    'gzip': (b'\x1f\x8b', ('.gz',), lambda f, mode: gzip.GzipFile(fileobj=f, mode=mode, compresslevel=6)),
+    'xz': (b'\xfd7zXZ\x00', ('.xz',), lambda f, mode: lzma.LZMAFile(f, mode)),
+    'bz2': (b'BZh', ('.bz2',), lambda f, mode: bz2.BZ2File(f, mode)),
+}
+
+
+def compression_of(path):
+    """파일 앞의 매직 바이트로 본 압축 방식 ('gzip', 'xz', 'bz2', 압축 아니면 None)"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(6)
+    except OSError:
+        return None
+    for name, (magic, _, _) in COMPRESSIONS.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def compression_for(path):
+    """출력 경로의 확장자로 정한 압축 방식 (아니면 None)"""
+    lowered = path.lower()
+    for name, (_, suffixes, _) in COMPRESSIONS.items():
+        if lowered.endswith(suffixes):
+            return name
+    return None
+
+
+class _DecompressedStream(io.RawIOBase):
+    """백그라운드 스레드가 풀어 놓은 블록을 차례로 내주는 읽기 스트림"""
+
+    def __init__(self, path, kind, depth):
+        self._blocks = pipelined(self._read_blocks(path, kind), depth, name=f'{kind}-reader')
+        self._block = b''
+        self._offset = 0
+        self._position = 0
+
+    @staticmethod
+    def _read_blocks(path, kind):
+        with open(path, 'rb') as raw, COMPRESSIONS[kind][2](raw, 'rb') as f:
+            while True:
+                block = f.read(BLOCK_SIZE)
+                if not block:
+                    return
+                yield block, raw.tell()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._offset >= len(self._block):
+            item = next(self._blocks, None)
+            if item is None:
+                return 0
+            self._block, self._position = item
+            self._offset = 0
+        n = min(len(buffer), len(self._block) - self._offset)
+        buffer[:n] = self._block[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+    def source_position(self):
+        """압축 파일에서 지금까지 읽은 바이트 (진행률용)"""
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._blocks.close()
+        super().close()
+
+
+class _CompressingStream(io.RawIOBase):
+    """쓴 바이트를 큐로 넘기고 백그라운드 스레드에서 압축해 파일에 쓰는 스트림
+
+    스레드에서 난 예외는 다음 write() 나 close() 에서 다시 발생한다.
+    """
+
+    def __init__(self, path, kind, depth):
+        self._items = queue.Queue(maxsize=depth)
+        self._error = None
+        self._file = open(path, 'wb')
+        self._thread = threading.Thread(target=self._run, args=(kind,), name=f'{kind}-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self, kind):
+        try:
+            with COMPRESSIONS[kind][2](self._file, 'wb') as f:
+                while True:
+                    data = self._items.get()
+                    if data is None:
+                        return
+                    f.write(data)
+        except BaseException as exc:
+            self._error = exc
+            # 쓰는 쪽이 큐에서 막히지 않도록 남은 블록을 버림
+            while self._items.get() is not None:
+                pass
+
+    def _check(self):
+        if self._error is not None:
+            raise self._error
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._check()
+        self._items.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._items.put(None)
+            self._thread.join()
+            self._file.close()
+            super().close()
+            self._check()
+
+
+def open_input(path, depth=PIPELINE_DEPTH):
+    """바이너리 읽기용으로 열기 (압축 파일이면 스레드에서 풀면서 읽음)"""
+    kind = compression_of(path)
+    if kind is None:
+        return open(path, 'rb')
+    return io.BufferedReader(_DecompressedStream(path, kind, depth), buffer_size=BLOCK_SIZE)
+
+
+def open_output(path, encoding='utf-8', newline=None, depth=PIPELINE_DEPTH):
+    """텍스트 쓰기용으로 열기 (.gz/.xz/.bz2 면 스레드에서 압축하면서 씀)"""
+    kind = compression_for(path)
+    if kind is None:
+        return open(path, 'w', encoding=encoding, newline=newline)
+    stream = io.BufferedWriter(_CompressingStream(path, kind, depth), buffer_size=BLOCK_SIZE)
+    return io.TextIOWrapper(stream, encoding=encoding, newline=newline)
+
+
+def consumed_bytes(f):
+    """open_input() 으로 연 파일에서 지금까지 읽은 원본 파일 바이트 (압축 파일이면 압축된 크기 기준)"""
+    position = getattr(getattr(f, 'raw', None), 'source_position', None)
+    return position() if position is not None else f.tell()
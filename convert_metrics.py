@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""변환 단계별 계측 (읽기/디코딩/분리/변환/쓰기 시간, 진행률, JSON 보고서)
+
+RunMetrics.stage(이름) 로 감싼 구간의 벽시계 시간을 단계별로 모은다.
+단계는 중첩될 수 있고 안쪽 단계의 시간은 바깥 단계에서 빠지므로
+(예: 분리 중에 일어난 읽기/디코딩) 단계 시간의 합이 전체 시간을 넘지 않는다.
+중첩 상태는 스레드마다 따로 둔다.
+
+tick() 은 일정 간격마다 stderr 에 진행률(읽은 바이트, 행 수, 처리량, 남은
+시간)을 쓰고, report() 는 마지막에 JSON 으로 저장할 dict 를 만든다.
+profiled() 는 실행 전체를 cProfile(cpu) 또는 tracemalloc(memory) 으로 감싼다.
+"""
+import cProfile
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+PROGRESS_INTERVAL = 2.0  # 초
+PROFILE_TOP = 30
+
+
+def no_stage(name):
+    """계측하지 않을 때 쓰는 빈 stage()"""
+    return nullcontext()
+
+
+def _format_eta(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class RunMetrics:
+    """변환 한 번의 단계별 시간, 바이트, 행 수"""
+
+    def __init__(self, total_bytes=0, progress=None, interval=PROGRESS_INTERVAL, stream=None):
+        self.total_bytes = total_bytes
+        self.progress = progress  # None / 'text' / 'json'
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.bytes_read = 0
+        self.rows = 0
+        self.stages = {}  # 이름 → [초, 호출 수]
+        self.started = time.perf_counter()
+        self.finished = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._next_tick = self.started + interval
+
+    def _charge(self, name, seconds, calls=0):
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = entry = [0.0, 0]
+            entry[0] += seconds
+            entry[1] += calls
+
+    @contextmanager
+    def stage(self, name):
+        """name 단계 시간 측정 (안쪽 stage 의 시간은 빼고 기록)"""
+        local = self._local
+        stack = getattr(local, 'stack', None)
+        if stack is None:
+            stack = local.stack = []
+        now = time.perf_counter()
+        if stack:
+            self._charge(stack[-1], now - local.mark)
+        stack.append(name)
+        local.mark = now
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._charge(stack.pop(), now - local.mark, 1)
+            local.mark = now
+
+    def iterate(self, name, iterable):
+        """iterable 에서 다음 값을 꺼내는 시간을 name 단계로 기록"""
+        it = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def read(self, nbytes):
+        """입력에서 nbytes 를 더 읽음 (진행률 기준)"""
+        self.bytes_read += nbytes
+
+    def tick(self, rows=0):
+        """행 수를 더하고, 간격이 지났으면 진행률을 씀"""
+        self.rows += rows
+        if self.progress is None:
+            return
+        now = time.perf_counter()
+        if now < self._next_tick:
+            return
+        self._next_tick = now + self.interval
+        self._emit(now)
+
+    def _emit(self, now):
+        elapsed = now - self.started
+        done = min(self.bytes_read, self.total_bytes) if self.total_bytes else self.bytes_read
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total_bytes - done) / rate if rate and self.total_bytes else None
+        if self.progress == 'json':
+            line = json.dumps({'elapsed': round(elapsed, 3), 'bytes': done, 'total_bytes': self.total_bytes,
+                               'rows': self.rows, 'mb_per_s': round(rate / 1e6, 2),
+                               'eta': None if eta is None else round(eta, 1)})
+        else:
+            pct = f"{done / self.total_bytes * 100:5.1f}% " if self.total_bytes else ''
+            line = (f"⏳ {pct}{done / 1e6:.0f}/{self.total_bytes / 1e6:.0f}MB, {self.rows}행, "
+                    f"{rate / 1e6:.1f}MB/s, 남은 시간 {'?' if eta is None else _format_eta(eta)}")
+        print(line, file=self.stream, flush=True)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def report(self, tables=None, **info):
+        """JSON 보고서용 dict
+
+        tables 는 {테이블: {'rows': n, 'bytes': n}} (출력 기준), info 는 그대로
+        보고서 맨 위에 넣는다 (입력 경로, 형식 등).
+        """
+        elapsed = self.elapsed()
+        stages = {name: {'seconds': round(seconds, 4), 'calls': calls,
+                         'share': round(seconds / elapsed, 4) if elapsed else 0.0}
+                  for name, (seconds, calls) in self.stages.items()}
+        measured = sum(seconds for seconds, _ in self.stages.values())
+        report = dict(info)
+        report.update({
+            'elapsed': round(elapsed, 4),
+            'input_bytes': self.total_bytes,
+            'bytes_read': self.bytes_read,
+            'rows': self.rows,
+            'mb_per_s': round(self.total_bytes / 1e6 / elapsed, 2) if elapsed else None,
+            'rows_per_s': round(self.rows / elapsed) if elapsed else None,
+            'stages': stages,
+            'unmeasured': round(max(elapsed - measured, 0.0), 4),
+            'tables': tables or {},
+        })
+        return report
+
+    def save(self, path, tables=None, **info):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(tables, **info), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    def summary(self):
+        """단계별 시간 한 줄 요약"""
+        parts = [f"{name} {seconds:.2f}초"
+                 for name, (seconds, _) in sorted(self.stages.items(), key=lambda kv: -kv[1][0])]
+        return f"{self.elapsed():.2f}초 ({', '.join(parts)})"
+
+
+@contextmanager
+def profiled(kind, path):
+    """실행 전체를 프로파일링해 path 에 저장
+
+    cpu: cProfile 통계(pstats 로 열 수 있는 파일), memory: tracemalloc 의
+    할당 위치별 상위 PROFILE_TOP 개와 최대 사용량 (텍스트).
+    cProfile 은 켠 스레드만 기록하므로 pipelined() 단계 스레드(--queue-depth)와
+    병렬 변환(-j) 워커 프로세스의 일은 빠진다. 변환 전체를 보려면 depth 0,
+    -j 1 로 돌릴 것 (final_sql_convert 는 cpu 프로파일이면 depth 를 0 으로 둔다).
+    tracemalloc 은 모든 스레드를 기록하지만 워커 프로세스는 빠진다.
+    """
+    if kind == 'cpu':
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+            pstats.Stats(profile, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_TOP)
+    elif kind == 'memory':
+        tracemalloc.start(10)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"# 현재 {current / (1 << 20):.1f}MB, 최대 {peak / (1 << 20):.1f}MB\n")
+                for stat in snapshot.statistics('lineno')[:PROFILE_TOP]:
+                    f.write(f"{stat}\n")
+    else:
+        raise ValueError(f'알 수 없는 프로파일 종류: {kind}')
+    print(f"📊 프로파일 저장: {path}")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""덤프 INSERT 문의 오프셋 색인 (사이드카 파일)
+
+덤프를 mmap 으로 한 번 훑어 INSERT 문마다 (테이블, PK, 바이트 오프셋, 길이) 를
+array 로 모아 '<덤프>.idx' 에 저장한다. 이후에는 덤프를 다시 읽지 않고
+- 테이블별 행 수 / 바이트 합계를 바로 조회하고
+- TemplateItems.ItemID 같은 PK 로 원본 문장 하나만 seek 해서 다시 꺼낼 수 있다.
+
+PK 는 ID_COLUMNS 의 IDENTITY 컬럼 값이다 (없는 테이블은 테이블 안의 행 번호).
+
+사용법:
+  python dump_index.py build [덤프]
+  python dump_index.py stats [덤프]
+  python dump_index.py get TemplateItems 123 [덤프] [--convert]
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from array import array
+
+from pg_formats import make_format
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from sql_dump_reader import MappedDump
+from sql_table_writer import ID_COLUMNS
+from tbm_schema import DumpSchema
+from tsql_lexer import TsqlSyntaxError, insert_key
+
+DEFAULT_DUMP = 'attached_assets/script1_1760403229620.sql'
+INDEX_MAGIC = b'TBMIDX1\n'
+
+_TABLE_RE = re.compile(r"INSERT \[dbo\]\.\[(\w+)\]")
+
+
+def index_path(source):
+    return source + '.idx'
+
+
+def _source_stamp(source):
+    st = os.stat(source)
+    return st.st_size, st.st_mtime_ns
+
+
+def _row_pk(dump, table, head, offset, length):
+    """문장의 IDENTITY 값 (IDENTITY 컬럼이 앞쪽이면 앞부분 head 만으로 충분)"""
+    try:
+        return int(insert_key(head, ID_COLUMNS[table]))
+    except TsqlSyntaxError:
+        return int(insert_key(dump.decode(offset, length), ID_COLUMNS[table]))
+
+
+class DumpIndex:
+    """INSERT 문 오프셋 색인 (열마다 array 하나)"""
+
+    def __init__(self, source, tables=(), stamp=None):
+        self.source = source
+        self.tables = list(tables)
+        self.stamp = stamp
+        self.table_ids = array('H')
+        self.pks = array('q')
+        self.offsets = array('q')
+        self.lengths = array('q')
+        self.counts = {}
+        self.bytes = {}
+        self._lookup = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _table_id(self, table):
+        try:
+            return self.tables.index(table)
+        except ValueError:
+            self.tables.append(table)
+            return len(self.tables) - 1
+
+    def append(self, table, pk, offset, length):
+        self.table_ids.append(self._table_id(table))
+        self.pks.append(pk)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.counts[table] = self.counts.get(table, 0) + 1
+        self.bytes[table] = self.bytes.get(table, 0) + length
+        self._lookup = None
+
+    @classmethod
+    def build(cls, source):
+        """덤프를 mmap 으로 스캔해 색인 생성 (행 문장은 앞부분만 디코딩)"""
+        index = cls(source, stamp=_source_stamp(source))
+        ordinals = {}
+        with MappedDump(source) as dump:
+            for offset, length in dump.find_statements('INSERT [dbo].['):
+                # 앞 256자만 디코딩해 테이블과 PK 를 꺼냄
+                head = dump.decode(offset, min(length, 256 * dump.unit))
+                table = _TABLE_RE.match(head).group(1)
+                ordinals[table] = ordinals.get(table, 0) + 1
+                if table in ID_COLUMNS:
+                    pk = _row_pk(dump, table, head, offset, length)
+                else:
+                    pk = ordinals[table]
+                index.append(table, pk, offset, length)
+        return index
+
+    def save(self, path=None):
+        """머리(JSON 한 줄) + 열 array 들을 순서대로 저장"""
+        path = path or index_path(self.source)
+        header = {
+            'source': os.path.basename(self.source),
+            'size': self.stamp[0],
+            'mtime_ns': self.stamp[1],
+            'byteorder': sys.byteorder,
+            'rows': len(self),
+            'tables': self.tables,
+            'counts': self.counts,
+            'bytes': self.bytes,
+        }
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            for column in (self.table_ids, self.pks, self.offsets, self.lengths):
+                column.tofile(f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, source, path=None):
+        """저장된 색인을 읽음 (없거나 덤프가 바뀌었으면 None)"""
+        path = path or index_path(source)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return None
+            header = json.loads(f.readline())
+            stamp = (header['size'], header['mtime_ns'])
+            if stamp != _source_stamp(source):
+                return None
+            index = cls(source, header['tables'], stamp)
+            rows = header['rows']
+            for column in (index.table_ids, index.pks, index.offsets, index.lengths):
+                column.fromfile(f, rows)
+                if header['byteorder'] != sys.byteorder:
+                    column.byteswap()
+        index.counts = header['counts']
+        index.bytes = header['bytes']
+        return index
+
+    @classmethod
+    def open(cls, source, rebuild=False):
+        """색인을 읽고, 없거나 오래됐으면 새로 만들어 저장"""
+        index = None if rebuild else cls.load(source)
+        if index is None:
+            index = cls.build(source)
+            index.save()
+        return index
+
+    def stats(self):
+        """테이블별 (행 수, 원본 바이트) — 덤프를 다시 읽지 않음"""
+        return {t: (self.counts[t], self.bytes[t]) for t in self.tables if t in self.counts}
+
+    def find(self, table, pk):
+        """(table, pk) 문장의 (offset, length), 없으면 None"""
+        if self._lookup is None:
+            self._lookup = {key: i for i, key in enumerate(zip(self.table_ids, self.pks))}
+        if table not in self.tables:
+            return None
+        i = self._lookup.get((self.tables.index(table), pk))
+        if i is None:
+            return None
+        return self.offsets[i], self.lengths[i]
+
+    def read(self, offset, length):
+        """원본에서 한 구간만 디코딩"""
+        with MappedDump(self.source) as dump:
+            return dump.decode(offset, length)
+
+    def extract(self, table, pk):
+        """(table, pk) 의 원본 INSERT 문 (없으면 None)"""
+        span = self.find(table, pk)
+        return None if span is None else self.read(*span)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='덤프 INSERT 문 오프셋 색인')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('build', help='색인 생성')
+    p.add_argument('dump', nargs='?', default=DEFAULT_DUMP)
+    p = sub.add_parser('stats', help='테이블별 행 수/바이트')
+    p.add_argument('dump', nargs='?', default=DEFAULT_DUMP)
+    p = sub.add_parser('get', help='PK 로 원본 문장 하나 꺼내기')
+    p.add_argument('table')
+    p.add_argument('pk', type=int)
+    p.add_argument('dump', nargs='?', default=DEFAULT_DUMP)
+    p.add_argument('--convert', action='store_true', help='PostgreSQL INSERT 로 변환해서 출력')
+    p.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                   help='--convert 에서 Prisma 필드가 String 인 varbinary 컬럼을 base64 로 쓰기 위해 읽을 schema.prisma')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = DumpIndex.open(args.dump, rebuild=True)
+        print(f"✅ 색인 생성: {index_path(args.dump)} ({len(index)}개 문장)")
+    elif args.command == 'stats':
+        index = DumpIndex.open(args.dump)
+        print(f"📝 {args.dump}: {len(index)}개 문장")
+        for table, (rows, size) in index.stats().items():
+            print(f"   - {table}: {rows}개, {size:,} bytes")
+    else:
+        index = DumpIndex.open(args.dump)
+        stmt = index.extract(args.table, args.pk)
+        if stmt is None:
+            sys.exit(f"❌ {args.table} {args.pk} 를 찾을 수 없습니다")
+        if args.convert:
+            # final_sql_convert 와 같은 타입별 변환 (서명 이미지는 base64)
+            schema = DumpSchema.scan(args.dump)
+            fmt = make_format('insert')
+            fmt.use_schema(schema, load_text_binaries(schema, args.prisma_schema))
+            stmt = fmt.convert(stmt, args.table)[1]
+        print(stmt)
+
+
+if __name__ == '__main__':
+    main()
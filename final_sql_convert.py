@@ -1,112 +1,368 @@
 #!/usr/bin/env python3
-import re
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-# UTF-16 파일 읽기
-with open('attached_assets/script1_1760403229620.sql', 'rb') as f:
-    raw_content = f.read()
-
-if raw_content[:2] == b'\xff\xfe':
-    content = raw_content.decode('utf-16-le')
-else:
-    content = raw_content.decode('utf-8')
-
-# GO 명령어를 마커로 사용하여 문장 분리
-statements = re.split(r'\s+GO\s+', content)
+from batch_cache import CACHE_SIZE, BatchCache
+from compressed_io import open_output
+from convert_metrics import RunMetrics, no_stage, profiled
+from pg_ddl import NAMINGS, DeferredDdl
+from pg_formats import FORMATS, ImageSpill, make_format
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from sql_dump_reader import iter_mapped_chunks, iter_statement_chunks
+from sql_table_writer import LOAD_ORDER, TableSpoolWriter, sequence_reset_sql
+from stream_pipeline import PIPELINE_DEPTH, pipelined
+from tbm_checkpoint import REFERENCE_TABLES, Checkpoint, TableMarks, commit_pending
+from tbm_schema import DumpSchema, is_schema_statement
+from tsql_lexer import statement_table
 
 # 관심 있는 테이블들
-target_tables = ['Teams', 'Users', 'ChecklistTemplates', 'TemplateItems', 
+target_tables = ['Teams', 'Users', 'ChecklistTemplates', 'TemplateItems',
                  'DailyReports', 'ReportDetails', 'ReportSignatures']
 
-converted = []
-
-for stmt in statements:
-    # SET IDENTITY_INSERT나 기타 SQL Server 명령 건너뛰기
-    if any(x in stmt for x in ['SET IDENTITY_INSERT', 'ALTER DATABASE', 'CREATE DATABASE', 
-                                 'CREATE TABLE', 'ALTER TABLE', 'CREATE USER', 'ALTER ROLE',
-                                 '__EFMigrationsHistory']):
-        continue
-    
-    # INSERT 문만 처리
-    if 'INSERT [dbo].' in stmt:
-        # 테이블 이름 확인
-        table_match = re.search(r'INSERT \[dbo\]\.\[(\w+)\]', stmt)
-        if table_match and table_match.group(1) in target_tables:
-            # 줄바꿈과 여러 공백을 하나의 공백으로
-            stmt = re.sub(r'\s+', ' ', stmt.strip())
-            
-            # SQL Server → PostgreSQL 변환
-            stmt = re.sub(r'INSERT \[dbo\]\.\[(\w+)\]', r'INSERT INTO "\1"', stmt)
-            stmt = re.sub(r'\[(\w+)\]', r'"\1"', stmt)
-            stmt = re.sub(r"CAST\(N'([^']+)' AS DateTime2\)", r"'\1'::timestamp", stmt)
-            stmt = re.sub(r"N'", r"'", stmt)
-            
-            # 세미콜론 추가
-            if not stmt.endswith(';'):
-                stmt += ';'
-            
-            converted.append(stmt)
-
-# 테이블별로 정렬하여 저장
-with open('FoodieMatch/final_tbm_data.sql', 'w', encoding='utf-8') as f:
-    # Teams
-    f.write('-- Teams data\n')
-    for stmt in converted:
-        if '"Teams"' in stmt:
-            f.write(stmt + '\n')
-    
-    # ChecklistTemplates
-    f.write('\n-- ChecklistTemplates data\n')
-    for stmt in converted:
-        if '"ChecklistTemplates"' in stmt:
-            f.write(stmt + '\n')
-    
-    # TemplateItems
-    f.write('\n-- TemplateItems data\n')
-    for stmt in converted:
-        if '"TemplateItems"' in stmt:
-            f.write(stmt + '\n')
-    
-    # Users
-    f.write('\n-- Users data\n')
-    for stmt in converted:
-        if '"Users"' in stmt:
-            f.write(stmt + '\n')
-    
-    # DailyReports
-    f.write('\n-- DailyReports data\n')
-    for stmt in converted:
-        if '"DailyReports"' in stmt:
-            f.write(stmt + '\n')
-    
-    # ReportDetails
-    f.write('\n-- ReportDetails data\n')
-    for stmt in converted:
-        if '"ReportDetails"' in stmt:
-            f.write(stmt + '\n')
-    
-    # ReportSignatures
-    f.write('\n-- ReportSignatures data\n')
-    for stmt in converted:
-        if '"ReportSignatures"' in stmt:
-            f.write(stmt + '\n')
-    
-    # 시퀀스 리셋
-    f.write('\n-- Reset sequences\n')
-    for table in ['Teams', 'Users', 'ChecklistTemplates', 'TemplateItems', 
-                  'DailyReports', 'ReportDetails', 'ReportSignatures']:
-        id_col = 'TeamID' if table == 'Teams' else \
-                 'UserID' if table == 'Users' else \
-                 'TemplateID' if table == 'ChecklistTemplates' else \
-                 'ItemID' if table == 'TemplateItems' else \
-                 'ReportID' if table == 'DailyReports' else \
-                 'DetailID' if table == 'ReportDetails' else 'SignatureID'
-        f.write(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{id_col}'), COALESCE((SELECT MAX(\"{id_col}\") FROM \"{table}\"), 1));\n")
-
-print(f"✅ 변환 완료: FoodieMatch/final_tbm_data.sql")
-print(f"📝 총 {len(converted)} 개의 INSERT 문 생성")
-
-# 테이블별 개수
-for table in target_tables:
-    count = sum(1 for stmt in converted if f'"{table}"' in stmt)
-    if count > 0:
-        print(f"   - {table}: {count}개")
+
+def convert_chunk(fmt, statements, since=None):
+    """문장 묶음을 변환해 테이블별 (컬럼, [행 텍스트]), DDL 문 목록, TableMarks 를 돌려줌
+
+    워커 프로세스에서 실행된다. DDL(CREATE/ALTER TABLE) 은 부모가
+    스키마(FK 그래프)를 만들 수 있도록 원문 그대로 넘긴다.
+    since({테이블: 마지막 ID}) 를 주면 체크포인트용 기준값을 모으고,
+    그 ID 이하의 행은 건너뛴다 (TableMarks 는 since 가 None 이면 None).
+    """
+    tables = {}
+    ddl = []
+    marks = None if since is None else TableMarks()
+    for stmt in statements:
+        # SET IDENTITY_INSERT나 DDL 등 SQL Server 명령은 INSERT 가 아니므로 건너뜀
+        # (문장 맨 앞만 보므로 값 안에 'ALTER TABLE' 이 들어 있어도 오판하지 않음)
+        table = statement_table(stmt)
+        if table is None:
+            if is_schema_statement(stmt):
+                ddl.append(stmt)
+            continue
+        if table in target_tables:
+            if marks is not None:
+                pk = marks.observe(table, stmt)
+                if table in since and pk <= since[table]:
+                    continue
+            # SQL Server → PostgreSQL 변환 (INSERT 문 또는 COPY 행)
+            columns, text = fmt.convert(stmt, table)
+            entry = tables.get(table)
+            if entry is None:
+                tables[table] = entry = (columns, [])
+            entry[1].append(text)
+    return tables, ddl, marks
+
+
+_worker_fmt = None
+_worker_since = None
+
+
+def _init_worker(fmt, since):
+    global _worker_fmt, _worker_since
+    _worker_fmt = fmt
+    _worker_since = since
+
+
+def _convert_in_worker(statements):
+    return convert_chunk(_worker_fmt, statements, _worker_since)
+
+
+def iter_input_chunks(input_file, mapped=False, metrics=None):
+    """입력 문장 묶음 (mapped 면 mmap 스캔으로 대상 테이블 문장만 디코딩)"""
+    if mapped:
+        return iter_mapped_chunks(input_file, target_tables, metrics=metrics)
+    return iter_statement_chunks(input_file, metrics=metrics)
+
+
+def _parallel_chunks(chunks, fmt, jobs, since=None, cache=None, stage=no_stage):
+    """묶음을 프로세스 풀에 보내고 결과를 원래 순서대로 돌려줌
+
+    동시에 떠 있는 묶음 수를 jobs 의 몇 배로 제한해 메모리가 덤프 크기에
+    비례해 늘지 않도록 한다. 캐시에 있는 묶음은 풀에 보내지 않는다.
+    워커를 기다리는 시간은 transform 단계로 기록된다.
+    """
+    window = jobs * 4
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(fmt, since)) as pool:
+        for key, hit, chunk in _lookup_chunks(chunks, cache, stage):
+            pending.append((key, hit if hit is not None else pool.submit(_convert_in_worker, chunk)))
+            if len(pending) >= window:
+                yield _collect(cache, *pending.popleft(), stage=stage)
+        while pending:
+            yield _collect(cache, *pending.popleft(), stage=stage)
+
+
+def _lookup_chunks(chunks, cache, stage=no_stage):
+    """묶음마다 (캐시 키, 캐시된 결과 또는 None, 묶음)"""
+    for chunk in chunks:
+        if cache is None:
+            yield None, None, chunk
+        else:
+            with stage('cache'):
+                key = cache.key(chunk)
+                hit = cache.get(key)
+            yield key, hit, chunk
+
+
+def _collect(cache, key, result, stage=no_stage):
+    """워커 결과(future)를 받아 캐시에 저장"""
+    if not isinstance(result, tuple):
+        with stage('transform'):
+            result = result.result()
+        if cache is not None:
+            with stage('cache'):
+                cache.put(key, result)
+    return result
+
+
+def _serial_chunks(chunks, fmt, since=None, cache=None, stage=no_stage):
+    for key, hit, chunk in _lookup_chunks(chunks, cache, stage):
+        if hit is not None:
+            yield hit
+            continue
+        with stage('transform'):
+            result = convert_chunk(fmt, chunk, since)
+        if cache is not None:
+            with stage('cache'):
+                cache.put(key, result)
+        yield result
+
+
+def convert_dump(input_file, writer, jobs=1, schema=None, mapped=False, checkpoint=None, cache=None,
+                 metrics=None, depth=PIPELINE_DEPTH):
+    """덤프의 INSERT 문을 변환해 테이블별 스풀로 한 번에 분배
+
+    jobs > 1 이면 GO 배치(또는 그 일부) 단위로 병렬 변환하되, 결과는 원본
+    순서대로 합치므로 출력은 단일 프로세스 실행과 바이트 단위로 같다.
+    schema 를 주면 덤프의 DDL 을 schema.observe() 로 넘긴다.
+    mapped=True 면 파일 전체를 디코딩하지 않고 mmap 으로 대상 테이블의
+    INSERT 문과 DDL 만 찾아 디코딩한다 (테이블별 행 순서는 같음).
+    checkpoint 를 주면 그 기준값 이후의 행만 쓰고, 이번 덤프 전체의
+    기준값(TableMarks)을 돌려준다.
+    cache(BatchCache) 를 주면 원문이 같은 묶음은 변환하지 않고 캐시 결과를 쓴다.
+    metrics(RunMetrics) 를 주면 단계별 시간과 진행률을 기록한다.
+    depth > 0 이면 읽기/분리, 변환, 쓰기를 각각 다른 스레드(변환은 jobs > 1
+    이면 프로세스 풀)에서 돌리고 크기 depth 인 큐로 잇는다. 묶음 순서는
+    그대로라 출력은 순차 실행과 같다 (단계 시간은 겹쳐서 기록됨).
+    """
+    since = None if checkpoint is None else checkpoint.since()
+    # UTF-16 파일을 청크 단위로 디코딩하면서 문장 묶음 단위로 분리
+    chunks = iter_input_chunks(input_file, mapped, metrics)
+    return convert_chunks(chunks, writer, jobs, schema, since, cache, metrics, depth)
+
+
+def convert_chunks(chunks, writer, jobs=1, schema=None, since=None, cache=None, metrics=None,
+                   depth=PIPELINE_DEPTH):
+    """문장 묶음들을 변환해 writer 로 분배 (인자는 convert_dump 와 같음)
+
+    since 가 None 이 아니면 이번 입력의 기준값(TableMarks)을 돌려준다.
+    """
+    marks = None if since is None else TableMarks()
+    stage = no_stage if metrics is None else metrics.stage
+    if metrics is not None:
+        chunks = metrics.iterate('split', chunks)
+    if depth > 0:
+        chunks = pipelined(chunks, depth, name='tbm-reader')
+    if jobs <= 1:
+        results = _serial_chunks(chunks, writer.fmt, since, cache, stage)
+    else:
+        results = _parallel_chunks(chunks, writer.fmt, jobs, since, cache, stage)
+    if depth > 0:
+        results = pipelined(results, depth, name='tbm-transform')
+
+    for tables, ddl, chunk_marks in results:
+        if marks is not None:
+            marks.merge(chunk_marks)
+        if schema is not None:
+            for stmt in ddl:
+                schema.observe(stmt)
+        rows = 0
+        with stage('write'):
+            for table, (columns, texts) in tables.items():
+                for text in texts:
+                    writer.add(table, columns, text)
+                rows += len(texts)
+        if metrics is not None:
+            metrics.tick(rows)
+    return marks
+
+
+def load_order(schema):
+    """덤프의 FK 로부터 정한 테이블 순서 (부모 먼저)"""
+    tables = [t for t in LOAD_ORDER if t in target_tables]
+    return schema.load_order(tables, order_hint=LOAD_ORDER)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL Server 덤프 → PostgreSQL INSERT 변환')
+    parser.add_argument('input', nargs='?', default='attached_assets/script1_1760403229620.sql')
+    parser.add_argument('-o', '--output', default='FoodieMatch/final_tbm_data.sql')
+    parser.add_argument('--split-dir', help='테이블별 파일을 따로 저장할 디렉터리')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='insert',
+                        help='insert: 행마다 INSERT 문, insert-batch: 여러 행 INSERT + BEGIN/COMMIT, '
+                             'copy: 테이블마다 COPY ... FROM STDIN 블록')
+    parser.add_argument('--batch-rows', type=int, default=500, help='insert-batch: 배치당 최대 행 수')
+    parser.add_argument('--batch-bytes', type=int, default=1 << 20, help='insert-batch: 배치당 최대 바이트')
+    parser.add_argument('--batches-per-txn', type=int, default=10,
+                        help='insert-batch: BEGIN/COMMIT 하나에 넣을 배치 수')
+    parser.add_argument('--spill-images', metavar='DIR',
+                        help='varbinary 값을 DIR/<sha256>.<확장자> 파일로 빼고 '
+                             'pg_read_binary_file() 로 참조 (insert, insert-batch; '
+                             'base64 로 쓰는 Prisma String 컬럼은 제외)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='변환 프로세스 수 (0 이면 CPU 코어 수)')
+    parser.add_argument('--mmap', action='store_true',
+                        help='덤프를 mmap 으로 스캔해 대상 테이블 문장만 디코딩')
+    parser.add_argument('--since-checkpoint', metavar='FILE',
+                        help='FILE 의 기준값 이후 새로 생긴 보고서 행과 바뀐 참조 테이블(upsert)만 출력하고 '
+                             '새 기준값은 FILE.pending 에 저장 (없으면 전체 변환, COPY 형식 불가)')
+    parser.add_argument('--commit-checkpoint', metavar='FILE',
+                        help='출력을 DB 에 다 넣은 뒤 실행: FILE.pending 을 FILE 로 확정하고 끝냄')
+    parser.add_argument('--upsert', action='store_true',
+                        help='INSERT 에 ON CONFLICT (PK) DO UPDATE 를 붙임 (insert, insert-batch)')
+    parser.add_argument('--defer-constraints', action='store_true',
+                        help='적재 전에 FK/보조 인덱스를 지우고, 데이터 뒤에 인덱스 생성과 '
+                             'FK NOT VALID + VALIDATE CONSTRAINT 를 붙임')
+    parser.add_argument('--create-tables', action='store_true',
+                        help='덤프의 CREATE TABLE 을 PostgreSQL 로 옮겨 앞에 붙이고 PK 도 적재 후에 만듦 '
+                             '(--defer-constraints 포함)')
+    parser.add_argument('--constraint-names', choices=NAMINGS, default='prisma',
+                        help='다시 만드는 제약/인덱스 이름 (prisma: Users_TeamID_fkey, dump: FK_Users_Teams_TeamID)')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='varbinary 인데 Prisma 필드가 String 인 컬럼(서명 이미지)을 찾을 schema.prisma. '
+                             '그런 컬럼은 bytea 대신 base64 문자열로 씀 (파일이 없으면 모두 bytea)')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='묶음별 변환 결과를 DIR 에 캐시 (원문이 같은 묶음은 다시 변환하지 않음)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE >> 20, help='캐시 최대 크기 (MB)')
+    parser.add_argument('--queue-depth', type=int, default=PIPELINE_DEPTH,
+                        help='읽기 → 변환 → 쓰기 단계 사이 큐 크기 (묶음 수, 0 이면 한 스레드에서 순차 실행)')
+    parser.add_argument('--progress', nargs='?', const='text', choices=('text', 'json'),
+                        help='진행률(읽은 바이트, 행 수, 남은 시간)을 주기적으로 stderr 에 출력')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='단계별 시간, 테이블별 행/바이트 등 계측 결과를 JSON 으로 저장')
+    parser.add_argument('--profile', choices=('cpu', 'memory'),
+                        help='실행 전체를 cProfile(cpu, 단계 스레드 없이 실행) 또는 tracemalloc(memory) 으로 프로파일링')
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help='프로파일 저장 경로 (기본: 출력 파일 이름 + .prof / .mem.txt)')
+    args = parser.parse_args()
+    if args.commit_checkpoint:
+        if not commit_pending(args.commit_checkpoint):
+            sys.exit(f"❌ 확정할 체크포인트가 없습니다: {args.commit_checkpoint}.pending")
+        print(f"📌 체크포인트 확정: {args.commit_checkpoint}")
+        return
+    if args.profile == 'cpu' and args.queue_depth:
+        # cProfile 은 메인 스레드만 기록하므로 읽기/변환 단계도 메인 스레드에서 돌림
+        args.queue_depth = 0
+        print("📌 --profile cpu: 단계 스레드 없이 순차 실행 (--queue-depth 0)")
+    if args.profile:
+        path = args.profile_out or args.output + ('.prof' if args.profile == 'cpu' else '.mem.txt')
+        with profiled(args.profile, path):
+            run(parser, args)
+    else:
+        run(parser, args)
+
+
+def run(parser, args):
+    jobs = args.jobs or os.cpu_count() or 1
+
+    options = {}
+    if args.format == 'insert-batch':
+        options = dict(batch_rows=args.batch_rows, batch_bytes=args.batch_bytes,
+                       batches_per_txn=args.batches_per_txn)
+    if args.upsert:
+        if args.format == 'copy':
+            parser.error('--upsert 는 COPY 형식과 함께 쓸 수 없습니다')
+        if args.create_tables:
+            parser.error('--upsert 는 PK 가 있어야 하므로 --create-tables 와 함께 쓸 수 없습니다')
+        options['upsert'] = True
+    if args.since_checkpoint:
+        if args.format == 'copy':
+            parser.error('--since-checkpoint 는 바뀐 참조 테이블을 upsert 해야 하므로 COPY 형식과 함께 쓸 수 없습니다')
+        if args.create_tables:
+            parser.error('--since-checkpoint 는 upsert 에 PK 가 있어야 하므로 --create-tables 와 함께 쓸 수 없습니다')
+        # 바뀐 참조 테이블은 통째로 다시 내보내므로 이미 있는 행과 키가 겹침
+        options.setdefault('upsert', REFERENCE_TABLES)
+    if args.spill_images:
+        if args.format == 'copy':
+            parser.error('--spill-images 는 COPY 형식과 함께 쓸 수 없습니다')
+        options['spill'] = ImageSpill(args.spill_images)
+
+    fmt = make_format(args.format, **options)
+    metrics = RunMetrics(os.path.getsize(args.input), progress=args.progress)
+    # 덤프의 CREATE TABLE 로 컬럼 타입을 먼저 읽어 타입별 변환에 씀 (워커에도 전달됨)
+    with metrics.stage('schema'):
+        schema = DumpSchema.scan(args.input)
+    text_binary = load_text_binaries(schema, args.prisma_schema)
+    fmt.use_schema(schema, text_binary)
+    for table, columns in text_binary.items():
+        print(f"📌 Prisma String 컬럼이라 base64 로 씀: {', '.join(f'{table}.{c}' for c in columns)}")
+    deferred = None
+    if args.defer_constraints or args.create_tables:
+        deferred = DeferredDdl(schema, load_order(schema), args.constraint_names, text_binary)
+    checkpoint = Checkpoint.load(args.since_checkpoint) if args.since_checkpoint else None
+    cache = None
+    if args.cache:
+        # 델타 기준값이 다르면 같은 묶음이라도 결과가 다르므로 키에 섞음
+        since = checkpoint.since() if checkpoint is not None else None
+        cache = BatchCache(args.cache, args.cache_size << 20, fmt.signature() + (since,))
+
+    with TableSpoolWriter(LOAD_ORDER, fmt=fmt) as writer:
+        marks = convert_dump(args.input, writer, jobs, schema, mapped=args.mmap,
+                             checkpoint=checkpoint, cache=cache, metrics=metrics,
+                             depth=args.queue_depth)
+        if cache is not None:
+            # put() 이 상한을 지키므로 --cache-size 를 줄여 적중만 난 경우에 대비한 정리
+            cache.evict()
+            print(f"💾 캐시: {cache.summary()}")
+        if checkpoint is not None:
+            # 내용이 그대로인 참조 테이블은 다시 내보내지 않음
+            for table in checkpoint.unchanged(marks):
+                writer.drop(table)
+
+        # 덤프의 FK 그래프 순서(부모 테이블 먼저)로 정렬하여 저장
+        writer.table_order = load_order(schema)
+        with metrics.stage('write'), open_output(args.output) as f:
+            if deferred is not None:
+                f.write(deferred.pre_load_sql(args.create_tables) + '\n')
+            writer.write_to(f)
+
+            if deferred is not None:
+                # 인덱스/FK 재생성 + 시퀀스 리셋
+                f.write('\n' + deferred.post_load_sql(args.create_tables))
+            else:
+                # 시퀀스 리셋
+                f.write('\n-- Reset sequences\n')
+                f.write(sequence_reset_sql(writer.table_order, schema.identity_columns()))
+
+        if args.split_dir:
+            with metrics.stage('write'):
+                paths = writer.write_split(args.split_dir)
+            print(f"📁 테이블별 파일 {len(paths)}개: {args.split_dir}")
+        if deferred is not None:
+            print(f"📌 제약 지연: 인덱스 {len(deferred.indexes)}개, FK {len(deferred.foreign_keys)}개를 데이터 뒤에 생성"
+                  f"{' (테이블 생성 포함)' if args.create_tables else ''}")
+        metrics.finish()
+
+        if checkpoint is not None:
+            pending = Checkpoint.from_marks(marks).save_pending(args.since_checkpoint)
+            print(f"📌 새 체크포인트: {pending} (적재 후 --commit-checkpoint {args.since_checkpoint} 로 확정)")
+
+        print(f"✅ 변환 완료: {args.output}")
+        print(f"📝 총 {writer.total()} 개의 행 생성 ({args.format})")
+
+        # 테이블별 개수 (쓰는 동안 집계한 값)
+        for table in writer.tables():
+            print(f"   - {table}: {writer.counts[table]}개")
+
+        if args.metrics:
+            tables = {t: {'rows': writer.counts[t], 'bytes': writer.bytes[t]} for t in writer.tables()}
+            metrics.save(args.metrics, tables, input=args.input, output=args.output,
+                         format=args.format, jobs=jobs, mmap=args.mmap, queue_depth=args.queue_depth)
+            print(f"📊 계측: {metrics.summary()} → {args.metrics}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,38 +1,166 @@
 #!/usr/bin/env python3
+import argparse
 import re
 
-# SQL 파일 읽기
-with open('FoodieMatch/tbm_data.sql', 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# 손상된 INSERT 문 찾기 및 수정
-# 패턴: VALUES (..., '...';  <- 세미콜론으로 끝나는 문자열
-# 이 경우 텍스트가 잘린 것이므로 빈 문자열로 대체하거나 제거
-
-lines = content.splitlines()
-fixed_lines = []
-skip_next = False
-
-for i, line in enumerate(lines):
-    # 손상된 INSERT 문 감지 (문자열이 세미콜론으로 끝남)
-    if re.search(r"'[^']*;\s*$", line) and 'INSERT INTO' in line:
-        # Description이 세미콜론으로 끝나는 경우
-        # 패턴: ..., '텍스트;   <-- 이런 형식
-        # 수정: ..., '텍스트', DisplayOrder값);
-        
-        # 원본 SQL 스크립트에서 다시 가져오기
-        # 일단 이 줄을 건너뛰고 주석 처리
-        fixed_lines.append(f"-- SKIPPED (corrupted): {line}")
-        continue
-    
-    fixed_lines.append(line)
-
-# 수정된 내용 저장
-with open('FoodieMatch/tbm_data_fixed.sql', 'w', encoding='utf-8') as f:
-    f.write('\n'.join(fixed_lines))
-
-print(f"✅ 손상된 레코드 수정 완료: FoodieMatch/tbm_data_fixed.sql")
-
-# 손상된 라인 수 계산
-corrupted_count = sum(1 for line in fixed_lines if line.startswith('-- SKIPPED'))
-print(f"⚠️  손상된 레코드: {corrupted_count}개 건너뛰기")
+from compressed_io import open_input, open_output
+from dump_index import DEFAULT_DUMP, DumpIndex
+from pg_formats import make_format
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from tbm_schema import DumpSchema
+
+# 변환된 INSERT 문의 테이블 이름과 첫 값(PK)
+_OUTPUT_INSERT_RE = re.compile(r'INSERT INTO "?(\w+)"?\s*\([^)]*\)\s*VALUES\s*\(\s*(-?\d+)')
+# insert-batch 의 머리 줄 (행은 다음 줄부터 '(...),' 로 이어짐)
+_BATCH_HEAD_RE = re.compile(r'INSERT INTO "?(\w+)"?\s*\([^)]*\)\s*VALUES\s*$')
+# 문장의 끝맺음: ');' 또는 --upsert 의 ') ON CONFLICT ...;' (절 안에는 홑따옴표가 없음)
+_TAIL_RE = re.compile(r"\)( ON CONFLICT [^']*)?;$")
+_ROW_PK_RE = re.compile(r'\(\s*(-?\d+)')
+_TABLE_RE = re.compile(r'INSERT INTO "?(\w+)"?')
+# 잘린 insert-batch 문이 다음 문장까지 삼키지 않도록 끊는 줄
+_STATEMENT_STARTS = ('INSERT INTO', 'BEGIN;', 'COMMIT;')
+
+
+def is_batch(stmt):
+    return _BATCH_HEAD_RE.match(stmt.split('\n', 1)[0]) is not None
+
+
+def batch_rows(stmt):
+    """insert-batch 문 → 행 텍스트 목록 (여러 줄짜리 리터럴은 한 행으로)"""
+    rows = []
+    row = []
+    quotes = 0
+    for line in stmt.split('\n')[1:]:
+        row.append(line)
+        quotes += line.count("'")
+        if quotes % 2 == 0:
+            rows.append('\n'.join(row))
+            row = []
+    if row:
+        rows.append('\n'.join(row))
+    return rows
+
+
+def is_corrupted(stmt):
+    """따옴표 짝이 안 맞거나 출력 형식의 끝맺음으로 끝나지 않는 INSERT 문 (줄 단위 변환에서 잘린 행)
+
+    insert 는 문장마다 ');' (--upsert 면 ') ON CONFLICT ...;'), insert-batch 는
+    행마다 '),' 로 이어지다 마지막 행이 같은 끝맺음으로 끝나야 한다.
+    """
+    if stmt.count("'") % 2 == 1:
+        return True
+    if not is_batch(stmt):
+        return _TAIL_RE.search(stmt.rstrip()) is None
+    rows = batch_rows(stmt)
+    if not rows or _TAIL_RE.search(rows[-1].rstrip()) is None:
+        return True
+    return any(not row.startswith('(') or not row.rstrip().endswith('),') for row in rows[:-1])
+
+
+def iter_output_statements(lines):
+    """출력 파일의 줄을 문장 단위로 묶음 (여러 줄짜리 리터럴은 한 문장)
+
+    INSERT 문은 따옴표 짝이 맞을 때까지 다음 줄을 이어 붙이고, insert-batch 문은
+    ';' 로 끝나는 줄까지 이어 붙인다. 그 밖의 줄(주석, 빈 줄, SQL 문, COPY 행)은
+    그대로 하나씩 돌려준다.
+    """
+    i = 0
+    while i < len(lines):
+        stmt = [lines[i]]
+        i += 1
+        if stmt[0].startswith('INSERT INTO'):
+            batch = is_batch(stmt[0])
+            quotes = stmt[0].count("'")
+            while i < len(lines) and not lines[i].startswith(_STATEMENT_STARTS) and (
+                    quotes % 2 or (batch and not stmt[-1].rstrip().endswith(';'))):
+                stmt.append(lines[i])
+                quotes += lines[i].count("'")
+                i += 1
+        yield '\n'.join(stmt)
+
+
+def statement_keys(stmt):
+    """INSERT 문의 (테이블, [PK, ...]) (알 수 없으면 None)
+
+    insert-batch 면 '(' + 숫자로 시작하는 줄마다 한 행으로 본다 (잘린 행 뒤의
+    행도 따옴표 짝과 상관없이 찾도록).
+    """
+    if not is_batch(stmt):
+        m = _OUTPUT_INSERT_RE.match(stmt)
+        return (m.group(1), [int(m.group(2))]) if m else None
+    keys = []
+    for line in stmt.split('\n')[1:]:
+        m = _ROW_PK_RE.match(line)
+        if m is not None:
+            keys.append(int(m.group(1)))
+    return _TABLE_RE.match(stmt).group(1), keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description='잘린 INSERT 문을 원본 덤프에서 다시 꺼내 교체')
+    parser.add_argument('input', nargs='?', default='FoodieMatch/tbm_data.sql')
+    parser.add_argument('-o', '--output', default='FoodieMatch/tbm_data_fixed.sql')
+    parser.add_argument('--dump', default=DEFAULT_DUMP, help='원본 SQL Server 덤프 (색인은 <덤프>.idx)')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='Prisma 필드가 String 인 varbinary 컬럼을 base64 로 쓰기 위해 읽을 schema.prisma')
+    args = parser.parse_args()
+
+    # SQL 파일 읽기 ('\n' 으로만 나눠 리터럴 안의 CRLF 와 끝 줄바꿈을 그대로 둠)
+    with open_input(args.input) as f:
+        lines = f.read().decode('utf-8').split('\n')
+    trailing_newline = lines[-1] == ''
+    if trailing_newline:
+        lines.pop()
+
+    # 원본 덤프의 오프셋 색인 (없으면 한 번 만들어 둠)
+    index = DumpIndex.open(args.dump)
+    tables = {t.lower(): t for t in index.tables}
+
+    statements = list(iter_output_statements(lines))
+    # 테이블별 upsert 절 (멀쩡한 문장에서 읽어 다시 꺼낸 행에도 붙임)
+    clauses = {}
+    for stmt in statements:
+        tail = _TAIL_RE.search(stmt.rstrip()) if stmt.startswith('INSERT INTO') else None
+        if tail and tail.group(1):
+            clauses[_TABLE_RE.match(stmt).group(1)] = tail.group(1)
+
+    fixed_lines = []
+    repaired = skipped = 0
+    fmt = None
+    for stmt in statements:
+        if not stmt.startswith('INSERT INTO') or not is_corrupted(stmt):
+            fixed_lines.append(stmt)
+            continue
+
+        # 원본 SQL 스크립트에서 (테이블, PK) 로 다시 가져오기 (insert-batch 면 묶음의 모든 행)
+        keys = statement_keys(stmt)
+        sources = None
+        if keys and keys[0].lower() in tables:
+            table = tables[keys[0].lower()]
+            sources = [index.extract(table, pk) for pk in keys[1]]
+            if None in sources:
+                sources = None
+        if sources is None:
+            fixed_lines.append('\n'.join(f"-- SKIPPED (corrupted): {line}" for line in stmt.split('\n')))
+            skipped += 1
+            continue
+        if fmt is None:
+            # 다시 꺼낸 행도 final_sql_convert 와 같은 타입별 인코딩으로 (서명 이미지는 base64)
+            schema = DumpSchema.scan(args.dump)
+            fmt = make_format('insert')
+            fmt.use_schema(schema, load_text_binaries(schema, args.prisma_schema))
+        clause = clauses.get(keys[0], '')
+        fixed_lines.extend(fmt.convert(source, table)[1][:-1] + clause + ';' for source in sources)
+        repaired += len(sources)
+
+    # 수정된 내용 저장
+    with open_output(args.output) as f:
+        f.write('\n'.join(fixed_lines) + ('\n' if trailing_newline else ''))
+
+    print(f"✅ 손상된 레코드 수정 완료: {args.output}")
+    print(f"📝 원본에서 다시 추출: {repaired}개")
+    if skipped:
+        print(f"⚠️  손상된 레코드: {skipped}개 건너뛰기 (색인에 없음)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""SSMS 스크립트 형식(UTF-16LE + BOM, CRLF)의 대용량 TBM 테스트 덤프 생성기
+
+attached_assets 의 샘플과 같은 8개 테이블(DDL, IDENTITY_INSERT 블록, FK,
+인덱스)을 원하는 규모로 만든다. 보고서마다 팀 템플릿의 항목 수만큼
+ReportDetails 가 생기므로 --reports 로 행 수를 조절한다
+(예: --reports 50000 --items-per-template 30 → ReportDetails 150만 행).
+
+문자열에는 샘플에서 문제가 됐던 경우를 일부러 섞는다:
+작은따옴표(''), 세미콜론, 괄호, 리터럴 안 줄바꿈(CRLF), 한글.
+
+사용법: python generate_test_dump.py -o /tmp/tbm_big.sql --reports 50000 --signature-kb 8
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+SCRIPT_DATE = '2025-10-14 오전 9:53:18'
+WITH_PK = ('WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, IGNORE_DUP_KEY = OFF, '
+           'ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, OPTIMIZE_FOR_SEQUENTIAL_KEY = OFF) ON [PRIMARY]')
+WITH_INDEX = ('WITH (PAD_INDEX = OFF, STATISTICS_NORECOMPUTE = OFF, SORT_IN_TEMPDB = OFF, '
+              'DROP_EXISTING = OFF, ONLINE = OFF, ALLOW_ROW_LOCKS = ON, ALLOW_PAGE_LOCKS = ON, '
+              'OPTIMIZE_FOR_SEQUENTIAL_KEY = OFF) ON [PRIMARY]')
+
+# 테이블 정의 (SSMS 가 내보내는 순서 = 이름순)
+TABLES = [
+    ('__EFMigrationsHistory', [('MigrationId', '[nvarchar](150) NOT NULL'),
+                               ('ProductVersion', '[nvarchar](32) NOT NULL')], 'MigrationId'),
+    ('ChecklistTemplates', [('TemplateID', '[int] IDENTITY(1,1) NOT NULL'),
+                            ('TemplateName', '[nvarchar](max) NULL'),
+                            ('TeamID', '[int] NOT NULL')], 'TemplateID'),
+    ('DailyReports', [('ReportID', '[int] IDENTITY(1,1) NOT NULL'),
+                      ('TeamID', '[int] NOT NULL'),
+                      ('ReportDate', '[datetime2](7) NOT NULL'),
+                      ('ManagerName', '[nvarchar](max) NULL'),
+                      ('Remarks', '[nvarchar](max) NULL')], 'ReportID'),
+    ('ReportDetails', [('DetailID', '[int] IDENTITY(1,1) NOT NULL'),
+                       ('ReportID', '[int] NOT NULL'),
+                       ('ItemID', '[int] NOT NULL'),
+                       ('CheckState', '[nvarchar](max) NULL')], 'DetailID'),
+    ('ReportSignatures', [('SignatureID', '[int] IDENTITY(1,1) NOT NULL'),
+                          ('ReportID', '[int] NOT NULL'),
+                          ('UserID', '[int] NOT NULL'),
+                          ('SignatureImage', '[varbinary](max) NULL'),
+                          ('SignedAt', '[datetime2](7) NOT NULL')], 'SignatureID'),
+    ('Teams', [('TeamID', '[int] IDENTITY(1,1) NOT NULL'),
+               ('TeamName', '[nvarchar](max) NULL')], 'TeamID'),
+    ('TemplateItems', [('ItemID', '[int] IDENTITY(1,1) NOT NULL'),
+                       ('TemplateID', '[int] NOT NULL'),
+                       ('Category', '[nvarchar](max) NULL'),
+                       ('SubCategory', '[nvarchar](max) NULL'),
+                       ('Description', '[nvarchar](max) NULL'),
+                       ('DisplayOrder', '[int] NOT NULL')], 'ItemID'),
+    ('Users', [('UserID', '[int] IDENTITY(1,1) NOT NULL'),
+               ('UserName', '[nvarchar](max) NULL'),
+               ('TeamID', '[int] NOT NULL')], 'UserID'),
+]
+
+# (테이블, 컬럼, 참조 테이블, 참조 컬럼, ON DELETE CASCADE 여부)
+FOREIGN_KEYS = [
+    ('ChecklistTemplates', 'TeamID', 'Teams', 'TeamID', True),
+    ('DailyReports', 'TeamID', 'Teams', 'TeamID', True),
+    ('ReportDetails', 'ReportID', 'DailyReports', 'ReportID', True),
+    ('ReportDetails', 'ItemID', 'TemplateItems', 'ItemID', False),
+    ('ReportSignatures', 'ReportID', 'DailyReports', 'ReportID', True),
+    ('ReportSignatures', 'UserID', 'Users', 'UserID', False),
+    ('TemplateItems', 'TemplateID', 'ChecklistTemplates', 'TemplateID', True),
+    ('Users', 'TeamID', 'Teams', 'TeamID', False),
+]
+
+TEAM_NAMES = ['조립 전기라인', '제관라인', '가공라인', '연구소', '지재/부품/출하', '서비스', '품질',
+              '인사총무팀', '생산기술팀']
+CATEGORIES = ['TBM 점검', '관리 감독자 일일 안전 점검', '위험성 평가']
+SUB_CATEGORIES = ['건강/복장/보호구', '중량물취급작업 크레인', '전기 작업', '지게차 (운반)', '용접·절단']
+DESCRIPTIONS = [
+    '건강상태',
+    '작업 전 안전모; 안전화 착용 확인',
+    '주행로 상측 및 트롤리가 횡행하는 레일, 와이어 통하는 곳의 상태',
+    "작업자 '안전 구호' 제창 (매일)",
+    '비상정지 장치 작동 확인\r\n- 작업 전 1회\r\n- 점심 후 1회',
+    '분전반 잠금(LOTO) 및 "위험" 표지 부착',
+]
+REMARKS = ['특이사항 없음', "공구 정리 필요; '3번' 라인 조명 교체", '우천으로 외부 작업 중지\r\n실내 작업으로 대체', None]
+CHECK_STATES = ['O', 'X', '△', None]
+FAMILY = '김이박최정강조윤장임'
+GIVEN = ['민준', '서연', '도윤', '지우', '하준', '서윤', '은우', '지민', '길동']
+
+PNG_HEADER = bytes.fromhex('89504E470D0A1A0A0000000D49484452')
+
+
+def n(text):
+    """T-SQL N'...' 리터럴 (NULL 은 NULL)"""
+    if text is None:
+        return 'NULL'
+    return "N'" + text.replace("'", "''") + "'"
+
+
+def datetime2(ts):
+    return "CAST(N'" + time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)) + f".{int(ts * 1e7) % 10000000:07d}' AS DateTime2)"
+
+
+def write_ddl(out):
+    out.write('USE [master]\r\nGO\r\n')
+    out.write(f'/****** Object:  Database [TbmDb]    Script Date: {SCRIPT_DATE} ******/\r\n')
+    out.write('CREATE DATABASE [TbmDb]\r\n CONTAINMENT = NONE\r\nGO\r\n')
+    out.write('ALTER DATABASE [TbmDb] SET COMPATIBILITY_LEVEL = 150\r\nGO\r\n')
+    out.write('USE [TbmDb]\r\nGO\r\n')
+    for table, columns, pk in TABLES:
+        out.write(f'/****** Object:  Table [dbo].[{table}]    Script Date: {SCRIPT_DATE} ******/\r\n')
+        out.write('SET ANSI_NULLS ON\r\nGO\r\nSET QUOTED_IDENTIFIER ON\r\nGO\r\n')
+        out.write(f'CREATE TABLE [dbo].[{table}](\r\n')
+        for name, decl in columns:
+            out.write(f'\t[{name}] {decl},\r\n')
+        out.write(f' CONSTRAINT [PK_{table}] PRIMARY KEY CLUSTERED \r\n(\r\n\t[{pk}] ASC\r\n){WITH_PK}\r\n')
+        textimage = ' TEXTIMAGE_ON [PRIMARY]' if any('max' in d for _, d in columns) else ''
+        out.write(f') ON [PRIMARY]{textimage}\r\nGO\r\n')
+
+
+def write_rows(out, table, columns, rows, identity=True):
+    """한 테이블의 INSERT 블록 (SSMS 처럼 테이블 전체가 GO 배치 하나)"""
+    head = f"INSERT [dbo].[{table}] ({', '.join(f'[{c}]' for c, _ in columns)}) VALUES ("
+    if identity:
+        out.write(f'SET IDENTITY_INSERT [dbo].[{table}] ON \r\n\r\n')
+    count = 0
+    for values in rows:
+        out.write(head + ', '.join(values) + ')\r\n')
+        count += 1
+    if identity:
+        out.write(f'SET IDENTITY_INSERT [dbo].[{table}] OFF\r\n')
+    out.write('GO\r\n')
+    return count
+
+
+def write_constraints(out):
+    for table, columns, pk in TABLES:
+        for column, _ in columns[1:]:
+            if column.endswith('ID') and column != pk:
+                out.write(f'/****** Object:  Index [IX_{table}_{column}]    Script Date: {SCRIPT_DATE} ******/\r\n')
+                out.write(f'CREATE NONCLUSTERED INDEX [IX_{table}_{column}] ON [dbo].[{table}]\r\n'
+                          f'(\r\n\t[{column}] ASC\r\n){WITH_INDEX}\r\nGO\r\n')
+    out.write('ALTER TABLE [dbo].[TemplateItems] ADD  DEFAULT ((0)) FOR [DisplayOrder]\r\nGO\r\n')
+    for table, column, ref_table, ref_column, cascade in FOREIGN_KEYS:
+        name = f'FK_{table}_{ref_table}_{column}'
+        out.write(f'ALTER TABLE [dbo].[{table}]  WITH CHECK ADD  CONSTRAINT [{name}] FOREIGN KEY([{column}])\r\n'
+                  f'REFERENCES [dbo].[{ref_table}] ([{ref_column}])\r\n')
+        if cascade:
+            out.write('ON DELETE CASCADE\r\n')
+        out.write(f'GO\r\nALTER TABLE [dbo].[{table}] CHECK CONSTRAINT [{name}]\r\nGO\r\n')
+    out.write('USE [master]\r\nGO\r\nALTER DATABASE [TbmDb] SET  READ_WRITE \r\nGO\r\n')
+
+
+def generate(path, teams=9, users_per_team=6, items_per_template=25, reports=1000,
+             signatures_per_report=3, signature_kb=4, seed=1):
+    """덤프를 생성하고 테이블별 행 수를 돌려줌"""
+    rng = random.Random(seed)
+    columns = {table: cols for table, cols, _ in TABLES}
+    counts = {}
+    start_ts = 1757980800.0  # 2025-09-16
+
+    with open(path, 'w', encoding='utf-16-le', newline='') as out:
+        out.write('\ufeff')  # BOM
+        write_ddl(out)
+
+        counts['__EFMigrationsHistory'] = write_rows(out, '__EFMigrationsHistory', columns['__EFMigrationsHistory'], [
+            [n('20250915065334_InitialCreate'), n('9.0.9')],
+            [n('20250915075219_AddDisplayOrderToTemplateItems'), n('9.0.9')],
+        ], identity=False)
+
+        def team_name(t):
+            base = TEAM_NAMES[(t - 1) % len(TEAM_NAMES)]
+            return base if t <= len(TEAM_NAMES) else f'{base} {t}'
+
+        counts['ChecklistTemplates'] = write_rows(out, 'ChecklistTemplates', columns['ChecklistTemplates'], (
+            [str(t), n(f'{team_name(t)} 일일 안전점검'), str(t)] for t in range(1, teams + 1)))
+
+        def report_rows():
+            for r in range(1, reports + 1):
+                ts = start_ts + r * 86400 / max(teams, 1) + rng.random() * 3600
+                yield [str(r), str((r - 1) % teams + 1), datetime2(ts),
+                       n(rng.choice(FAMILY) + rng.choice(GIVEN)), n(rng.choice(REMARKS))]
+
+        counts['DailyReports'] = write_rows(out, 'DailyReports', columns['DailyReports'], report_rows())
+
+        def detail_rows():
+            detail_id = 0
+            for r in range(1, reports + 1):
+                team = (r - 1) % teams + 1
+                first_item = (team - 1) * items_per_template + 1
+                for item in range(first_item, first_item + items_per_template):
+                    detail_id += 1
+                    yield [str(detail_id), str(r), str(item), n(rng.choice(CHECK_STATES))]
+
+        counts['ReportDetails'] = write_rows(out, 'ReportDetails', columns['ReportDetails'], detail_rows())
+
+        def signature_rows():
+            signature_id = 0
+            size = max(signature_kb * 1024 - len(PNG_HEADER), 0)
+            for r in range(1, reports + 1):
+                team = (r - 1) % teams + 1
+                for s in range(signatures_per_report):
+                    signature_id += 1
+                    user = (team - 1) * users_per_team + s % users_per_team + 1
+                    image = '0x' + (PNG_HEADER + rng.randbytes(size)).hex().upper()
+                    ts = start_ts + r * 86400 / max(teams, 1) + 3600 + s * 60
+                    yield [str(signature_id), str(r), str(user), image, datetime2(ts)]
+
+        counts['ReportSignatures'] = write_rows(out, 'ReportSignatures', columns['ReportSignatures'],
+                                                signature_rows())
+
+        counts['Teams'] = write_rows(out, 'Teams', columns['Teams'], (
+            [str(t), n(team_name(t))] for t in range(1, teams + 1)))
+
+        def item_rows():
+            item_id = 0
+            for t in range(1, teams + 1):
+                for i in range(items_per_template):
+                    item_id += 1
+                    yield [str(item_id), str(t), n(CATEGORIES[i % len(CATEGORIES)]),
+                           n(rng.choice(SUB_CATEGORIES)), n(rng.choice(DESCRIPTIONS)), str((i + 1) * 10)]
+
+        counts['TemplateItems'] = write_rows(out, 'TemplateItems', columns['TemplateItems'], item_rows())
+
+        counts['Users'] = write_rows(out, 'Users', columns['Users'], (
+            [str(u), n(rng.choice(FAMILY) + rng.choice(GIVEN)), str((u - 1) // users_per_team + 1)]
+            for u in range(1, teams * users_per_team + 1)))
+
+        write_constraints(out)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SSMS 형식 대용량 TBM 테스트 덤프 생성')
+    parser.add_argument('-o', '--output', default=os.path.join(tempfile.gettempdir(), 'tbm_generated_dump.sql'))
+    parser.add_argument('--teams', type=int, default=9)
+    parser.add_argument('--users-per-team', type=int, default=6)
+    parser.add_argument('--items-per-template', type=int, default=25)
+    parser.add_argument('--reports', type=int, default=1000, help='DailyReports 행 수')
+    parser.add_argument('--signatures-per-report', type=int, default=3)
+    parser.add_argument('--signature-kb', type=int, default=4, help='서명 이미지 크기 (KB)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.output, args.teams, args.users_per_team, args.items_per_template,
+                      args.reports, args.signatures_per_report, args.signature_kb, args.seed)
+    size = os.path.getsize(args.output)
+    print(f"✅ 생성 완료: {args.output} ({size / 1e6:.1f} MB, {time.perf_counter() - started:.1f}초)")
+    print(f"📝 총 {sum(counts.values())} 개의 INSERT 문")
+    for table, count in counts.items():
+        print(f"   - {table}: {count}개")
+
+
+if __name__ == '__main__':
+    main()
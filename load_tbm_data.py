@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""SQL Server 덤프를 변환해 PostgreSQL 에 바로 적재 (COPY)
+
+덤프의 ALTER TABLE ... FOREIGN KEY 문으로 테이블 의존성 그래프를 만들고,
+서로 참조하지 않는 테이블끼리는 연결 풀을 써서 동시에 COPY 한다.
+모든 단계가 끝나면 setval 로 시퀀스를 맞춘다.
+
+--defer-constraints 면 적재 전에 FK 와 보조 인덱스를 지우고 모든 테이블을
+한 번에 COPY 한 뒤, 인덱스 생성과 FK 검증(NOT VALID → VALIDATE CONSTRAINT)을
+연결 여러 개로 동시에 돌린다 (pg_ddl). --create-tables 는 덤프의 CREATE TABLE 로
+빈 데이터베이스에 테이블부터 만든다.
+
+사용법: python load_tbm_data.py [덤프] --dsn postgresql://... [-j 4] [--truncate] [--defer-constraints]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psycopg2
+    import psycopg2.pool
+except ImportError:  # 변환만 쓰는 환경에서는 없어도 됨
+    psycopg2 = None
+
+from final_sql_convert import convert_dump, load_order
+from pg_ddl import NAMINGS, DeferredDdl
+from pg_formats import CopyFormat, copy_statement
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from sql_table_writer import LOAD_ORDER, TableSpoolWriter, sequence_reset_sql
+from tbm_schema import DumpSchema
+from tsql_lexer import quote_ident
+
+
+def copy_table(pool, writer, table):
+    """스풀 하나를 COPY FROM STDIN 으로 흘려보냄 (연결 풀에서 연결 하나 사용)"""
+    started = time.perf_counter()
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(copy_statement(table, writer.columns[table]), writer.open_table(table))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+    return table, time.perf_counter() - started
+
+
+def run_sql(pool, sql):
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+        conn.commit()
+    finally:
+        pool.putconn(conn)
+
+
+def rebuild_constraints(pool, deferred, connections, primary_keys=False):
+    """적재 후 단계: PK/인덱스 생성과 FK 검증은 동시에, NOT VALID FK 추가는 차례로"""
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        for label, statements, parallel in deferred.rebuild(primary_keys):
+            if not statements:
+                continue
+            started = time.perf_counter()
+            if parallel:
+                list(executor.map(lambda sql: run_sql(pool, sql), statements))
+            else:
+                run_sql(pool, ''.join(statements))
+            print(f"🔧 {label}: {len(statements)}개 ({time.perf_counter() - started:.2f}초)")
+
+
+def load_waves(pool, writer, waves, connections):
+    """단계(wave)마다 테이블을 동시에 적재, 단계 사이는 순차"""
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        for i, wave in enumerate(waves, 1):
+            tables = [t for t in wave if writer.counts.get(t)]
+            if not tables:
+                continue
+            print(f"🚚 {i}단계: {', '.join(tables)}")
+            for table, elapsed in executor.map(lambda t: copy_table(pool, writer, t), tables):
+                print(f"   - {table}: {writer.counts[table]}개 ({elapsed:.2f}초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL Server 덤프 → PostgreSQL 직접 적재 (COPY)')
+    parser.add_argument('input', nargs='?', default='attached_assets/script1_1760403229620.sql')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help='PostgreSQL 접속 문자열 (기본: DATABASE_URL 환경 변수)')
+    parser.add_argument('-c', '--connections', type=int, default=4, help='동시 COPY 연결 수')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='변환 프로세스 수 (0 이면 CPU 코어 수)')
+    parser.add_argument('--mmap', action='store_true', help='덤프를 mmap 으로 스캔 (대상 테이블 문장만 디코딩)')
+    parser.add_argument('--truncate', action='store_true', help='적재 전에 대상 테이블을 비움')
+    parser.add_argument('--defer-constraints', action='store_true',
+                        help='FK/보조 인덱스를 지우고 적재한 뒤 동시에 다시 만듦 (FK 는 NOT VALID → VALIDATE)')
+    parser.add_argument('--create-tables', action='store_true',
+                        help='덤프의 CREATE TABLE 로 테이블을 만들고 PK 도 적재 후에 만듦 '
+                             '(빈 데이터베이스용, --defer-constraints 포함)')
+    parser.add_argument('--constraint-names', choices=NAMINGS, default='prisma',
+                        help='지우고 다시 만드는 제약/인덱스 이름 규칙')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='Prisma 필드가 String 인 varbinary 컬럼을 base64 로 넣기 위해 읽을 schema.prisma')
+    args = parser.parse_args()
+
+    if psycopg2 is None:
+        parser.error('psycopg2 가 필요합니다: pip install psycopg2-binary')
+    if not args.dsn:
+        parser.error('--dsn 또는 DATABASE_URL 이 필요합니다')
+    jobs = args.jobs or os.cpu_count() or 1
+
+    # 덤프의 CREATE TABLE 로 컬럼 타입을 먼저 읽어 타입별 변환에 씀
+    schema = DumpSchema.scan(args.input)
+    text_binary = load_text_binaries(schema, args.prisma_schema)
+    fmt = CopyFormat(blocks=False)
+    fmt.use_schema(schema, text_binary)
+
+    with TableSpoolWriter(LOAD_ORDER, header=None, fmt=fmt) as writer:
+        # 1. 변환: 테이블별 COPY 행 스풀 + 덤프의 FK 정보 수집
+        convert_dump(args.input, writer, jobs, schema, mapped=args.mmap)
+        order = load_order(schema)
+        deferred = None
+        if args.defer_constraints or args.create_tables:
+            deferred = DeferredDdl(schema, order, args.constraint_names, text_binary)
+            # FK 가 없는 동안은 모든 테이블을 한 단계에서 동시에 적재
+            waves = [order]
+        else:
+            waves = schema.waves(order, order_hint=LOAD_ORDER)
+        writer.finish()
+        print(f"📝 변환 완료: {writer.total()}개 행, FK {len(schema.foreign_keys)}개")
+
+        pool = psycopg2.pool.ThreadedConnectionPool(1, args.connections, args.dsn)
+        try:
+            if args.create_tables:
+                run_sql(pool, ''.join(deferred.create_tables()))
+                print(f"📁 테이블 {len(deferred.tables)}개 생성")
+            elif args.truncate:
+                tables = ', '.join(quote_ident(t) for t in order)
+                run_sql(pool, f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+            if deferred is not None and not args.create_tables:
+                run_sql(pool, ''.join(deferred.drop()))
+                print(f"🔧 FK {len(deferred.foreign_keys)}개, 인덱스 {len(deferred.indexes)}개 삭제")
+
+            # 2. FK 단계별 동시 적재
+            load_waves(pool, writer, waves, args.connections)
+
+            # 3. 인덱스/FK 재생성 + 시퀀스 리셋
+            if deferred is not None:
+                rebuild_constraints(pool, deferred, args.connections, primary_keys=args.create_tables)
+            run_sql(pool, sequence_reset_sql(order, schema.identity_columns()))
+        finally:
+            pool.closeall()
+
+    print("✅ 적재 완료")
+
+
+if __name__ == '__main__':
+    main()
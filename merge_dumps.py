@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""여러 SSMS 덤프(현장/날짜별 내보내기)를 PK 중복 없이 하나의 적재 파일로 합치기
+
+1. 덤프마다 오프셋 색인(dump_index, '<덤프>.idx')과 DDL 을 프로세스 풀에서
+   동시에 읽는다 (색인이 이미 있으면 다시 만들지 않음).
+2. 색인의 (테이블, PK) 로 채택할 행을 고른다. 표는 테이블마다
+   {PK: (덤프 번호 << 32) | 덤프 안 행 번호} 로 int 하나씩만 둔다.
+   --keep last 면 나중 덤프(같은 덤프 안에서는 나중 행)가, first 면 먼저 나온 행이 남는다.
+3. 채택된 행만 mmap 에서 디코딩해 final_sql_convert 와 같은 변환/출력
+   경로(-j 병렬 변환, 테이블별 스풀, FK 순서, 시퀀스 리셋)로 내보낸다.
+
+사용법:
+  python merge_dumps.py 'attached_assets/*.sql' -o FoodieMatch/merged_tbm_data.sql
+  python merge_dumps.py site_a.sql site_b.sql --keep first --format copy -j 4
+"""
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from compressed_io import compression_of, open_output
+from dump_index import DumpIndex
+from final_sql_convert import convert_chunks, load_order, target_tables
+from pg_formats import FORMATS, make_format
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from sql_dump_reader import MappedDump
+from sql_table_writer import ID_COLUMNS, LOAD_ORDER, TableSpoolWriter, sequence_reset_sql
+from tbm_schema import DumpSchema
+
+_ROW_BITS = 32
+_ROW_MASK = (1 << _ROW_BITS) - 1
+
+
+def expand_inputs(patterns):
+    """glob 패턴들 → 덤프 경로 목록 (패턴 순서, 패턴 안에서는 이름 순, 중복 제거)"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+        for path in matches:
+            if path.endswith('.idx') or path in paths:
+                continue
+            paths.append(path)
+    return paths
+
+
+def scan_dump(path):
+    """덤프 하나의 색인과 DDL (워커 프로세스에서 실행)"""
+    return DumpIndex.open(path), DumpSchema.scan(path)
+
+
+def choose_rows(indexes, tables, keep='last'):
+    """테이블별 {PK: 덤프 번호/행 번호를 묶은 int} 와 테이블별 중복 행 수
+
+    IDENTITY 컬럼이 없는 테이블은 색인의 PK 가 덤프 안 행 번호라
+    중복을 판단할 수 없으므로 모든 행을 남긴다.
+    """
+    wanted = set(tables)
+    chosen = {}
+    duplicates = {}
+    for d, index in enumerate(indexes):
+        for i, (table_id, pk) in enumerate(zip(index.table_ids, index.pks)):
+            table = index.tables[table_id]
+            if table not in wanted:
+                continue
+            rows = chosen.get(table)
+            if rows is None:
+                rows = chosen[table] = {}
+                duplicates[table] = 0
+            if table not in ID_COLUMNS:
+                pk = (d, pk)
+            if pk in rows:
+                duplicates[table] += 1
+                if keep == 'first':
+                    continue
+            rows[pk] = (d << _ROW_BITS) | i
+    return chosen, duplicates
+
+
+def iter_merged_chunks(indexes, chosen, tables, max_statements=2000):
+    """채택된 행을 테이블 순서 → 덤프 순서 → 파일 순서로 디코딩해 묶음으로 생성"""
+    dumps = {}
+    try:
+        for table in tables:
+            rows = chosen.get(table)
+            if not rows:
+                continue
+            chunk = []
+            for packed in sorted(rows.values()):
+                d, i = packed >> _ROW_BITS, packed & _ROW_MASK
+                dump = dumps.get(d)
+                if dump is None:
+                    dump = dumps[d] = MappedDump(indexes[d].source)
+                chunk.append(dump.decode(indexes[d].offsets[i], indexes[d].lengths[i]))
+                if len(chunk) >= max_statements:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+    finally:
+        for dump in dumps.values():
+            dump.close()
+
+
+def check_schemas(paths, schemas):
+    """덤프마다 테이블 컬럼 구성이 다르면 경고 (첫 덤프의 정의로 변환)"""
+    first = schemas[0]
+    for path, schema in zip(paths[1:], schemas[1:]):
+        for name, table_def in schema.tables.items():
+            base = first.tables.get(name)
+            if base is None:
+                continue
+            if [c.name for c in base.columns] != [c.name for c in table_def.columns]:
+                print(f"⚠️  {path}: {name} 컬럼 구성이 {paths[0]} 와 다릅니다")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='여러 SQL Server 덤프 → 중복 없는 PostgreSQL 적재 파일')
+    parser.add_argument('inputs', nargs='*', default=['attached_assets/*.sql'],
+                        help='덤프 경로 또는 glob 패턴 (기본: attached_assets/*.sql)')
+    parser.add_argument('-o', '--output', default='FoodieMatch/merged_tbm_data.sql')
+    parser.add_argument('--keep', choices=('last', 'first'), default='last',
+                        help='같은 PK 가 여러 번 나오면 남길 행 (last: 나중 덤프, first: 먼저 나온 덤프)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='insert')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='Prisma 필드가 String 인 varbinary 컬럼을 base64 로 쓰기 위해 읽을 schema.prisma')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='색인/변환 프로세스 수 (0 이면 CPU 코어 수)')
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        sys.exit(f"❌ 덤프를 찾을 수 없습니다: {' '.join(args.inputs)}")
+    compressed = [path for path in paths if compression_of(path)]
+    if compressed:
+        # 색인/mmap 으로 행을 골라 읽으므로 임의 접근이 되는 파일이어야 함
+        sys.exit(f"❌ 압축된 덤프는 병합할 수 없습니다 (먼저 압축을 풀 것): {' '.join(compressed)}")
+    print(f"📁 덤프 {len(paths)}개")
+
+    # 1. 덤프별 색인 + DDL (동시에)
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            scanned = list(pool.map(scan_dump, paths))
+    else:
+        scanned = [scan_dump(path) for path in paths]
+    indexes = [index for index, _ in scanned]
+    schemas = [schema for _, schema in scanned]
+    for path, index in zip(paths, indexes):
+        print(f"   - {path}: {len(index)}개 문장")
+    check_schemas(paths, schemas)
+    schema = schemas[0]
+
+    # 2. PK 기준 중복 제거
+    chosen, duplicates = choose_rows(indexes, target_tables, args.keep)
+
+    # 3. 채택된 행만 변환
+    fmt = make_format(args.format)
+    fmt.use_schema(schema, load_text_binaries(schema, args.prisma_schema))
+    order = load_order(schema)
+    with TableSpoolWriter(LOAD_ORDER, fmt=fmt) as writer:
+        convert_chunks(iter_merged_chunks(indexes, chosen, order), writer, jobs)
+        writer.table_order = order
+        with open_output(args.output) as f:
+            writer.write_to(f)
+            f.write('\n-- Reset sequences\n')
+            f.write(sequence_reset_sql(writer.table_order, schema.identity_columns()))
+
+        print(f"✅ 병합 완료: {args.output}")
+        print(f"📝 총 {writer.total()} 개의 행 생성 ({args.format}, 중복 {sum(duplicates.values())}개 제외)")
+        for table in writer.tables():
+            print(f"   - {table}: {writer.counts[table]}개 (중복 {duplicates.get(table, 0)}개)")
+
+
+if __name__ == '__main__':
+    main()
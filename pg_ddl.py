@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""덤프의 DDL(tbm_schema.DumpSchema) → PostgreSQL DDL, 적재 전후 단계로 나누기
+
+행마다 FK 검사와 인덱스 갱신을 하지 않도록 대량 적재를 세 단계로 나눈다.
+
+1. 적재 전: FK 와 보조 인덱스를 지움 (--create-tables 면 PK 없이 테이블 생성)
+2. 적재: COPY/INSERT 만 (제약이 없으니 모든 테이블을 한 번에 넣어도 됨)
+3. 적재 후: PK/인덱스를 다시 만들고, FK 는 NOT VALID 로 붙인 뒤
+   VALIDATE CONSTRAINT 로 한 번에 검사, 마지막에 시퀀스 리셋
+
+제약 이름은 Prisma 가 만드는 이름(Teams_pkey, Users_TeamID_fkey,
+Users_TeamID_idx)을 기본으로 써서 prisma db push 로 만든 테이블의 객체를
+그대로 지우고 되살린다. naming='dump' 면 덤프의 이름(PK_Teams,
+FK_Users_Teams_TeamID, IX_Users_TeamID)을 쓴다.
+"""
+import re
+
+from sql_table_writer import sequence_reset_sql
+from tsql_lexer import quote_ident
+
+NAMINGS = ('prisma', 'dump')
+
+# T-SQL 타입 → PostgreSQL 타입 (크기를 따르지 않는 것만)
+PG_TYPES = {
+    'int': 'integer', 'bigint': 'bigint', 'smallint': 'smallint', 'tinyint': 'smallint',
+    'bit': 'boolean', 'float': 'double precision', 'real': 'real',
+    'money': 'numeric(19,4)', 'smallmoney': 'numeric(10,4)',
+    'datetime': 'timestamp(3)', 'smalldatetime': 'timestamp(0)', 'date': 'date',
+    'varbinary': 'bytea', 'binary': 'bytea', 'image': 'bytea',
+    'ntext': 'text', 'text': 'text', 'xml': 'xml', 'uniqueidentifier': 'uuid',
+}
+
+# T-SQL 기본값 함수 → PostgreSQL
+_DEFAULT_FUNCTIONS = {
+    'getdate()': 'CURRENT_TIMESTAMP', 'sysdatetime()': 'CURRENT_TIMESTAMP',
+    'getutcdate()': "(now() AT TIME ZONE 'utc')", 'sysutcdatetime()': "(now() AT TIME ZONE 'utc')",
+    'sysdatetimeoffset()': 'CURRENT_TIMESTAMP', 'newid()': 'gen_random_uuid()',
+}
+# rebuild() 단계별 출력 파일 주석
+_STEP_COMMENTS = ('Rebuild primary keys and indexes', 'Add foreign keys without checking rows',
+                  'Validate foreign keys')
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?$")
+
+
+def pg_type(column):
+    """Column → PostgreSQL 타입 (nvarchar(max) → text, datetime2(7) → timestamp(6) 등)"""
+    sql_type = column.type
+    size = column.size
+    if sql_type in ('nvarchar', 'varchar', 'nchar', 'char'):
+        if size is None or size.lower() == 'max':
+            return 'text'
+        return f"{'varchar' if 'var' in sql_type else 'char'}({size})"
+    if sql_type in ('decimal', 'numeric'):
+        if size is None:
+            return 'numeric'
+        return f"numeric({size},{column.scale or 0})"
+    if sql_type in ('datetime2', 'time', 'datetimeoffset'):
+        base = {'datetime2': 'timestamp', 'time': 'time', 'datetimeoffset': 'timestamptz'}[sql_type]
+        # PostgreSQL 은 마이크로초(6자리)까지
+        return f"{base}({min(int(size), 6)})" if size and size.isdigit() else base
+    return PG_TYPES.get(sql_type, 'text')
+
+
+def pg_default(column, expr):
+    """ALTER TABLE ... DEFAULT 의 T-SQL 식 → PostgreSQL 식 (옮길 수 없으면 None)"""
+    expr = expr.strip()
+    while expr.startswith('(') and expr.endswith(')'):
+        expr = expr[1:-1].strip()
+    lowered = expr.lower()
+    if lowered in _DEFAULT_FUNCTIONS:
+        return _DEFAULT_FUNCTIONS[lowered]
+    if _NUMBER_RE.match(expr):
+        if column.kind == 'boolean':
+            return 'true' if expr != '0' else 'false'
+        return expr
+    if expr[:2].upper() == "N'":
+        expr = expr[1:]
+    if expr.startswith("'") and expr.endswith("'"):
+        return expr
+    return None
+
+
+def _column_list(columns):
+    return ', '.join(quote_ident(c) for c in columns)
+
+
+def create_table_sql(table_def, defaults=None, text_columns=()):
+    """CREATE TABLE (PK 없이: PK 는 적재 후 DeferredDdl.rebuild 에서 붙임)
+
+    IDENTITY 컬럼은 GENERATED BY DEFAULT AS IDENTITY 로 만들어 덤프의 ID 를
+    그대로 넣을 수 있고 pg_get_serial_sequence 로 시퀀스를 찾을 수 있게 한다.
+    text_columns 의 컬럼은 Prisma 처럼 text 로 만든다 (base64 로 넣는 varbinary).
+    """
+    defaults = defaults or {}
+    lines = []
+    for column in table_def.columns:
+        sql_type = 'text' if column.name in text_columns else pg_type(column)
+        line = f"    {quote_ident(column.name)} {sql_type}"
+        if column.identity:
+            line += ' GENERATED BY DEFAULT AS IDENTITY'
+        else:
+            default = column.name in defaults and pg_default(column, defaults[column.name])
+            if default:
+                line += f' DEFAULT {default}'
+        if not column.nullable:
+            line += ' NOT NULL'
+        lines.append(line)
+    return f"CREATE TABLE {quote_ident(table_def.name)} (\n" + ',\n'.join(lines) + '\n);\n'
+
+
+class DeferredDdl:
+    """적재 대상 테이블의 PK/FK/인덱스를 적재 전에 지우고 적재 후에 다시 만드는 DDL
+
+    tables 밖의 테이블을 가리키는 FK 는 건드리지 않는다.
+    text_binary 는 pg_formats 의 use_schema() 와 같은 {테이블: (컬럼, ...)} 이다.
+    """
+
+    def __init__(self, schema, tables, naming='prisma', text_binary=None):
+        if naming not in NAMINGS:
+            raise ValueError(f'알 수 없는 이름 규칙: {naming} ({", ".join(NAMINGS)})')
+        self.schema = schema
+        self.naming = naming
+        self.text_binary = text_binary or {}
+        self.tables = [t for t in tables if t in schema.tables]
+        scope = set(self.tables)
+        self.foreign_keys = [fk for fk in schema.foreign_keys if fk.table in scope and fk.ref_table in scope]
+        self.indexes = [index for index in schema.indexes if index.table in scope]
+
+    def pk_name(self, table_def):
+        if self.naming == 'dump' and table_def.pk_name:
+            return table_def.pk_name
+        return f"{table_def.name}_pkey"
+
+    def fk_name(self, fk):
+        if self.naming == 'dump':
+            return fk.name
+        return f"{fk.table}_{'_'.join(fk.columns)}_fkey"
+
+    def index_name(self, index):
+        if self.naming == 'dump':
+            return index.name
+        return f"{index.table}_{'_'.join(index.columns)}_{'key' if index.unique else 'idx'}"
+
+    def create_tables(self):
+        return [create_table_sql(self.schema.tables[t], self.schema.defaults.get(t), self.text_binary.get(t, ()))
+                for t in self.tables]
+
+    def drop(self):
+        """적재 전 단계: FK → 보조 인덱스 순으로 지우는 문장들 (PK 는 남겨 둠)"""
+        statements = [f"ALTER TABLE {quote_ident(fk.table)} DROP CONSTRAINT IF EXISTS "
+                      f"{quote_ident(self.fk_name(fk))};\n" for fk in self.foreign_keys]
+        statements += [f"DROP INDEX IF EXISTS {quote_ident(self.index_name(index))};\n"
+                       for index in self.indexes]
+        return statements
+
+    def rebuild(self, primary_keys=False):
+        """적재 후 단계들: [(이름, 문장 목록, 동시 실행 가능 여부)]
+
+        primary_keys 면 PK 도 만든다 (create_tables() 로 PK 없이 만든 경우).
+        PK/인덱스 생성과 FK 검증은 테이블끼리 독립이라 연결 여러 개로 동시에
+        돌릴 수 있다. NOT VALID FK 추가는 테이블을 스캔하지 않아 금방 끝나지만
+        부모 테이블 잠금이 겹치므로 차례로 실행한다.
+        """
+        keys = []
+        if primary_keys:
+            for t in self.tables:
+                table_def = self.schema.tables[t]
+                if table_def.primary_key:
+                    keys.append(f"ALTER TABLE {quote_ident(t)} ADD CONSTRAINT "
+                                f"{quote_ident(self.pk_name(table_def))} PRIMARY KEY ({_column_list(table_def.primary_key)});\n")
+        for index in self.indexes:
+            include = f" INCLUDE ({_column_list(index.include)})" if index.include else ''
+            keys.append(f"CREATE {'UNIQUE ' if index.unique else ''}INDEX IF NOT EXISTS "
+                        f"{quote_ident(self.index_name(index))} ON {quote_ident(index.table)} "
+                        f"({_column_list(index.columns)}){include};\n")
+        add = []
+        validate = []
+        for fk in self.foreign_keys:
+            name = quote_ident(self.fk_name(fk))
+            on_delete = f" ON DELETE {' '.join(fk.on_delete.upper().split())}" if fk.on_delete else ''
+            add.append(f"ALTER TABLE {quote_ident(fk.table)} ADD CONSTRAINT {name} "
+                       f"FOREIGN KEY ({_column_list(fk.columns)}) REFERENCES {quote_ident(fk.ref_table)} "
+                       f"({_column_list(fk.ref_columns)}){on_delete} NOT VALID;\n")
+            validate.append(f"ALTER TABLE {quote_ident(fk.table)} VALIDATE CONSTRAINT {name};\n")
+        return [('PK/인덱스', keys, True), ('FK 추가', add, False), ('FK 검증', validate, True)]
+
+    def pre_load_sql(self, create_tables=False):
+        """출력 파일의 적재 전 부분 (새 테이블 생성, 아니면 기존 FK/인덱스 삭제)"""
+        if create_tables:
+            return '-- Create tables (keys and indexes are built after the load)\n' + ''.join(self.create_tables())
+        return '-- Drop foreign keys and secondary indexes before the bulk load\n' + ''.join(self.drop())
+
+    def post_load_sql(self, create_tables=False, id_columns=None):
+        """출력 파일의 적재 후 부분 (PK/인덱스 → FK NOT VALID → VALIDATE → 시퀀스)"""
+        parts = []
+        steps = self.rebuild(primary_keys=create_tables)
+        for comment, (_, statements, _) in zip(_STEP_COMMENTS, steps):
+            if statements:
+                parts.append(f'\n-- {comment}\n')
+                parts.extend(statements)
+        parts.append('\n-- Reset sequences\n')
+        parts.append(sequence_reset_sql(self.tables, id_columns or self.schema.identity_columns()))
+        return ''.join(parts)
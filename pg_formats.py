@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""PostgreSQL 출력 형식 (INSERT 문 / 여러 행 INSERT 배치 / COPY 블록)
+
+각 형식은 두 부분으로 나뉜다.
+- convert(stmt, table): 문장 하나를 행 텍스트로 바꾸는 순수 함수 부분
+- begin/row/end: 테이블 블록의 머리/행/꼬리를 붙이는 부분 (출력기에서 호출)
+
+use_schema() 로 덤프의 CREATE TABLE 정보를 주면, 그 테이블의 행은 컬럼
+타입대로 한 번 디코딩(tbm_schema.decode_row)한 뒤 타입별 인코더로 바로
+출력한다 (bit → boolean, datetime2 → timestamp 등). DDL 이 없는 테이블은
+리터럴 모양으로 판단하는 예전 방식을 쓴다.
+Prisma 에서 String 인 varbinary 컬럼(서명 이미지)은 use_schema(text_binary=)
+로 받아 bytea 대신 base64 문자열로 쓴다.
+"""
+import base64
+import binascii
+import hashlib
+import os
+
+from sql_table_writer import ID_COLUMNS
+from tbm_schema import decode_row
+from tsql_lexer import Binary, Cast, bytea_literal, convert_statement, insert_columns, parse_insert, quote_ident
+
+# T-SQL 날짜 타입 (CAST 값이 이 타입이면 timestamp 텍스트로)
+DATETIME_TYPES = ('datetime2', 'datetime', 'smalldatetime', 'date', 'datetimeoffset')
+
+
+def timestamp_text(value):
+    """'2025-09-16T05:20:03.2400000' → '2025-09-16 05:20:03.2400000'
+
+    소수점 7자리는 PostgreSQL 이 마이크로초로 반올림해서 받는다.
+    """
+    return value.replace('T', ' ', 1)
+
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value):
+    """값 하나를 COPY text 형식 필드로"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, Binary):
+        # bytea hex 형식: \x.... (COPY 안에서는 백슬래시를 한 번 더 이스케이프)
+        return '\\\\x' + value
+    if isinstance(value, Cast):
+        if value.type in DATETIME_TYPES:
+            return timestamp_text(value.value).translate(_COPY_ESCAPES)
+        return value.value.translate(_COPY_ESCAPES)
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+def sql_literal(value, binary=bytea_literal):
+    """값 하나를 PostgreSQL SQL 리터럴로"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, Binary):
+        return binary(value)
+    if isinstance(value, Cast):
+        literal = "'" + value.value.replace("'", "''") + "'"
+        if value.type in DATETIME_TYPES:
+            return literal + '::timestamp'
+        return literal
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(value)
+
+
+def _copy_text(value):
+    return value.translate(_COPY_ESCAPES)
+
+
+def _copy_timestamp(value):
+    return timestamp_text(value).translate(_COPY_ESCAPES)
+
+
+def _sql_text(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def base64_text(hex_digits):
+    """0x 바이너리 리터럴의 16진수 부분 → base64 문자열 (Prisma String 컬럼용)"""
+    return base64.b64encode(binascii.unhexlify(hex_digits)).decode('ascii')
+
+
+def _sql_cast(pg_type):
+    return lambda value: _sql_text(value) + '::' + pg_type
+
+
+# 값 종류(tbm_schema.TYPE_KINDS) 별 인코더. NULL 은 인코더를 부르기 전에 처리한다.
+COPY_ENCODERS = {
+    'integer': str,
+    'numeric': str,
+    'boolean': lambda value: 't' if value else 'f',
+    'timestamp': _copy_timestamp,
+    'timestamptz': _copy_timestamp,
+    'date': _copy_text,
+    'time': _copy_text,
+    'bytea': lambda value: '\\\\x' + value,
+    'base64': base64_text,
+    'text': _copy_text,
+}
+
+SQL_ENCODERS = {
+    'integer': str,
+    'numeric': str,
+    'boolean': lambda value: 'TRUE' if value else 'FALSE',
+    'timestamp': _sql_cast('timestamp'),
+    'timestamptz': _sql_cast('timestamptz'),
+    'date': _sql_cast('date'),
+    'time': _sql_cast('time'),
+    'bytea': bytea_literal,
+    'base64': lambda value: "'" + base64_text(value) + "'",
+    'text': _sql_text,
+}
+
+
+# 이미지 매직 바이트 → 확장자
+_IMAGE_EXTENSIONS = (
+    (b'\x89PNG', '.png'),
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'GIF8', '.gif'),
+)
+
+
+class ImageSpill:
+    """바이너리 리터럴을 내용 주소(sha256) 파일로 빼내는 저장소
+
+    같은 서명 이미지는 한 번만 저장되고, SQL 값은
+    pg_read_binary_file('경로') 로 바뀐다 (서버에서 읽을 수 있는 경로여야 함).
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def store(self, hex_digits):
+        """16진수 문자열을 바이트로 풀어 저장하고 파일 경로를 돌려줌"""
+        data = binascii.unhexlify(hex_digits)
+        digest = hashlib.sha256(data).hexdigest()
+        head = data[:4]
+        ext = next((e for magic, e in _IMAGE_EXTENSIONS if head.startswith(magic)), '.bin')
+        path = os.path.join(self.directory, digest + ext)
+        if not os.path.exists(path):
+            # 병렬 변환에서도 안전하도록 임시 파일에 쓰고 rename
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return path
+
+    def literal(self, hex_digits):
+        path = self.store(hex_digits)
+        return "pg_read_binary_file('" + path.replace("'", "''") + "')"
+
+
+def on_conflict_sql(table, columns, key=None):
+    """upsert 절: ON CONFLICT (PK) DO UPDATE SET 나머지 컬럼 = EXCLUDED.컬럼"""
+    key = key or ID_COLUMNS.get(table)
+    updates = ', '.join(f'{quote_ident(c)} = EXCLUDED.{quote_ident(c)}' for c in columns if c != key)
+    if key not in columns or not updates:
+        return ' ON CONFLICT DO NOTHING'
+    return f' ON CONFLICT ({quote_ident(key)}) DO UPDATE SET {updates}'
+
+
+class InsertFormat:
+    """문장마다 INSERT INTO ... VALUES (...); 한 줄
+
+    upsert=True 면 문장 끝에 ON CONFLICT (PK) DO UPDATE 를 붙인다.
+    테이블 이름 목록을 주면 그 테이블에만 붙인다 (델타 변환의 참조 테이블).
+    """
+
+    name = 'insert'
+    null = 'NULL'
+
+    def __init__(self, spill=None, upsert=False):
+        self.spill = spill
+        self.upsert = upsert if isinstance(upsert, bool) else tuple(sorted(upsert))
+        self._binary = spill.literal if spill else bytea_literal
+        self.encoders = dict(SQL_ENCODERS, bytea=self._binary)
+        self.tables = {}
+        self.text_binary = {}
+        self._conflict = {}
+        self._typed = {}
+
+    def use_schema(self, schema, text_binary=None):
+        """덤프 DDL 의 테이블 정의를 써서 타입대로 변환
+
+        text_binary({테이블: (컬럼, ...)}, IdentifierMap.text_binaries) 의 컬럼은 base64 문자열로 쓴다.
+        """
+        self.tables = dict(schema.tables)
+        self.text_binary = {t: tuple(c) for t, c in (text_binary or {}).items()}
+        self._typed.clear()
+
+    def signature(self):
+        """convert() 결과를 좌우하는 옵션 (변환 결과 캐시 키에 씀)"""
+        return (self.name, self.upsert, self.spill.directory if self.spill else None,
+                tuple(sorted(self.tables.items())), tuple(sorted(self.text_binary.items())))
+
+    def typed_values(self, table, stmt):
+        """DDL 이 있는 테이블이면 (컬럼 목록, 인코딩된 값 목록), 없으면 None"""
+        table_def = self.tables.get(table)
+        if table_def is None:
+            return None
+        ins = parse_insert(stmt)
+        row = decode_row(table_def, ins)
+        key = (table, tuple(ins.columns))
+        encoders = self._typed.get(key)
+        if encoders is None:
+            kinds = {c.name: c.kind for c in table_def.columns}
+            for name in self.text_binary.get(table, ()):
+                kinds[name] = 'base64'
+            encoders = self._typed[key] = [self.encoders[kinds[c]] for c in ins.columns]
+        null = self.null
+        values = [null if v is None else enc(v)
+                  for enc, v in zip(encoders, (getattr(row, c) for c in ins.columns))]
+        return ins.columns, values
+
+    def upserts(self, table):
+        return self.upsert is True or table in (self.upsert or ())
+
+    def conflict_clause(self, table, columns):
+        clause = self._conflict.get(table)
+        if clause is None:
+            table_def = self.tables.get(table)
+            key = table_def.primary_key[0] if table_def and len(table_def.primary_key) == 1 else None
+            clause = self._conflict[table] = on_conflict_sql(table, columns, key)
+        return clause
+
+    def convert(self, stmt, table):
+        typed = self.typed_values(table, stmt)
+        if typed is not None:
+            columns, values = typed
+            cols = ', '.join(quote_ident(c) for c in columns)
+            text = f"INSERT INTO {quote_ident(table)} ({cols}) VALUES ({', '.join(values)});"
+        else:
+            columns = None
+            text = convert_statement(stmt, binary=self._binary)
+        if self.upserts(table):
+            clause = self.conflict_clause(table, columns or insert_columns(stmt))
+            text = text[:-1] + clause + ';'
+        return None, text
+
+    def begin(self, table, columns):
+        return ''
+
+    def row(self, table, text):
+        return text + '\n'
+
+    def end(self, table):
+        return ''
+
+
+def copy_statement(table, columns):
+    cols = ', '.join(quote_ident(c) for c in columns)
+    return f'COPY {quote_ident(table)} ({cols}) FROM STDIN'
+
+
+class CopyFormat(InsertFormat):
+    """테이블마다 COPY "T" (...) FROM STDIN; 블록 (text 형식)
+
+    blocks=False 면 COPY 머리/꼬리 없이 행만 쌓는다 (로더가 copy_expert 로
+    직접 흘려보낼 때).
+    """
+
+    name = 'copy'
+    null = '\\N'
+
+    def __init__(self, blocks=True):
+        super().__init__()
+        self.blocks = blocks
+        self.encoders = COPY_ENCODERS
+
+    def convert(self, stmt, table):
+        typed = self.typed_values(table, stmt)
+        if typed is not None:
+            columns, values = typed
+            return columns, '\t'.join(values)
+        ins = parse_insert(stmt)
+        return ins.columns, '\t'.join(copy_value(v) for v in ins.values)
+
+    def begin(self, table, columns):
+        if not self.blocks:
+            return ''
+        return copy_statement(table, columns) + ';\n'
+
+    def end(self, table):
+        return '\\.\n' if self.blocks else ''
+
+
+class _BatchState:
+    __slots__ = ('head', 'close', 'rows', 'bytes', 'batches')
+
+    def __init__(self, head, close):
+        self.head = head
+        self.close = close
+        self.rows = 0
+        self.bytes = 0
+        self.batches = 0
+
+
+class BatchInsertFormat(InsertFormat):
+    """같은 테이블의 행을 INSERT ... VALUES (...),(...) 로 묶고
+    batches_per_txn 개 배치마다 BEGIN/COMMIT 으로 감싼다
+
+    배치는 행 수(batch_rows)와 바이트 수(batch_bytes) 중 먼저 닿는 쪽에서
+    끊는다. 서명 이미지처럼 큰 행은 바이트 상한에 먼저 걸린다.
+    upsert 는 InsertFormat 과 같고, 배치마다 ON CONFLICT (PK) DO UPDATE 를 붙인다.
+    """
+
+    name = 'insert-batch'
+
+    def __init__(self, batch_rows=500, batch_bytes=1 << 20, batches_per_txn=10, spill=None, upsert=False):
+        super().__init__(spill, upsert)
+        self.batch_rows = batch_rows
+        self.batch_bytes = batch_bytes
+        self.batches_per_txn = batches_per_txn
+        self._state = {}
+
+    def convert(self, stmt, table):
+        typed = self.typed_values(table, stmt)
+        if typed is not None:
+            columns, values = typed
+            return columns, '(' + ', '.join(values) + ')'
+        ins = parse_insert(stmt)
+        return ins.columns, '(' + ', '.join(sql_literal(v, self._binary) for v in ins.values) + ')'
+
+    def begin(self, table, columns):
+        cols = ', '.join(quote_ident(c) for c in columns)
+        close = (self.conflict_clause(table, columns) if self.upserts(table) else '') + ';\n'
+        self._state[table] = _BatchState(f'INSERT INTO {quote_ident(table)} ({cols}) VALUES\n', close)
+        return 'BEGIN;\n'
+
+    def row(self, table, text):
+        st = self._state[table]
+        size = len(text.encode('utf-8')) + 2
+        out = []
+        if st.rows and (st.rows >= self.batch_rows or st.bytes + size > self.batch_bytes):
+            # 현재 배치를 닫고, 배치 수가 차면 트랜잭션도 끊음
+            out.append(st.close)
+            st.batches += 1
+            st.rows = st.bytes = 0
+            if st.batches % self.batches_per_txn == 0:
+                out.append('COMMIT;\nBEGIN;\n')
+        out.append(st.head if st.rows == 0 else ',\n')
+        out.append(text)
+        st.rows += 1
+        st.bytes += size
+        return ''.join(out)
+
+    def end(self, table):
+        return self._state[table].close + 'COMMIT;\n'
+
+
+FORMATS = {
+    'insert': InsertFormat,
+    'insert-batch': BatchInsertFormat,
+    'copy': CopyFormat,
+}
+
+
+def make_format(name, **options):
+    return FORMATS[name](**options)
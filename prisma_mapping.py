@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""FoodieMatch/prisma/schema.prisma 의 @@map / @map 으로 식별자 매핑 만들기
+
+SQL Server 덤프의 테이블/컬럼 이름을 Prisma 가 실제로 만드는 PostgreSQL
+이름으로 바꾸는 표를 시작할 때 한 번만 만든다. 표는 MappingProxyType 으로
+고정해 두고, 변환 중에는 dict 조회만 한다.
+
+- 테이블: model 의 @@map("Teams") (없으면 model 이름)
+- 컬럼: 필드의 @map("TeamID") (없으면 필드 이름)
+- 관계 필드(다른 model 타입, 목록 타입)는 컬럼이 아니므로 뺀다.
+- 필드의 Prisma 타입(String, Int, Bytes …)도 같이 읽는다 (text_binaries).
+덤프 이름은 대소문자를 가리지 않고 매핑 이름이나 Prisma 필드 이름과 맞춘다.
+"""
+import os
+import re
+from collections import namedtuple
+from types import MappingProxyType
+
+from tsql_lexer import quote_ident
+
+PRISMA_SCHEMA = 'FoodieMatch/prisma/schema.prisma'
+
+PrismaModel = namedtuple('PrismaModel', 'name table fields types', defaults=(None,))
+
+# 덤프 DDL 에 대해 미리 풀어 둔 이름들 (모두 읽기 전용)
+ResolvedNames = namedtuple('ResolvedNames', 'tables columns unknown_tables unknown_columns')
+
+_MODEL_RE = re.compile(r"^model\s+(\w+)\s*\{(.*?)^\}", re.MULTILINE | re.DOTALL)
+_FIELD_RE = re.compile(r"^\s*(\w+)\s+(\w+)(\[\])?\??(.*)$")
+_MAP_RE = re.compile(r'@map\(\s*"([^"]+)"\s*\)')
+_TABLE_MAP_RE = re.compile(r'@@map\(\s*"([^"]+)"\s*\)')
+
+
+def parse_prisma_schema(text):
+    """schema.prisma 텍스트 → {model 이름: PrismaModel(name, table, {필드: 컬럼}, {필드: 타입})}"""
+    blocks = _MODEL_RE.findall(text)
+    model_names = {name for name, _ in blocks}
+    models = {}
+    for name, body in blocks:
+        table = name
+        fields = {}
+        types = {}
+        for line in body.splitlines():
+            line = line.split('//', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('@@'):
+                m = _TABLE_MAP_RE.search(line)
+                if m:
+                    table = m.group(1)
+                continue
+            m = _FIELD_RE.match(line)
+            if not m:
+                continue
+            field, field_type, is_list, attrs = m.groups()
+            if is_list or field_type in model_names or '@relation' in attrs:
+                continue
+            column = _MAP_RE.search(attrs)
+            fields[field] = column.group(1) if column else field
+            types[field] = field_type
+        models[name] = PrismaModel(name, table, MappingProxyType(fields), MappingProxyType(types))
+    return models
+
+
+class IdentifierMap:
+    """Prisma 스키마에서 만든 (덤프 이름 → PostgreSQL 이름) 고정 표"""
+
+    def __init__(self, models):
+        tables = {}
+        columns = {}
+        types = {}
+        for model in models.values():
+            tables[model.table.lower()] = model.table
+            lookup = {}
+            for field, column in model.fields.items():
+                lookup[field.lower()] = column
+                lookup[column.lower()] = column
+            columns[model.table] = MappingProxyType(lookup)
+            types[model.table] = MappingProxyType({column: (model.types or {}).get(field)
+                                                   for field, column in model.fields.items()})
+        self.models = MappingProxyType(dict(models))
+        self.tables = MappingProxyType(tables)
+        self.columns = MappingProxyType(columns)
+        self.types = MappingProxyType(types)
+
+    @classmethod
+    def load(cls, path=PRISMA_SCHEMA):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(parse_prisma_schema(f.read()))
+
+    def table(self, name):
+        """덤프 테이블 이름 → Prisma 테이블 이름 (모르면 None)"""
+        return self.tables.get(name.lower())
+
+    def column(self, table, name):
+        """덤프 컬럼 이름 → Prisma 컬럼 이름 (모르면 None)"""
+        target = self.table(table)
+        if target is None:
+            return None
+        return self.columns[target].get(name.lower())
+
+    def field_type(self, table, name):
+        """덤프 컬럼의 Prisma 필드 타입 ('String', 'Bytes' …, 모르면 None)"""
+        column = self.column(table, name)
+        if column is None:
+            return None
+        return self.types[self.table(table)].get(column)
+
+    def text_binaries(self, schema):
+        """덤프에서는 varbinary 인데 Prisma 에서는 String 인 컬럼 {덤프 테이블: (덤프 컬럼, ...)}
+
+        이런 컬럼은 Prisma 가 text 로 만들므로 bytea 대신 base64 문자열로 넣는다
+        (prisma_ndjson 과 같은 표현).
+        """
+        found = {}
+        for name, table_def in schema.tables.items():
+            columns = tuple(c.name for c in table_def.columns
+                            if c.kind == 'bytea' and self.field_type(name, c.name) == 'String')
+            if columns:
+                found[name] = columns
+        return found
+
+    def resolve(self, schema):
+        """덤프 DDL(tbm_schema.DumpSchema) 의 이름을 미리 풀어 둠
+
+        tables 는 {덤프 테이블: 따옴표 친 PostgreSQL 이름}, columns 는
+        {덤프 테이블: {덤프 컬럼: 따옴표 친 이름}} 이라 변환 중에는 그대로
+        __getitem__ 으로 쓸 수 있다. Prisma 에 없는 테이블/컬럼은
+        unknown_tables / unknown_columns([(테이블, 컬럼)]) 로 따로 돌려준다.
+        """
+        tables = {}
+        columns = {}
+        unknown_tables = []
+        unknown_columns = []
+        for name, table_def in schema.tables.items():
+            target = self.table(name)
+            if target is None:
+                unknown_tables.append(name)
+                continue
+            tables[name] = quote_ident(target)
+            lookup = {}
+            for column in table_def.columns:
+                mapped = self.columns[target].get(column.name.lower())
+                if mapped is None:
+                    unknown_columns.append((name, column.name))
+                else:
+                    lookup[column.name] = quote_ident(mapped)
+            columns[name] = MappingProxyType(lookup)
+        return ResolvedNames(MappingProxyType(tables), MappingProxyType(columns),
+                             tuple(unknown_tables), tuple(unknown_columns))
+
+
+def load_text_binaries(schema, path=PRISMA_SCHEMA):
+    """path 의 schema.prisma 로 본 IdentifierMap.text_binaries (파일이 없으면 {} = 모두 bytea)"""
+    if not path or not os.path.exists(path):
+        return {}
+    return IdentifierMap.load(path).text_binaries(schema)
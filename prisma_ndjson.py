@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""SQL Server 덤프 → Prisma createMany 용 테이블별 NDJSON 묶음 파일
+
+행마다 JSON 객체 한 줄이고, 키는 schema.prisma 의 필드 이름(teamId,
+reportDate, displayOrder …)이다. 파일 하나가 createMany 한 번에 넘길
+묶음이 되도록 행 수(--chunk-rows)와 크기(--chunk-bytes)를 넘기 전에 다음
+파일로 넘어가므로, 시드 스크립트는 파일을 하나씩 읽어 넣으면 전체 데이터를
+Node 메모리에 올리지 않아도 된다.
+
+값은 그대로 넘길 수 있는 모양으로 바꾼다.
+- 정수 → JSON 숫자, bit → true/false, decimal/money → 문자열 (Prisma Decimal)
+- 날짜/시간 → ISO 8601 UTC 밀리초 ('2025-09-16T05:20:03.240Z').
+  datetime2 처럼 시간대가 없는 값은 UTC 로 본다 (Prisma 가 timestamp 를 다루는 방식)
+- varbinary(서명 이미지) → base64 문자열
+
+출력 디렉터리의 manifest.json 에 FK 순서(부모 먼저)대로 테이블별 model,
+prisma 클라이언트 속성 이름(delegate), 묶음 파일 목록, 행 수, base64 필드를
+적는다. 시드 스크립트는 manifest 의 files 만 읽는다 (예전 실행의 남은 파일은 무시).
+행의 id 를 그대로 넣으므로 다 넣은 뒤 manifest 의 reset_sequences 를
+$executeRawUnsafe 로 실행해 시퀀스를 맞춘다.
+
+사용법:
+  python prisma_ndjson.py [덤프] -o FoodieMatch/prisma/tbm_seed [--chunk-rows 1000] [-j 4]
+"""
+import argparse
+import base64
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from final_sql_convert import convert_dump, load_order
+from prisma_mapping import PRISMA_SCHEMA, IdentifierMap
+from sql_table_writer import sequence_reset_sql
+from tbm_schema import DumpSchema, decode_row
+from tsql_lexer import parse_insert
+
+CHUNK_ROWS = 1000
+CHUNK_BYTES = 4 << 20
+
+_DATETIME_RE = re.compile(
+    r"(\d{4}-\d{2}-\d{2})(?:[T ](\d{2}:\d{2}(?::\d{2})?)(?:\.(\d+))?)?\s*(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def iso_datetime(value):
+    """T-SQL 날짜/시간 텍스트 → 'YYYY-MM-DDTHH:MM:SS.sssZ' (JavaScript Date 정밀도)"""
+    m = _DATETIME_RE.match(value.strip())
+    if not m:
+        raise ValueError(f"날짜/시간 형식이 아닙니다: {value!r}")
+    day, clock, fraction, offset = m.groups()
+    dt = datetime.fromisoformat(f"{day}T{clock or '00:00:00'}{offset if offset and offset != 'Z' else ''}")
+    if fraction:
+        dt += timedelta(milliseconds=round(Decimal('0.' + fraction) * 1000))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S') + f'.{dt.microsecond // 1000:03d}Z'
+
+
+def _json_time(value):
+    # Prisma DateTime(@db.Time) 도 날짜가 붙은 ISO 문자열로 받는다
+    return iso_datetime('1970-01-01T' + value)
+
+
+def _json_bytes(value):
+    return base64.b64encode(bytes.fromhex(value)).decode('ascii')
+
+
+# 컬럼 종류 → JSON 값 인코더 (numeric 은 column_encoder 에서 타입별로 나눔)
+JSON_ENCODERS = {
+    'integer': int,
+    'boolean': bool,
+    'timestamp': iso_datetime,
+    'timestamptz': iso_datetime,
+    'date': iso_datetime,
+    'time': _json_time,
+    'bytea': _json_bytes,
+    'text': str,
+}
+
+
+def column_encoder(column):
+    if column.kind == 'numeric':
+        return float if column.type in ('float', 'real') else str
+    return JSON_ENCODERS.get(column.kind, str)
+
+
+def delegate_name(model):
+    """model 이름 → PrismaClient 속성 이름 (TbmUser → tbmUser)"""
+    return model[:1].lower() + model[1:]
+
+
+def prisma_fields(identifiers, schema):
+    """덤프 테이블별 (model 이름, {덤프 컬럼: Prisma 필드}) 와 Prisma 에 없는 (테이블, 컬럼) 목록
+
+    워커 프로세스로 넘길 수 있게 보통 dict 로 만든다.
+    """
+    models = {model.table.lower(): model for model in identifiers.models.values()}
+    fields = {}
+    unknown = []
+    for name, table_def in schema.tables.items():
+        model = models.get(name.lower())
+        if model is None:
+            unknown.append((name, None))
+            continue
+        lookup = {}
+        for field, column in model.fields.items():
+            lookup[field.lower()] = field
+            lookup[column.lower()] = field
+        mapped = {}
+        for column in table_def.columns:
+            field = lookup.get(column.name.lower())
+            if field is None:
+                unknown.append((name, column.name))
+            else:
+                mapped[column.name] = field
+        fields[name] = (model.name, mapped)
+    return fields, unknown
+
+
+class NdjsonFormat:
+    """INSERT 문 하나 → Prisma 필드 이름을 키로 한 JSON 한 줄 (final_sql_convert 형식 인터페이스)
+
+    fields 는 prisma_fields() 의 결과. Prisma 에 없는 컬럼은 빼고,
+    Prisma model 이 없는 테이블의 행은 None 으로 돌려 출력기가 버리게 한다.
+    """
+
+    name = 'ndjson'
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.tables = {}
+        self._encoders = {}
+
+    def use_schema(self, schema):
+        self.tables = dict(schema.tables)
+        self._encoders.clear()
+
+    def signature(self):
+        return (self.name, tuple(sorted((t, m, tuple(sorted(f.items()))) for t, (m, f) in self.fields.items())),
+                tuple(sorted(self.tables.items())))
+
+    def encoders(self, table):
+        """(컬럼, 필드, 인코더) 목록 (테이블마다 한 번 만듦)"""
+        encoders = self._encoders.get(table)
+        if encoders is None:
+            _, mapped = self.fields[table]
+            encoders = self._encoders[table] = [(c.name, mapped[c.name], column_encoder(c))
+                                                for c in self.tables[table].columns if c.name in mapped]
+        return encoders
+
+    def convert(self, stmt, table):
+        if table not in self.fields:
+            return None, None
+        row = decode_row(self.tables[table], parse_insert(stmt))
+        obj = {}
+        for column, field, encode in self.encoders(table):
+            value = getattr(row, column)
+            obj[field] = None if value is None else encode(value)
+        return None, json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+class NdjsonChunkWriter:
+    """테이블별 NDJSON 을 행 수/크기 상한에 맞춰 여러 파일로 나눠 쓰는 출력기
+
+    convert_dump() 의 writer 로 쓴다 (fmt, add).
+    """
+
+    def __init__(self, out_dir, fmt, chunk_rows=CHUNK_ROWS, chunk_bytes=CHUNK_BYTES):
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.chunk_bytes = chunk_bytes
+        self.counts = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.files = defaultdict(list)
+        self._open = {}
+        os.makedirs(out_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_file(self, table):
+        current = self._open.pop(table, None)
+        if current is not None:
+            current[0].close()
+        model = self.fmt.fields[table][0]
+        name = f'{model}-{len(self.files[table]) + 1:05d}.ndjson'
+        self.files[table].append(name)
+        entry = self._open[table] = [open(os.path.join(self.out_dir, name), 'wb'), 0, 0]
+        return entry
+
+    def add(self, table, columns, text):
+        if text is None:
+            return
+        line = (text + '\n').encode('utf-8')
+        entry = self._open.get(table)
+        # 한 행이 상한보다 크면 그 행만 든 파일이 된다
+        if entry is None or entry[1] >= self.chunk_rows or (entry[1] and entry[2] + len(line) > self.chunk_bytes):
+            entry = self._next_file(table)
+        entry[0].write(line)
+        entry[1] += 1
+        entry[2] += len(line)
+        self.counts[table] += 1
+        self.bytes[table] += len(line)
+
+    def close(self):
+        for f, _, _ in self._open.values():
+            f.close()
+        self._open.clear()
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def manifest(self, order, **info):
+        tables = []
+        for table in order:
+            if not self.counts.get(table):
+                continue
+            model = self.fmt.fields[table][0]
+            encoders = self.fmt.encoders(table)
+            tables.append({
+                'table': table,
+                'model': model,
+                'delegate': delegate_name(model),
+                'rows': self.counts[table],
+                'bytes': self.bytes[table],
+                'files': self.files[table],
+                'base64': [field for _, field, encode in encoders if encode is _json_bytes],
+            })
+        return dict(info, chunk_rows=self.chunk_rows, chunk_bytes=self.chunk_bytes, tables=tables)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL Server 덤프 → Prisma createMany 용 NDJSON 묶음')
+    parser.add_argument('input', nargs='?', default='attached_assets/script1_1760403229620.sql')
+    parser.add_argument('-o', '--output-dir', default='FoodieMatch/prisma/tbm_seed')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help='파일(createMany 한 번)당 최대 행 수')
+    parser.add_argument('--chunk-bytes', type=int, default=CHUNK_BYTES, help='파일당 최대 바이트')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='변환 프로세스 수 (0 이면 CPU 코어 수)')
+    parser.add_argument('--mmap', action='store_true', help='덤프를 mmap 으로 스캔 (대상 테이블 문장만 디코딩)')
+    args = parser.parse_args()
+    if args.chunk_rows < 1 or args.chunk_bytes < 1:
+        parser.error('--chunk-rows 와 --chunk-bytes 는 1 이상이어야 합니다')
+    jobs = args.jobs or os.cpu_count() or 1
+
+    schema = DumpSchema.scan(args.input)
+    fields, unknown = prisma_fields(IdentifierMap.load(args.prisma_schema), schema)
+    targets = load_order(schema)
+    order = [t for t in targets if t in fields]
+    for table, column in unknown:
+        if table in targets:
+            print(f"⚠️  schema.prisma 에 없어 건너뜀: {table}{'.' + column if column else ''}")
+
+    fmt = NdjsonFormat(fields)
+    fmt.use_schema(schema)
+    with NdjsonChunkWriter(args.output_dir, fmt, args.chunk_rows, args.chunk_bytes) as writer:
+        convert_dump(args.input, writer, jobs, mapped=args.mmap)
+
+    manifest_path = os.path.join(args.output_dir, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(writer.manifest(order, source=args.input,
+                                  reset_sequences=sequence_reset_sql(order, schema.identity_columns())), f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+    print(f"✅ NDJSON 저장: {args.output_dir} (manifest.json)")
+    print(f"📝 총 {writer.total()} 개의 행, 파일 {sum(len(writer.files[t]) for t in order)}개")
+    for table in order:
+        if writer.counts.get(table):
+            print(f"   - {table} → {delegate_name(fields[table][0])}: {writer.counts[table]}개 "
+                  f"({len(writer.files[table])}개 파일)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""SSMS 스크립트 덤프를 일정한 메모리로 읽는 스트리밍 리더
+
+파일 전체를 read() 하지 않고 청크 단위로 디코딩하면서
+GO 로 구분된 배치나 개별 문장을 제너레이터로 돌려준다.
+gzip/xz/bz2 로 압축된 덤프도 그대로 읽는다 (compressed_io).
+"""
+import codecs
+import itertools
+import mmap
+import os
+import re
+
+from compressed_io import compression_of, consumed_bytes, open_input
+from convert_metrics import no_stage
+
+CHUNK_SIZE = 1 << 20  # 1MB 씩 읽기
+SCAN_WINDOW = 16 << 20  # mmap 스캔 창 (지나간 창의 페이지는 놓아 줌)
+
+# 새 문장이 시작되는 키워드 (문자열 리터럴 밖, 줄 맨 앞일 때만)
+STATEMENT_KEYWORDS = ('INSERT', 'SET', 'CREATE', 'ALTER', 'USE', 'EXEC',
+                      'DROP', 'UPDATE', 'DELETE', 'DECLARE', 'IF', 'PRINT')
+
+# 스키마로 읽는 DDL 문의 시작 (SSMS 가 쓰는 대로 공백 하나씩)
+DDL_PREFIXES = ('CREATE TABLE ', 'ALTER TABLE ', 'CREATE INDEX ', 'CREATE NONCLUSTERED INDEX ',
+                'CREATE CLUSTERED INDEX ', 'CREATE UNIQUE ')
+
+
+def detect_encoding(head):
+    """BOM(또는 NUL 바이트 패턴)으로 인코딩과 BOM 길이를 판별"""
+    if head[:2] == b'\xff\xfe':
+        return 'utf-16-le', 2
+    if head[:2] == b'\xfe\xff':
+        return 'utf-16-be', 2
+    if head[:3] == b'\xef\xbb\xbf':
+        return 'utf-8', 3
+    # BOM 없는 UTF-16LE: ASCII 문자 뒤에 0x00 이 따라옴
+    if len(head) >= 4 and head[1] == 0 and head[3] == 0 and head[0] != 0:
+        return 'utf-16-le', 0
+    return 'utf-8', 0
+
+
+def iter_text_chunks(path, chunk_size=CHUNK_SIZE, metrics=None):
+    """파일을 청크 단위로 읽어 디코딩된 str 조각을 생성
+
+    metrics(convert_metrics.RunMetrics) 를 주면 읽기/디코딩 시간과 읽은 바이트를 기록한다
+    (압축 파일이면 압축된 바이트 기준이라 파일 크기로 진행률을 낼 수 있다).
+    """
+    stage = no_stage if metrics is None else metrics.stage
+    with open_input(path) as f:
+        head = f.read(4)
+        encoding, bom_len = detect_encoding(head)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        first = decoder.decode(head[bom_len:])
+        position = 0
+        if metrics is not None:
+            position = consumed_bytes(f)
+            metrics.read(position)
+        if first:
+            yield first
+        while True:
+            with stage('read'):
+                raw = f.read(chunk_size)
+            if not raw:
+                break
+            if metrics is not None:
+                now = consumed_bytes(f)
+                metrics.read(now - position)
+                position = now
+            with stage('decode'):
+                text = decoder.decode(raw)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+
+
+def iter_lines(path, chunk_size=CHUNK_SIZE, metrics=None):
+    """줄바꿈 문자를 유지한 채 한 줄씩 생성"""
+    pending = ''
+    for chunk in iter_text_chunks(path, chunk_size, metrics):
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find('\n', start)
+            if end < 0:
+                break
+            yield pending[start:end + 1]
+            start = end + 1
+        pending = pending[start:]
+    if pending:
+        yield pending
+
+
+def _starts_statement(line):
+    word = line.lstrip()[:8].upper()
+    return word.startswith(STATEMENT_KEYWORDS)
+
+
+def iter_statements(path, chunk_size=CHUNK_SIZE, with_go=False, metrics=None):
+    """T-SQL 문장을 하나씩 생성
+
+    문자열 리터럴 안의 줄바꿈은 문장의 일부로 유지한다 (홑따옴표 개수의
+    홀짝으로 리터럴 안인지 판단, '' 이스케이프는 짝수라 영향 없음).
+    with_go=True 이면 배치 경계마다 'GO' 를 그대로 내보낸다.
+    """
+    buf = []
+    in_string = False
+
+    for line in iter_lines(path, chunk_size, metrics):
+        if not in_string:
+            stripped = line.strip()
+            # 주석 줄은 버림 (안의 따옴표가 리터럴 판단을 흐리지 않도록)
+            if stripped.startswith('--') or (stripped.startswith('/*') and stripped.endswith('*/')):
+                continue
+            if stripped.upper() == 'GO':
+                if buf:
+                    yield ''.join(buf)
+                    buf = []
+                if with_go:
+                    yield 'GO'
+                continue
+            if not stripped:
+                continue
+            if buf and _starts_statement(line):
+                yield ''.join(buf)
+                buf = []
+        buf.append(line)
+        if line.count("'") % 2:
+            in_string = not in_string
+
+    if buf:
+        yield ''.join(buf)
+
+
+def iter_statement_chunks(path, max_statements=2000, max_chars=4 << 20, chunk_size=CHUNK_SIZE,
+                          metrics=None):
+    """문장을 묶음(list) 단위로 생성
+
+    GO 배치 경계에서 항상 끊고, 배치가 크면 문장 수/문자 수 상한에서도
+    끊는다. 병렬 변환 작업 단위로 쓰며 묶음 순서는 원본 순서와 같다.
+    """
+    chunk = []
+    chars = 0
+    for stmt in iter_statements(path, chunk_size, with_go=True, metrics=metrics):
+        if stmt == 'GO':
+            if chunk:
+                yield chunk
+                chunk = []
+                chars = 0
+            continue
+        chunk.append(stmt)
+        chars += len(stmt)
+        if len(chunk) >= max_statements or chars >= max_chars:
+            yield chunk
+            chunk = []
+            chars = 0
+    if chunk:
+        yield chunk
+
+
+class MappedDump:
+    """덤프를 mmap 으로 열어 인코딩된 바이트 패턴으로 바로 찾는 스캐너
+
+    UTF-16LE 덤프라도 'INSERT [dbo].[Teams] ' 를 UTF-16LE 로 인코딩한 바이트열을
+    매핑된 버퍼에서 그대로 찾는다. 찾은 문장 구간만 디코딩하므로 DDL,
+    SET 문, 관심 없는 테이블의 행은 디코딩하지 않는다.
+    (다른 행의 문자열 리터럴 안에 줄바꿈 + 'INSERT [dbo].[' 가 들어 있는
+    극단적인 경우는 구분하지 않는다.)
+    압축된 덤프는 매핑할 수 없어 ValueError.
+    """
+
+    def __init__(self, path):
+        if compression_of(path) is not None:
+            raise ValueError(f"압축된 덤프는 mmap 으로 열 수 없습니다 (먼저 압축을 풀 것): {path}")
+        self.path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.encoding, self.base = detect_encoding(self.mm[:4])
+        self.unit = 2 if self.encoding.startswith('utf-16') else 1
+        self._nl = self._enc('\n')
+        self._quote = self._enc("'")
+        self._cr = self._enc('\r')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+        self._file.close()
+
+    def _enc(self, text):
+        return text.encode(self.encoding)
+
+    def _find(self, needle, start, end=None):
+        """문자 경계(UTF-16 이면 짝수 오프셋)에 맞는 위치만 찾음"""
+        end = self.size if end is None else end
+        while True:
+            pos = self.mm.find(needle, start, end)
+            if pos < 0 or (pos - self.base) % self.unit == 0:
+                return pos
+            start = pos + 1
+
+    def _quotes(self, start, end):
+        """[start, end) 의 홑따옴표 개수"""
+        data = self.mm[start:end]
+        count = data.count(self._quote)
+        # UTF-16 에서 홀수 위치에 첫 바이트가 있으면 문자 경계에 걸친 조합일 수 있어 다시 셈
+        if self.unit == 2 and count and self._quote[:1] in data[1::2]:
+            count = 0
+            pos = self._find(self._quote, start, end)
+            while pos >= 0:
+                count += 1
+                pos = self._find(self._quote, pos + self.unit, end)
+        return count
+
+    def decode(self, offset, length):
+        """[offset, offset+length) 구간만 디코딩"""
+        return self.mm[offset:offset + length].decode(self.encoding)
+
+    def statement_end(self, start):
+        """start 에서 시작한 문장의 끝 (줄바꿈 직전, 리터럴 안 줄바꿈은 건너뜀)"""
+        in_string = False
+        line_start = start
+        while True:
+            nl = self._find(self._nl, line_start)
+            line_end = self.size if nl < 0 else nl
+            if self._quotes(line_start, line_end) % 2:
+                in_string = not in_string
+            if nl < 0:
+                break
+            next_start = nl + self.unit
+            if not in_string:
+                peek = self.mm[next_start:next_start + 12 * self.unit].decode(self.encoding, 'ignore')
+                first = peek.split('\n', 1)[0].strip()
+                if not first or first.upper() == 'GO' or _starts_statement(peek):
+                    break
+            line_start = next_start
+        # 줄 끝의 CR 은 문장에 넣지 않음
+        cr = self._cr
+        if line_end - len(cr) >= start and self.mm[line_end - len(cr):line_end] == cr:
+            line_end -= len(cr)
+        return line_end
+
+    def scan(self, prefixes):
+        """줄 맨 앞에서 prefixes 중 하나로 시작하는 문장을 파일을 한 번만 훑어 찾음
+
+        (prefixes 안의 번호, offset, length) 를 파일 순서대로 생성한다.
+        줄바꿈 + 후보 바이트열을 하나의 정규식으로 찾으므로 prefix 가 여러 개여도
+        매핑된 버퍼를 한 번만 지나간다. SCAN_WINDOW 크기 창 단위로 찾고 지나간
+        구간의 페이지는 MADV_DONTNEED 로 놓아 주므로, 드문 DDL 만 찾을 때도
+        상주 메모리가 파일 크기만큼 늘지 않는다.
+        """
+        alternatives = b'|'.join(b'(' + re.escape(self._enc(p)) + b')' for p in prefixes)
+        first = re.compile(alternatives)
+        pattern = re.compile(re.escape(self._nl) + b'(?:' + alternatives + b')')
+        # 창 경계에 걸친 매치도 잡도록 창 끝을 가장 긴 후보만큼 더 봄
+        overlap = len(self._nl) + max(len(self._enc(p)) for p in prefixes)
+        head = first.match(self.mm, self.base)
+        pos = self.base
+        released = 0
+        window = self.base
+        while window < self.size:
+            window_end = min(window + SCAN_WINDOW, self.size)
+            hits = (m for m in pattern.finditer(self.mm, window, min(window_end + overlap, self.size))
+                    if m.start() < window_end)
+            for m in itertools.chain([head] if head else [], hits):
+                hit = m.start(m.lastindex)
+                if hit < pos or (hit - self.base) % self.unit:
+                    continue
+                end = self.statement_end(hit)
+                yield m.lastindex - 1, hit, end - hit
+                pos = max(end, hit + self.unit)
+            head = None
+            window = window_end
+            released = self._release(released, window)
+
+    def _release(self, start, end):
+        """[start, end) 중 페이지 단위로 맞는 구간을 상주 메모리에서 내림 (다시 읽으면 파일에서 채움)"""
+        end -= end % mmap.PAGESIZE
+        if end > start and hasattr(mmap, 'MADV_DONTNEED'):
+            self.mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+            return end
+        return start
+
+    def find_statements(self, prefix):
+        """줄 맨 앞에서 prefix 로 시작하는 문장의 (offset, length) 생성"""
+        for _, offset, length in self.scan((prefix,)):
+            yield offset, length
+
+
+def iter_mapped_chunks(path, tables, max_statements=2000, max_chars=4 << 20, metrics=None):
+    """mmap 스캔으로 DDL 과 대상 테이블의 INSERT 문만 디코딩해 묶음으로 생성
+
+    파일을 한 번만 훑으며 DDL(CREATE/ALTER TABLE, CREATE INDEX) 과 tables 의 INSERT 를
+    파일 순서대로 내보낸다. 묶음은 종류(DDL 이나 테이블)가 바뀔 때와 문장 수/문자 수
+    상한에서 끊기므로 한 묶음에는 한 테이블의 행만 들어 있다.
+    metrics 를 주면 디코딩한 문장 바이트를 진행률로 기록한다.
+    압축된 덤프는 mmap 할 수 없으므로 iter_statement_chunks 로 스트리밍한다.
+    """
+    if compression_of(path) is not None:
+        yield from iter_statement_chunks(path, max_statements, max_chars, metrics=metrics)
+        return
+    ddl_count = len(DDL_PREFIXES)
+    prefixes = DDL_PREFIXES + tuple(f'INSERT [dbo].[{table}] ' for table in tables)
+    with MappedDump(path) as dump:
+        chunk = []
+        chars = 0
+        current = None
+        for index, off, length in dump.scan(prefixes):
+            # DDL 은 prefix 가 여러 개라도 한 종류로 묶음
+            kind = index if index >= ddl_count else -1
+            if chunk and (kind != current or len(chunk) >= max_statements or chars >= max_chars):
+                yield chunk
+                chunk = []
+                chars = 0
+            current = kind
+            chunk.append(dump.decode(off, length))
+            chars += length // dump.unit
+            if metrics is not None:
+                metrics.read(length)
+        if chunk:
+            yield chunk
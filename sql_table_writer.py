@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""변환된 문장을 테이블별 스풀로 한 번에 분배하는 출력기
+
+문장마다 테이블을 한 번만 판별해 테이블별 스풀(메모리 상한을 넘으면
+임시 파일로 넘어가는 SpooledTemporaryFile)에 쌓고, 마지막에 의존성
+순서대로 이어 붙인다. 테이블별 개수/바이트는 쓰는 동안 바로 집계한다.
+"""
+import os
+import shutil
+import tempfile
+
+# FK 의존성 순서 (부모 테이블 먼저)
+LOAD_ORDER = ['Teams', 'ChecklistTemplates', 'TemplateItems', 'Users',
+              'DailyReports', 'ReportDetails', 'ReportSignatures']
+
+# 테이블별 IDENTITY 컬럼
+ID_COLUMNS = {
+    'Teams': 'TeamID',
+    'Users': 'UserID',
+    'ChecklistTemplates': 'TemplateID',
+    'TemplateItems': 'ItemID',
+    'DailyReports': 'ReportID',
+    'ReportDetails': 'DetailID',
+    'ReportSignatures': 'SignatureID',
+}
+
+SPOOL_MEMORY = 8 << 20  # 테이블당 8MB 까지는 메모리, 넘으면 임시 파일
+
+
+def sequence_reset_sql(tables=None, id_columns=None):
+    """IDENTITY 값 이후로 시퀀스를 맞추는 setval 문들
+
+    id_columns 는 {테이블: 컬럼} (덤프 DDL 에서 읽은 값, 없으면 ID_COLUMNS).
+    """
+    id_columns = id_columns or ID_COLUMNS
+    lines = []
+    for table in tables or LOAD_ORDER:
+        id_col = id_columns.get(table)
+        if id_col is None:
+            continue
+        lines.append(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{id_col}'), "
+                     f"COALESCE((SELECT MAX(\"{id_col}\") FROM \"{table}\"), 1));\n")
+    return ''.join(lines)
+
+
+def default_header(table):
+    return f'-- {table} data\n'
+
+
+class TableSpoolWriter:
+    """테이블별 스풀에 문장을 모았다가 의존성 순서로 내보내는 출력기"""
+
+    def __init__(self, table_order=None, max_memory=SPOOL_MEMORY, header=default_header, fmt=None):
+        self.table_order = list(table_order or LOAD_ORDER)
+        self.max_memory = max_memory
+        self.header = header
+        self.fmt = fmt  # pg_formats 의 출력 형식 (add() 에서 사용)
+        self.counts = {}
+        self.bytes = {}
+        self.columns = {}
+        self._spools = {}
+        self._ended = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _spool(self, table):
+        spool = self._spools.get(table)
+        if spool is None:
+            spool = tempfile.SpooledTemporaryFile(max_size=self.max_memory, mode='w+',
+                                                  encoding='utf-8', newline='')
+            self._spools[table] = spool
+            self.counts[table] = 0
+            self.bytes[table] = 0
+        return spool
+
+    def write(self, table, text, rows=1):
+        """table 의 스풀에 문장(들)을 추가 (줄바꿈은 자동으로 붙임)"""
+        spool = self._spool(table)
+        spool.write(text)
+        spool.write('\n')
+        self.counts[table] += rows
+        self.bytes[table] += len(text.encode('utf-8')) + 1
+
+    def add(self, table, columns, text):
+        """출력 형식(fmt)에 맞춰 행 하나를 추가 (첫 행이면 블록 머리부터)"""
+        if table not in self._spools:
+            self.columns[table] = columns
+            head = self.fmt.begin(table, columns)
+            if head:
+                self._spool(table).write(head)
+                self.bytes[table] = len(head.encode('utf-8'))
+        out = self.fmt.row(table, text)
+        self._spool(table).write(out)
+        self.counts[table] += 1
+        self.bytes[table] += len(out.encode('utf-8'))
+
+    def finish(self):
+        """블록 꼬리(COPY 의 \\. 등)를 테이블마다 한 번만 붙임"""
+        if self.fmt is None:
+            return
+        for table, spool in self._spools.items():
+            if table in self._ended:
+                continue
+            tail = self.fmt.end(table)
+            if tail:
+                spool.write(tail)
+                self.bytes[table] += len(tail.encode('utf-8'))
+            self._ended.add(table)
+
+    def drop(self, table):
+        """한 테이블의 스풀을 버림 (증분 변환에서 바뀌지 않은 테이블)"""
+        spool = self._spools.pop(table, None)
+        if spool is not None:
+            spool.close()
+        for stats in (self.counts, self.bytes, self.columns):
+            stats.pop(table, None)
+        self._ended.discard(table)
+
+    def tables(self):
+        """출력 순서: 지정 순서 먼저, 그 외 테이블은 처음 나온 순서"""
+        ordered = [t for t in self.table_order if t in self._spools]
+        ordered += [t for t in self._spools if t not in self.table_order]
+        return ordered
+
+    def total(self):
+        return sum(self.counts.values())
+
+    def open_table(self, table):
+        """한 테이블의 스풀을 처음부터 읽을 수 있게 돌려줌 (COPY 로 흘려보낼 때)
+
+        여러 스레드에서 테이블별로 동시에 읽을 수 있도록 finish() 는 부르지
+        않는다. 읽기 전에 호출하는 쪽에서 한 번 finish() 할 것.
+        """
+        spool = self._spools[table]
+        spool.flush()
+        spool.seek(0)
+        return spool
+
+    def copy_table(self, table, out):
+        """한 테이블의 스풀 내용을 out 으로 복사"""
+        spool = self._spools[table]
+        spool.flush()
+        spool.seek(0)
+        shutil.copyfileobj(spool, out)
+
+    def write_to(self, out, include_empty=True):
+        """모든 테이블을 의존성 순서로 out 에 이어 붙임"""
+        self.finish()
+        sections = self.table_order + [t for t in self._spools if t not in self.table_order]
+        first = True
+        for table in sections:
+            if table not in self._spools and not include_empty:
+                continue
+            if not first:
+                out.write('\n')
+            first = False
+            if self.header:
+                out.write(self.header(table))
+            if table in self._spools:
+                self.copy_table(table, out)
+
+    def write_split(self, out_dir, suffix='.sql'):
+        """테이블마다 별도 파일로 저장 (순서 번호를 붙여 의존성 순서 유지)"""
+        self.finish()
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for i, table in enumerate(self.tables(), 1):
+            path = os.path.join(out_dir, f'{i:02d}_{table}{suffix}')
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                if self.header:
+                    f.write(self.header(table))
+                self.copy_table(table, f)
+            paths.append(path)
+        return paths
+
+    def close(self):
+        for spool in self._spools.values():
+            spool.close()
+        self._spools.clear()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""크기가 정해진 큐로 이은 스레드 파이프라인
+
+pipelined(iterable) 은 iterable 을 백그라운드 스레드에서 돌리고, 나온 값을
+크기 depth 인 큐를 거쳐 호출한 쪽에 넘긴다. 큐가 차면 앞 단계가 기다리므로
+(역압) 메모리는 큐 깊이 × 항목 크기를 넘지 않는다. 단계마다 한 번씩 감싸면
+
+    읽기/분리 스레드 → 큐 → 변환 스레드(또는 프로세스 풀) → 큐 → 쓰기(호출한 스레드)
+
+처럼 디스크 읽기, 변환, 스풀 쓰기가 서로 겹쳐 돈다. 항목 순서는 그대로이고,
+앞 단계에서 난 예외는 받는 쪽에서 다시 발생한다.
+"""
+import queue
+import threading
+
+PIPELINE_DEPTH = 8  # 단계 사이 큐에 쌓아 둘 최대 항목 수
+
+_DONE = object()
+_POLL = 0.1  # 받는 쪽이 멈췄는지 확인하는 간격 (초)
+
+
+def pipelined(iterable, depth=PIPELINE_DEPTH, name='pipeline'):
+    """iterable 을 별도 스레드에서 돌려 크기 depth 인 큐로 하나씩 받음
+
+    받는 쪽이 중간에 멈추면(예외, close) 스레드도 다음 항목에서 멈추고
+    iterable 을 닫는다.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as exc:
+            put((_DONE, exc))
+        finally:
+            close = getattr(iterable, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exc = items.get()
+            if item is _DONE:
+                if exc is not None:
+                    raise exc
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
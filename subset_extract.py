@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""조건에 맞는 행과 그 FK 관계만 뽑은 작은 적재 파일 만들기 (스테이징/개발용)
+
+--where 조건은 행을 변환하기 전에, 덤프 DDL 의 컬럼 타입대로 값을 읽어 평가한다.
+조건을 정한 뒤 덤프의 FK 그래프를 따라 두 방향으로 퍼뜨린다.
+
+1. 아래로 (부모 → 자식, 위상 순서): ON DELETE CASCADE FK 는 소유 관계로 보고
+   자식 행이 부모를 따라간다 (DailyReports → ReportDetails, ReportSignatures).
+   조건이 있거나 이렇게 조건을 물려받은 테이블만 걸러지고, 나머지 테이블은
+   2단계에서 참조된 행만 들어간다.
+2. 위로 (자식 → 부모, 역순): 남은 행이 참조하는 부모 행을 모두 끌어온다
+   (ReportDetails → TemplateItems → ChecklistTemplates → Teams, ReportSignatures → Users).
+   그래서 결과는 FK 를 모두 만족한다.
+
+INSERT 문 위치는 오프셋 색인(dump_index, '<덤프>.idx')에서 테이블별로 바로 얻고,
+필요한 컬럼 값까지만 디코딩하므로 (서명 이미지 같은 뒤쪽 큰 값은 건드리지 않음)
+큰 덤프에서도 빠르다. 색인은 처음 한 번만 만든다.
+
+사용법:
+  python subset_extract.py --where "DailyReports.ReportDate >= '2025-09-01'" --where "TeamID IN (1, 2)"
+  python subset_extract.py 덤프.sql -o subset.sql --format copy \\
+      --where "ReportDate >= '$(date -d '-30 days' +%F)'"
+
+조건 형식: [테이블.]컬럼 연산자 값  (=, <>, !=, <, <=, >, >=, IN (...), NOT IN (...),
+BETWEEN a AND b, IS NULL, IS NOT NULL). 테이블을 생략하면 그 컬럼이 있는 모든
+대상 테이블에 적용한다. 같은 테이블의 조건은 AND 로 묶인다.
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from compressed_io import compression_of, open_output
+from dump_index import DumpIndex
+from final_sql_convert import convert_chunks, load_order, target_tables
+from pg_formats import FORMATS, make_format
+from prisma_mapping import PRISMA_SCHEMA, load_text_binaries
+from sql_dump_reader import MappedDump
+from sql_table_writer import LOAD_ORDER, TableSpoolWriter, sequence_reset_sql
+from tbm_schema import DumpSchema, decode_value
+from tsql_lexer import TsqlSyntaxError, insert_values
+
+HEAD_CHARS = 1024  # 필요한 컬럼이 앞쪽이면 문장 앞부분만 디코딩
+
+_WHERE_RE = re.compile(r"""
+    ^\s*(?:(?P<table>\w+)\.)?(?P<column>\w+)\s*
+    (?:
+        (?P<op><=|>=|<>|!=|=|<|>)\s*(?P<value>.+?)
+      | (?P<not>(?i:NOT)\s+)?(?i:IN)\s*\((?P<list>.*)\)
+      | (?i:BETWEEN)\s+(?P<low>.+?)\s+(?i:AND)\s+(?P<high>.+?)
+      | (?i:IS)\s+(?P<isnot>(?i:NOT)\s+)?(?i:NULL)
+    )\s*$
+""", re.VERBOSE | re.DOTALL)
+_LITERAL_RE = re.compile(r"N?'((?:[^']|'')*)'|([^,\s]+)")
+
+
+class SubsetError(ValueError):
+    """조건을 해석하거나 적용할 수 없는 경우"""
+
+
+def comparable(kind, value):
+    """덤프 값/조건 리터럴을 비교할 수 있는 Python 값으로 (날짜는 datetime)"""
+    value = decode_value(kind, value)
+    if value is None:
+        return None
+    if kind in ('timestamp', 'timestamptz', 'date'):
+        text = value.strip().replace('T', ' ', 1)
+        base, _, fraction = text.partition('.')
+        if fraction:
+            base += '.' + fraction[:6].ljust(6, '0')
+        try:
+            parsed = datetime.fromisoformat(base)
+        except ValueError:
+            raise SubsetError(f"날짜로 해석할 수 없음: {value!r}") from None
+        return parsed.date() if kind == 'date' else parsed.replace(tzinfo=None)
+    return value
+
+
+def _literals(text):
+    values = []
+    for quoted, bare in _LITERAL_RE.findall(text):
+        if bare and bare.upper() == 'NULL':
+            values.append(None)
+        else:
+            values.append(quoted.replace("''", "'") if bare == '' else bare)
+    return values
+
+
+class Predicate:
+    """[테이블.]컬럼 조건 하나 (bind() 로 컬럼 종류를 정한 뒤 호출)"""
+
+    def __init__(self, text, table, column, op, values):
+        self.text = text
+        self.table = table
+        self.column = column
+        self.op = op
+        self.values = values
+        self.kind = None
+
+    @classmethod
+    def parse(cls, text):
+        m = _WHERE_RE.match(text)
+        if not m:
+            raise SubsetError(f"조건을 해석할 수 없음: {text!r}")
+        table, column = m.group('table'), m.group('column')
+        if m.group('op'):
+            op = '<>' if m.group('op') == '!=' else m.group('op')
+            values = _literals(m.group('value'))
+            if len(values) != 1:
+                raise SubsetError(f"값이 하나가 아님: {text!r}")
+        elif m.group('list') is not None:
+            op = 'NOT IN' if m.group('not') else 'IN'
+            values = _literals(m.group('list'))
+        elif m.group('low') is not None:
+            op = 'BETWEEN'
+            values = _literals(m.group('low')) + _literals(m.group('high'))
+        else:
+            op = 'IS NOT NULL' if m.group('isnot') else 'IS NULL'
+            values = []
+        return cls(text, table, column, op, values)
+
+    def bind(self, kind):
+        """컬럼 종류에 맞춰 리터럴을 변환한 복사본"""
+        bound = Predicate(self.text, self.table, self.column, self.op, None)
+        bound.kind = kind
+        try:
+            bound.values = [comparable(kind, v) for v in self.values]
+        except (ValueError, ArithmeticError) as e:
+            raise SubsetError(f"{self.text!r}: {e}") from None
+        if self.op == 'IN' or self.op == 'NOT IN':
+            bound.values = set(bound.values)
+        return bound
+
+    def __call__(self, value):
+        op = self.op
+        if op == 'IS NULL':
+            return value is None
+        if op == 'IS NOT NULL':
+            return value is not None
+        if value is None:
+            return False
+        if op == 'IN':
+            return value in self.values
+        if op == 'NOT IN':
+            return value not in self.values
+        if op == 'BETWEEN':
+            return self.values[0] <= value <= self.values[1]
+        other = self.values[0]
+        if other is None:
+            return False
+        if op == '=':
+            return value == other
+        if op == '<>':
+            return value != other
+        if op == '<':
+            return value < other
+        if op == '<=':
+            return value <= other
+        if op == '>':
+            return value > other
+        return value >= other
+
+
+def bind_predicates(schema, tables, predicates):
+    """조건들을 테이블별 [Predicate] 로 (테이블 생략 조건은 그 컬럼이 있는 모든 테이블)"""
+    bound = {}
+    for pred in predicates:
+        candidates = [pred.table] if pred.table else tables
+        applied = False
+        for table in candidates:
+            table_def = schema.tables.get(table)
+            if table_def is None:
+                if pred.table:
+                    raise SubsetError(f"덤프에 없는 테이블: {table}")
+                continue
+            kinds = {c.name.lower(): (c.name, c.kind) for c in table_def.columns}
+            column = kinds.get(pred.column.lower())
+            if column is None:
+                continue
+            p = pred.bind(column[1])
+            p.column = column[0]
+            bound.setdefault(table, []).append(p)
+            applied = True
+        if not applied:
+            raise SubsetError(f"컬럼을 찾을 수 없음: {pred.text!r}")
+    return bound
+
+
+class SubsetPlan:
+    """FK 그래프를 따라 조건을 퍼뜨려 테이블별로 남길 행(오프셋)을 정함"""
+
+    def __init__(self, schema, tables, predicates):
+        self.schema = schema
+        self.order = schema.load_order(tables, order_hint=LOAD_ORDER)
+        self.predicates = predicates
+        self.kinds = {t: {c.name: c.kind for c in schema.tables[t].columns} for t in self.order}
+        self.parents = {t: [] for t in self.order}
+        referenced = {t: set() for t in self.order}
+        for fk in schema.foreign_keys:
+            if fk.table in self.parents and fk.ref_table in self.parents and fk.table != fk.ref_table:
+                self.parents[fk.table].append(fk)
+                referenced[fk.ref_table].add(tuple(fk.ref_columns))
+        # 조건이 있거나 CASCADE 부모를 통해 조건을 물려받는 테이블 (위상 순서라 부모가 먼저)
+        self.scoped = set()
+        for table in self.order:
+            if table in predicates or any(fk.on_delete == 'CASCADE' and fk.ref_table in self.scoped
+                                          for fk in self.parents[table]):
+                self.scoped.add(table)
+        self.referenced = referenced
+        self.wanted = {}
+        for table in self.order:
+            wanted = {p.column for p in predicates.get(table, ())}
+            for fk in self.parents[table]:
+                wanted.update(fk.columns)
+            for columns in referenced[table]:
+                wanted.update(columns)
+            self.wanted[table] = wanted
+        self.kept = {t: {} for t in self.order}       # 테이블 → {오프셋: 길이}
+        self.keys = {t: {cols: set() for cols in referenced[t]} for t in self.order}
+        self.needed = {t: {cols: set() for cols in referenced[t]} for t in self.order}
+        self.spans = {}                                # 테이블 → [(오프셋, 길이)] (run() 에서 채움)
+        self.matched = {t: 0 for t in self.order}
+        self.pulled = {t: 0 for t in self.order}
+
+    def _rows(self, dump, table):
+        """table 의 INSERT 문마다 (오프셋, 길이, {필요한 컬럼: 비교용 값})"""
+        wanted = self.wanted[table]
+        kinds = self.kinds[table]
+        head_bytes = HEAD_CHARS * dump.unit
+        for offset, length in self.spans.get(table, ()):
+            try:
+                raw = insert_values(dump.decode(offset, min(length, head_bytes)), wanted)
+            except TsqlSyntaxError:
+                if length <= head_bytes:
+                    raise
+                raw = insert_values(dump.decode(offset, length), wanted)
+            yield offset, length, {c: comparable(kinds[c], raw.get(c)) for c in wanted}
+
+    def _keep(self, table, offset, length, values):
+        self.kept[table][offset] = length
+        for columns, keys in self.keys[table].items():
+            keys.add(tuple(values[c] for c in columns))
+        # 이 행이 참조하는 부모 키는 위로 퍼뜨릴 때 끌어옴
+        for fk in self.parents[table]:
+            key = tuple(values[c] for c in fk.columns)
+            if None not in key:
+                self.needed[fk.ref_table][tuple(fk.ref_columns)].add(key)
+
+    def downward(self, dump):
+        """조건과 CASCADE 부모를 만족하는 행 (부모 테이블부터)"""
+        for table in self.order:
+            if table not in self.scoped:
+                continue
+            predicates = self.predicates.get(table, ())
+            owners = [fk for fk in self.parents[table]
+                      if fk.on_delete == 'CASCADE' and fk.ref_table in self.scoped]
+            for offset, length, values in self._rows(dump, table):
+                if not all(p(values[p.column]) for p in predicates):
+                    continue
+                if not all(tuple(values[c] for c in fk.columns)
+                           in self.keys[fk.ref_table][tuple(fk.ref_columns)] for fk in owners):
+                    continue
+                self._keep(table, offset, length, values)
+                self.matched[table] += 1
+
+    def upward(self, dump):
+        """남은 행이 참조하는 부모 행을 끌어옴 (자식 테이블부터)"""
+        for table in reversed(self.order):
+            missing = {cols: needed - self.keys[table][cols] for cols, needed in self.needed[table].items()}
+            if not any(missing.values()):
+                continue
+            for offset, length, values in self._rows(dump, table):
+                if offset in self.kept[table]:
+                    continue
+                if any(tuple(values[c] for c in cols) in keys for cols, keys in missing.items()):
+                    self._keep(table, offset, length, values)
+                    self.pulled[table] += 1
+
+    def run(self, path):
+        index = DumpIndex.open(path)
+        # 색인에서 테이블별 (오프셋, 길이) 목록 (파일 순서)
+        self.spans = {}
+        for table_id, offset, length in zip(index.table_ids, index.offsets, index.lengths):
+            self.spans.setdefault(index.tables[table_id], []).append((offset, length))
+        with MappedDump(path) as dump:
+            self.downward(dump)
+            self.upward(dump)
+        return self
+
+    def chunks(self, path, max_statements=2000):
+        """남길 행을 적재 순서 → 파일 순서로 디코딩해 묶음으로 생성"""
+        with MappedDump(path) as dump:
+            for table in self.order:
+                chunk = []
+                for offset in sorted(self.kept[table]):
+                    chunk.append(dump.decode(offset, self.kept[table][offset]))
+                    if len(chunk) >= max_statements:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description='조건 + FK 관계로 덤프 일부만 PostgreSQL 적재 파일로')
+    parser.add_argument('input', nargs='?', default='attached_assets/script1_1760403229620.sql')
+    parser.add_argument('-o', '--output', default='FoodieMatch/subset_tbm_data.sql')
+    parser.add_argument('--where', action='append', required=True, metavar='조건',
+                        help="[테이블.]컬럼 조건, 예: \"DailyReports.ReportDate >= '2025-09-01'\" (여러 번 지정)")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='insert')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='Prisma 필드가 String 인 varbinary 컬럼을 base64 로 쓰기 위해 읽을 schema.prisma')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='변환 프로세스 수')
+    args = parser.parse_args()
+
+    if compression_of(args.input):
+        # 색인/mmap 으로 조건에 맞는 행만 골라 읽으므로 임의 접근이 되는 파일이어야 함
+        sys.exit(f"❌ 압축된 덤프에서는 추출할 수 없습니다 (먼저 압축을 풀 것): {args.input}")
+    schema = DumpSchema.scan(args.input)
+    tables = [t for t in LOAD_ORDER if t in target_tables and t in schema.tables]
+    try:
+        predicates = bind_predicates(schema, tables, [Predicate.parse(w) for w in args.where])
+        plan = SubsetPlan(schema, tables, predicates).run(args.input)
+    except SubsetError as e:
+        sys.exit(f"❌ {e}")
+
+    fmt = make_format(args.format)
+    fmt.use_schema(schema, load_text_binaries(schema, args.prisma_schema))
+    with TableSpoolWriter(LOAD_ORDER, fmt=fmt) as writer:
+        convert_chunks(plan.chunks(args.input), writer, args.jobs)
+        writer.table_order = load_order(schema)
+        with open_output(args.output) as f:
+            writer.write_to(f)
+            f.write('\n-- Reset sequences\n')
+            f.write(sequence_reset_sql(writer.table_order, schema.identity_columns()))
+
+        print(f"✅ 추출 완료: {args.output}")
+        print(f"📝 총 {writer.total()} 개의 행 생성 ({args.format})")
+        for table in plan.order:
+            if plan.kept[table]:
+                print(f"   - {table}: {len(plan.kept[table])}개 "
+                      f"(조건 {plan.matched[table]}, 참조 {plan.pulled[table]})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""증분(델타) 변환용 체크포인트
+
+매일 다시 내보내는 덤프에서 새로 생긴 행만 뽑기 위해 테이블별 기준값을
+JSON 파일에 저장한다.
+- 보고서 테이블(DailyReports, ReportDetails, ReportSignatures): IDENTITY 최댓값
+  (high-water mark). 다음 실행에서는 이보다 큰 ID 의 행만 내보낸다.
+- 참조 테이블(Teams, ChecklistTemplates, TemplateItems, Users): 행 내용 해시.
+  해시가 바뀐 테이블만 통째로 다시 내보낸다 (작은 테이블이므로 upsert 로).
+
+해시는 행마다 blake2b 다이제스트를 더하는 방식이라 행 순서와 무관하고,
+병렬 변환에서 묶음별로 따로 계산해 더해도 같은 값이 나온다.
+
+변환이 끝나도 체크포인트 파일은 바로 바꾸지 않고 옆의 '<파일>.pending' 에
+새 기준값을 쓴다. 출력 파일을 DB 에 다 넣은 뒤 commit_pending() 으로
+(final_sql_convert.py --commit-checkpoint) 확정해야 다음 실행의 기준이 된다.
+적재가 실패하면 .pending 을 지우거나 그대로 두고 다시 변환하면 같은 델타가 나온다.
+"""
+import hashlib
+import json
+import os
+
+from sql_table_writer import ID_COLUMNS
+from tsql_lexer import insert_key
+
+# ID 가 계속 늘어나기만 하는 테이블 (high-water mark 로 새 행만)
+DELTA_TABLES = ('DailyReports', 'ReportDetails', 'ReportSignatures')
+
+# 작은 참조 테이블 (내용 해시로 바뀐 테이블만)
+REFERENCE_TABLES = ('Teams', 'ChecklistTemplates', 'TemplateItems', 'Users')
+
+_DIGEST_MOD = 1 << 128
+
+
+def row_digest(stmt):
+    """문장 하나의 128비트 다이제스트 (공백 차이는 무시)"""
+    text = ' '.join(stmt.split())
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), 'big')
+
+
+class TableMarks:
+    """묶음 하나에서 모은 테이블별 (최대 ID, 행 수, 다이제스트 합)
+
+    워커에서 만들어 부모로 넘기고, 부모는 merge() 로 합친다.
+    """
+
+    def __init__(self):
+        self.max_ids = {}
+        self.rows = {}
+        self.digests = {}
+
+    def observe(self, table, stmt):
+        """행 하나를 반영하고 그 행의 ID 를 돌려줌 (ID 컬럼이 없으면 None)"""
+        self.rows[table] = self.rows.get(table, 0) + 1
+        if table in REFERENCE_TABLES:
+            self.digests[table] = (self.digests.get(table, 0) + row_digest(stmt)) % _DIGEST_MOD
+        id_col = ID_COLUMNS.get(table)
+        if id_col is None:
+            return None
+        pk = int(insert_key(stmt, id_col))
+        if pk > self.max_ids.get(table, 0):
+            self.max_ids[table] = pk
+        return pk
+
+    def merge(self, other):
+        for table, pk in other.max_ids.items():
+            if pk > self.max_ids.get(table, 0):
+                self.max_ids[table] = pk
+        for table, n in other.rows.items():
+            self.rows[table] = self.rows.get(table, 0) + n
+        for table, digest in other.digests.items():
+            self.digests[table] = (self.digests.get(table, 0) + digest) % _DIGEST_MOD
+
+
+class Checkpoint:
+    """이전 실행의 기준값 (high-water mark + 참조 테이블 해시)"""
+
+    def __init__(self, marks=None, hashes=None):
+        self.marks = dict(marks or {})
+        self.hashes = dict(hashes or {})
+
+    @classmethod
+    def load(cls, path):
+        """체크포인트 파일을 읽음 (없으면 빈 체크포인트 = 전체 변환)"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data.get('marks'), data.get('hashes'))
+
+    @classmethod
+    def from_marks(cls, marks):
+        """이번 실행에서 모은 TableMarks 로 새 체크포인트를 만듦"""
+        return cls(marks.max_ids, {t: f'{d:032x}' for t, d in marks.digests.items()})
+
+    def save(self, path):
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'marks': self.marks, 'hashes': self.hashes}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        os.replace(tmp, path)
+
+    def save_pending(self, path):
+        """새 기준값을 확정 전 파일(path.pending)에 저장하고 그 경로를 돌려줌"""
+        pending = pending_path(path)
+        self.save(pending)
+        return pending
+
+    def since(self):
+        """워커에 넘길 델타 기준 {테이블: 마지막 ID}"""
+        return {t: self.marks[t] for t in DELTA_TABLES if t in self.marks}
+
+    def unchanged(self, marks):
+        """해시가 이전과 같은 참조 테이블 (출력에서 뺄 테이블)"""
+        current = Checkpoint.from_marks(marks).hashes
+        return [t for t in REFERENCE_TABLES if t in self.hashes and self.hashes[t] == current.get(t)]
+
+
+def pending_path(path):
+    return path + '.pending'
+
+
+def commit_pending(path):
+    """적재가 끝난 뒤 path.pending 을 path 로 확정 (확정할 것이 없으면 False)"""
+    pending = pending_path(path)
+    if not os.path.exists(pending):
+        return False
+    os.replace(pending, path)
+    return True
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""덤프에 들어 있는 DDL 에서 테이블 구조와 관계를 읽어내는 모듈
+
+CREATE TABLE 문으로 테이블별 컬럼 타입/PK/IDENTITY 를 읽고,
+ALTER TABLE ... FOREIGN KEY 문으로 의존성 그래프를 만들어
+동시에 적재할 수 있는 테이블끼리 묶은 위상 정렬 단계(wave)를 계산한다.
+CREATE INDEX 와 ALTER TABLE ... DEFAULT 도 모아 두어 PostgreSQL DDL 로
+옮길 수 있게 한다 (pg_ddl).
+"""
+import re
+from collections import namedtuple
+from decimal import Decimal
+
+from compressed_io import compression_of
+from sql_dump_reader import DDL_PREFIXES, MappedDump, iter_statements
+from tsql_lexer import Binary, Cast
+
+ForeignKey = namedtuple('ForeignKey', 'name table columns ref_table ref_columns on_delete')
+Column = namedtuple('Column', 'name type size kind nullable identity scale', defaults=(None,))
+TableDef = namedtuple('TableDef', 'name columns primary_key pk_name', defaults=(None,))
+IndexDef = namedtuple('IndexDef', 'name table columns unique include')
+
+# T-SQL 타입 → 값 종류 (변환기/인코더가 쓰는 분류)
+TYPE_KINDS = {
+    'int': 'integer', 'bigint': 'integer', 'smallint': 'integer', 'tinyint': 'integer',
+    'bit': 'boolean',
+    'decimal': 'numeric', 'numeric': 'numeric', 'money': 'numeric', 'smallmoney': 'numeric',
+    'float': 'numeric', 'real': 'numeric',
+    'datetime2': 'timestamp', 'datetime': 'timestamp', 'smalldatetime': 'timestamp',
+    'date': 'date', 'time': 'time', 'datetimeoffset': 'timestamptz',
+    'varbinary': 'bytea', 'binary': 'bytea', 'image': 'bytea',
+}
+
+_NAME = r"(?:\[dbo\]\.|dbo\.)?\[?(\w+)\]?"
+_FK_RE = re.compile(
+    r"\s*ALTER\s+TABLE\s+" + _NAME + r".*?ADD\s+CONSTRAINT\s+\[?(\w+)\]?\s+"
+    r"FOREIGN\s+KEY\s*\(([^)]*)\)\s*REFERENCES\s+" + _NAME + r"\s*\(([^)]*)\)"
+    r"(?:\s+ON\s+DELETE\s+(CASCADE|SET\s+NULL|SET\s+DEFAULT|NO\s+ACTION))?",
+    re.IGNORECASE | re.DOTALL)
+_COLUMN_LIST_RE = re.compile(r"\[([^\]]+)\]|(\w+)")
+_CREATE_RE = re.compile(r"\s*CREATE\s+TABLE\s+" + _NAME + r"\s*\(", re.IGNORECASE)
+_COLUMN_DEF_RE = re.compile(
+    r"\s*\[?(\w+)\]?\s+\[?(\w+)\]?(?:\s*\(\s*(\w+)(?:\s*,\s*(\d+))?\s*\))?(?P<rest>.*)",
+    re.IGNORECASE | re.DOTALL)
+_PK_RE = re.compile(r"(?:CONSTRAINT\s+\[?(\w+)\]?\s+)?PRIMARY\s+KEY\s+(?:CLUSTERED|NONCLUSTERED)?\s*\(([^)]*)\)",
+                    re.IGNORECASE)
+_INDEX_RE = re.compile(
+    r"\s*CREATE\s+(UNIQUE\s+)?(?:CLUSTERED\s+|NONCLUSTERED\s+)?INDEX\s+\[?(\w+)\]?\s+ON\s+" + _NAME +
+    r"\s*\(([^)]*)\)(?:\s*INCLUDE\s*\(([^)]*)\))?", re.IGNORECASE)
+_DEFAULT_RE = re.compile(
+    r"\s*ALTER\s+TABLE\s+" + _NAME + r"\s+ADD\s+(?:CONSTRAINT\s+\[?\w+\]?\s+)?DEFAULT\s+(.*?)\s+FOR\s+\[?(\w+)\]?\s*$",
+    re.IGNORECASE | re.DOTALL)
+
+
+class SchemaError(ValueError):
+    """FK 순환 등 스키마로부터 적재 순서를 정할 수 없는 경우"""
+
+
+def is_schema_statement(stmt):
+    """DDL 관찰 대상 문장인지 (CREATE TABLE / CREATE INDEX / ALTER TABLE)"""
+    head = ' '.join(stmt.lstrip()[:40].split()).upper() + ' '
+    return head.startswith(DDL_PREFIXES)
+
+
+def _columns(text):
+    return [a or b for a, b in _COLUMN_LIST_RE.findall(text)]
+
+
+def _split_top_level(text):
+    """괄호 밖의 쉼표로만 나눔 (IDENTITY(1,1), decimal(10, 2) 는 그대로)"""
+    parts = []
+    depth = 0
+    start = 0
+    for i, ch in enumerate(text):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parse_create_table(stmt):
+    """CREATE TABLE 문 → TableDef (컬럼 이름/타입/크기/NULL 여부/IDENTITY, PK 컬럼)
+
+    SSMS 형식처럼 컬럼 정의 뒤에 CONSTRAINT ... PRIMARY KEY 가 오는 경우와
+    컬럼에 바로 PRIMARY KEY 가 붙는 경우를 모두 읽는다. 아니면 None.
+    """
+    m = _CREATE_RE.match(stmt)
+    if not m:
+        return None
+    body = stmt[m.end():]
+    constraint = re.search(r"(?:^|,)\s*(?:CONSTRAINT|PRIMARY\s+KEY)\b", body, re.IGNORECASE)
+    column_text = body[:constraint.start()] if constraint else body[:body.rfind(')')]
+
+    columns = []
+    primary_key = []
+    for part in _split_top_level(column_text):
+        cm = _COLUMN_DEF_RE.match(part)
+        if not cm:
+            continue
+        name, sql_type, size, scale = cm.group(1), cm.group(2).lower(), cm.group(3), cm.group(4)
+        rest = cm.group('rest').upper()
+        columns.append(Column(name, sql_type, size, TYPE_KINDS.get(sql_type, 'text'),
+                              'NOT NULL' not in rest, 'IDENTITY' in rest, scale))
+        if 'PRIMARY KEY' in rest:
+            primary_key.append(name)
+    pk = _PK_RE.search(body)
+    if pk and not primary_key:
+        primary_key = [c.split()[0] for c in _columns(pk.group(2)) if c.upper() not in ('ASC', 'DESC')]
+    return TableDef(m.group(1), tuple(columns), tuple(primary_key), pk.group(1) if pk else None)
+
+
+def parse_index(stmt):
+    """CREATE [UNIQUE] [NON]CLUSTERED INDEX 문 → IndexDef (아니면 None)
+
+    정렬 방향(ASC/DESC)과 WITH (...) 저장 옵션은 버린다.
+    """
+    m = _INDEX_RE.match(stmt)
+    if not m:
+        return None
+    unique, name, table, columns, include = m.groups()
+    return IndexDef(name, table, tuple(c for c in _columns(columns) if c.upper() not in ('ASC', 'DESC')),
+                    bool(unique), tuple(_columns(include or '')))
+
+
+def parse_default(stmt):
+    """ALTER TABLE ... ADD DEFAULT (식) FOR [컬럼] → (테이블, 컬럼, T-SQL 식) (아니면 None)"""
+    m = _DEFAULT_RE.match(stmt)
+    if not m:
+        return None
+    return m.group(1), m.group(3), m.group(2)
+
+
+def identity_column(table_def):
+    """시퀀스를 맞출 컬럼 (IDENTITY 컬럼, 없으면 정수 단일 PK)"""
+    for column in table_def.columns:
+        if column.identity:
+            return column.name
+    if len(table_def.primary_key) == 1:
+        name = table_def.primary_key[0]
+        if any(c.name == name and c.kind == 'integer' for c in table_def.columns):
+            return name
+    return None
+
+
+def decode_value(kind, value):
+    """parse_insert() 값 하나를 컬럼 종류에 맞는 Python 값으로
+
+    integer → int, boolean → bool, numeric → Decimal, 날짜/시간 → 원문 문자열,
+    bytea → Binary, 나머지 → str. NULL 은 None 그대로.
+    """
+    if value is None:
+        return None
+    if isinstance(value, Cast):
+        value = value.value
+    if kind == 'integer':
+        return int(value)
+    if kind == 'boolean':
+        return bool(int(value))
+    if kind == 'numeric':
+        return value if isinstance(value, (int, Decimal)) else Decimal(value)
+    if kind == 'bytea':
+        return value if isinstance(value, Binary) else Binary(value.encode('utf-8').hex())
+    return value if isinstance(value, str) else str(value)
+
+
+class TypedRow:
+    """테이블별 __slots__ 행 클래스의 기반 (row_type() 으로 만듦)"""
+
+    __slots__ = ()
+    _table = None
+    _kinds = {}  # 컬럼 이름 → 종류
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self._table.name}({values})'
+
+
+_ROW_TYPES = {}
+
+
+def row_type(table_def):
+    """TableDef 에 맞는 __slots__ 행 클래스 (컬럼 순서 = DDL 순서)"""
+    cls = _ROW_TYPES.get(table_def)
+    if cls is None:
+        cls = type(table_def.name + 'Row', (TypedRow,), {
+            '__slots__': tuple(c.name for c in table_def.columns),
+            '_table': table_def,
+            '_kinds': {c.name: c.kind for c in table_def.columns},
+        })
+        _ROW_TYPES[table_def] = cls
+    return cls
+
+
+def decode_row(table_def, ins):
+    """InsertStatement 를 DDL 컬럼 순서의 타입 있는 행으로
+
+    INSERT 에 없는 컬럼은 None. DDL 에 없는 컬럼이 INSERT 에 있으면 SchemaError.
+    """
+    cls = row_type(table_def)
+    row = cls.__new__(cls)
+    for name in cls.__slots__:
+        setattr(row, name, None)
+    kinds = cls._kinds
+    for name, value in zip(ins.columns, ins.values):
+        kind = kinds.get(name)
+        if kind is None:
+            raise SchemaError(f"{table_def.name} 에 없는 컬럼: {name}")
+        setattr(row, name, decode_value(kind, value))
+    return row
+
+
+def parse_foreign_key(stmt):
+    """ALTER TABLE ... ADD CONSTRAINT [FK_...] FOREIGN KEY 문 → ForeignKey (아니면 None)"""
+    m = _FK_RE.match(stmt)
+    if not m:
+        return None
+    table, name, columns, ref_table, ref_columns, on_delete = m.groups()
+    if on_delete:
+        on_delete = ' '.join(on_delete.upper().split())
+    return ForeignKey(name, table, _columns(columns), ref_table, _columns(ref_columns), on_delete)
+
+
+def dependency_waves(tables, foreign_keys, order_hint=None):
+    """FK 그래프를 위상 정렬해 단계별 테이블 목록으로
+
+    같은 단계의 테이블은 서로 참조하지 않으므로 동시에 적재할 수 있다.
+    단계 안의 순서는 order_hint (없으면 이름순) 를 따른다.
+    """
+    tables = list(tables)
+    hint = {t: i for i, t in enumerate(order_hint or [])}
+    parents = {t: set() for t in tables}
+    for fk in foreign_keys:
+        if fk.table in parents and fk.ref_table in parents and fk.table != fk.ref_table:
+            parents[fk.table].add(fk.ref_table)
+
+    waves = []
+    done = set()
+    remaining = set(tables)
+    while remaining:
+        ready = [t for t in remaining if parents[t] <= done]
+        if not ready:
+            raise SchemaError(f"FK 순환 참조: {', '.join(sorted(remaining))}")
+        ready.sort(key=lambda t: (hint.get(t, len(hint)), t))
+        waves.append(ready)
+        done.update(ready)
+        remaining.difference_update(ready)
+    return waves
+
+
+class DumpSchema:
+    """덤프를 읽으면서 만나는 DDL 문을 모아 두는 객체"""
+
+    def __init__(self):
+        self.tables = {}
+        self.foreign_keys = []
+        self.indexes = []
+        self.defaults = {}
+
+    @classmethod
+    def scan(cls, path):
+        """덤프의 CREATE/ALTER TABLE, CREATE INDEX 문만 mmap 으로 한 번 훑어 읽음 (행은 디코딩하지 않음)
+
+        FK/인덱스/기본값 ALTER 는 SSMS 덤프에서 INSERT 뒤에 나오므로 끝까지 훑는다.
+        MappedDump.scan 이 지나간 창의 페이지를 놓아 주므로 큰 덤프도 상주 메모리는
+        창 크기(SCAN_WINDOW) 정도다.
+
+        압축된 덤프는 mmap 할 수 없으므로 전체를 스트리밍하면서 DDL 만 고른다.
+        """
+        schema = cls()
+        if compression_of(path) is not None:
+            for stmt in iter_statements(path):
+                if is_schema_statement(stmt):
+                    schema.observe(stmt)
+            return schema
+        with MappedDump(path) as dump:
+            for _, offset, length in dump.scan(DDL_PREFIXES):
+                schema.observe(dump.decode(offset, length))
+        return schema
+
+    def observe(self, stmt):
+        """DDL 문 하나를 반영 (관심 없는 문장이면 False, 같은 문장을 다시 봐도 됨)"""
+        table_def = parse_create_table(stmt)
+        if table_def is not None:
+            self.tables[table_def.name] = table_def
+            return True
+        fk = parse_foreign_key(stmt)
+        if fk is not None:
+            if fk not in self.foreign_keys:
+                self.foreign_keys.append(fk)
+            return True
+        index = parse_index(stmt)
+        if index is not None:
+            if index not in self.indexes:
+                self.indexes.append(index)
+            return True
+        default = parse_default(stmt)
+        if default is None:
+            return False
+        table, column, expr = default
+        self.defaults.setdefault(table, {})[column] = expr
+        return True
+
+    def identity_columns(self):
+        """테이블별 시퀀스 컬럼 (DDL 의 IDENTITY/PK 에서)"""
+        columns = {}
+        for name, table_def in self.tables.items():
+            column = identity_column(table_def)
+            if column is not None:
+                columns[name] = column
+        return columns
+
+    def waves(self, tables, order_hint=None):
+        return dependency_waves(tables, self.foreign_keys, order_hint)
+
+    def load_order(self, tables, order_hint=None):
+        """단계를 이어 붙인 적재 순서 (FK 정보가 없으면 order_hint 순서)"""
+        return [t for wave in self.waves(tables, order_hint) for t in wave]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""fix_sql_data 회귀 테스트 (멀쩡한 출력은 그대로, 잘린 행은 타입대로 다시 변환)"""
+import base64
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PNG = bytes.fromhex('89504E470D0A1A0A0000000D49484452')
+
+DUMP = '\r\n'.join([
+    'CREATE TABLE [dbo].[ReportSignatures](',
+    '\t[SignatureID] [int] IDENTITY(1,1) NOT NULL,',
+    '\t[SignatureImage] [varbinary](max) NULL,',
+    '\t[SignedAt] [datetime2](7) NOT NULL,',
+    ' CONSTRAINT [PK_ReportSignatures] PRIMARY KEY CLUSTERED ',
+    '(',
+    '\t[SignatureID] ASC',
+    ')) ON [PRIMARY]',
+    'GO',
+    'CREATE TABLE [dbo].[TemplateItems](',
+    '\t[ItemID] [int] IDENTITY(1,1) NOT NULL,',
+    '\t[Description] [nvarchar](max) NULL,',
+    ' CONSTRAINT [PK_TemplateItems] PRIMARY KEY CLUSTERED ',
+    '(',
+    '\t[ItemID] ASC',
+    ')) ON [PRIMARY]',
+    'GO',
+    'SET IDENTITY_INSERT [dbo].[ReportSignatures] ON ',
+    '',
+    'INSERT [dbo].[ReportSignatures] ([SignatureID], [SignatureImage], [SignedAt]) VALUES '
+    '(1, 0x' + PNG.hex().upper() + ", CAST(N'2025-10-14T09:00:00.0000000' AS DateTime2))",
+    'SET IDENTITY_INSERT [dbo].[ReportSignatures] OFF',
+    'GO',
+    'SET IDENTITY_INSERT [dbo].[TemplateItems] ON ',
+    '',
+    "INSERT [dbo].[TemplateItems] ([ItemID], [Description]) VALUES (1, N'첫 줄\r\n둘째 줄')",
+    "INSERT [dbo].[TemplateItems] ([ItemID], [Description]) VALUES (2, N'한 줄')",
+    'SET IDENTITY_INSERT [dbo].[TemplateItems] OFF',
+    'GO',
+    '',
+])
+
+PRISMA = '''model ReportSignature {
+  id             Int      @id @default(autoincrement()) @map("SignatureID")
+  signatureImage String?  @map("SignatureImage")
+  signedAt       DateTime @map("SignedAt")
+
+  @@map("ReportSignatures")
+}
+'''
+
+
+def run(script, *args):
+    subprocess.run([sys.executable, os.path.join(ROOT, script), *args],
+                   cwd=ROOT, check=True, capture_output=True)
+
+
+@pytest.fixture(params=['insert', 'insert-batch'])
+def converted(request, tmp_path):
+    """(덤프, schema.prisma, final_sql_convert 출력) 경로"""
+    dump = tmp_path / 'dump.sql'
+    dump.write_bytes('﻿'.encode('utf-16-le') + DUMP.encode('utf-16-le'))
+    prisma = tmp_path / 'schema.prisma'
+    prisma.write_text(PRISMA, encoding='utf-8')
+    output = tmp_path / 'out.sql'
+    run('final_sql_convert.py', str(dump), '-o', str(output), '--format', request.param,
+        '--prisma-schema', str(prisma))
+    return dump, prisma, output
+
+
+def fix(converted, source):
+    dump, prisma, _ = converted
+    fixed = source.with_name('fixed.sql')
+    run('fix_sql_data.py', str(source), '-o', str(fixed), '--dump', str(dump), '--prisma-schema', str(prisma))
+    return fixed.read_bytes()
+
+
+def test_clean_output_round_trips(converted):
+    output = converted[2]
+    data = output.read_bytes()
+    assert '첫 줄\r\n둘째 줄'.encode('utf-8') in data
+    assert fix(converted, output) == data
+
+
+def test_truncated_row_repaired_as_base64(converted):
+    output = converted[2]
+    data = output.read_bytes()
+    text = data.decode('utf-8')
+    image = base64.b64encode(PNG).decode('ascii')
+    cut = text.index(image) + 8
+    truncated = output.with_name('truncated.sql')
+    truncated.write_bytes((text[:cut] + text[text.index('\n', cut):]).encode('utf-8'))
+
+    fixed = fix(converted, truncated).decode('utf-8')
+    assert "'" + image + "'" in fixed
+    assert '\\x' not in fixed
+    assert '첫 줄\r\n둘째 줄' in fixed
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""tsql_lexer 회귀 테스트 (convert_statement / parse_insert)"""
+from decimal import Decimal
+
+import pytest
+
+from tsql_lexer import Binary, Cast, TsqlSyntaxError, convert_statement, parse_insert, statement_table
+
+
+def test_literal_contents_unchanged():
+    sql = "INSERT [dbo].[Notes] ([Id], [Body]) VALUES (1, N'a;b) N''x'' [y] 0x12 CAST(')"
+    assert convert_statement(sql) == \
+        "INSERT INTO \"Notes\" (\"Id\", \"Body\") VALUES (1, 'a;b) N''x'' [y] 0x12 CAST(');"
+
+
+def test_crlf_inside_literal_kept():
+    sql = "INSERT [dbo].[T] ([A]) VALUES (N'line1\r\nline2')"
+    assert convert_statement(sql) == "INSERT INTO \"T\" (\"A\") VALUES ('line1\r\nline2');"
+
+
+def test_identity_insert_not_treated_as_insert():
+    assert convert_statement('SET IDENTITY_INSERT [dbo].[Users] ON') == 'SET IDENTITY_INSERT "dbo"."Users" ON;'
+    assert statement_table('SET IDENTITY_INSERT [dbo].[Users] ON') is None
+    assert statement_table('INSERT [dbo].[Users] ([Id]) VALUES (1)') == 'Users'
+
+
+def test_hex_inside_identifier_not_binary():
+    sql = 'INSERT [dbo].[T] (Col0x12, [B]) VALUES (1, 0x0A0B)'
+    assert convert_statement(sql) == "INSERT INTO \"T\" (Col0x12, \"B\") VALUES (1, '\\x0A0B'::bytea);"
+
+
+def test_datetime_cast():
+    sql = "INSERT [dbo].[T] ([At]) VALUES (CAST(N'2024-01-02T03:04:05.000' AS DateTime2))"
+    assert convert_statement(sql) == "INSERT INTO \"T\" (\"At\") VALUES ('2024-01-02T03:04:05.000'::timestamp);"
+
+
+def test_cast_keeps_precision():
+    sql = "INSERT [dbo].[T] ([Price]) VALUES (CAST(N'1.5' AS Decimal(18, 2)))"
+    assert convert_statement(sql) == "INSERT INTO \"T\" (\"Price\") VALUES (CAST('1.5' AS decimal(18, 2)));"
+
+
+def test_numeric_cast():
+    sql = 'INSERT [dbo].[T] ([Id], [Price]) VALUES (1, CAST(12.50 AS Decimal(18, 2)))'
+    assert convert_statement(sql) == 'INSERT INTO "T" ("Id", "Price") VALUES (1, CAST(12.50 AS decimal(18, 2)));'
+    assert parse_insert(sql).values == [1, Decimal('12.50')]
+
+
+def test_parse_insert_values():
+    sql = ("INSERT [dbo].[T] ([A], [B], [C], [D], [E], [F]) VALUES "
+           "(-3, 1.25, N'it''s', NULL, 0x8950, CAST(N'2024-01-02' AS Date))")
+    stmt = parse_insert(sql)
+    assert stmt.table == 'T'
+    assert stmt.columns == ['A', 'B', 'C', 'D', 'E', 'F']
+    assert stmt.values == [-3, Decimal('1.25'), "it's", None, Binary('8950'), Cast('2024-01-02', 'date')]
+    assert isinstance(stmt.values[4], Binary)
+
+
+def test_unterminated_literal_raises():
+    with pytest.raises(TsqlSyntaxError):
+        convert_statement("INSERT [dbo].[T] ([A]) VALUES (N'abc")
+    with pytest.raises(TsqlSyntaxError):
+        parse_insert("INSERT [dbo].[T] ([A]) VALUES (N'abc")
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""T-SQL INSERT 문을 PostgreSQL 문법으로 바꾸는 단일 패스 렉서
+
+여러 번의 re.sub 대신 토큰 정규식 하나로 문장을 왼쪽에서 오른쪽으로
+한 번만 훑는다. 문자열 리터럴은 하나의 토큰으로 통째로 소비되므로
+리터럴 안의 ; ) N' [x] 는 절대 변환되지 않는다.
+"""
+import re
+from collections import namedtuple
+from decimal import Decimal
+
+
+class TsqlSyntaxError(ValueError):
+    """닫히지 않은 리터럴/식별자 등 토큰화할 수 없는 문장"""
+
+
+# 날짜 CAST 를 PostgreSQL 캐스트 타입으로
+CAST_TYPES = {
+    'datetime2': 'timestamp',
+    'datetime': 'timestamp',
+    'smalldatetime': 'timestamp',
+    'date': 'date',
+    'time': 'time',
+    'datetimeoffset': 'timestamptz',
+}
+
+_STRING = r"'[^']*(?:''[^']*)*'"
+_IDENT = r"\[[^\]]*(?:\]\][^\]]*)*\]"
+_NUMBER = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+# CAST(N'...' AS 타입(크기)) / CAST(12.50 AS Decimal(18, 2))
+_CAST = (r"(?i:CAST)\s*\(\s*(?:N?(?P<cast_value>" + _STRING + r")|(?P<cast_number>" + _NUMBER + r"))"
+         r"\s+(?i:AS)\s+(?P<cast_type>\w+)(?P<cast_size>\s*\([^)]*\))?\s*\)")
+
+# 토큰 종류별 대안 (순서가 곧 우선순위). 키워드와 0x 는 단어 중간(IDENTITY_INSERT,
+# 이름이 ...0x12 로 끝나는 식별자)에서 잡지 않도록 앞뒤 경계를 본다.
+_TOKEN_RE = re.compile(r"""
+    (?<!\w)(?P<insert>(?i:INSERT)\s+(?:(?i:INTO)\s+)?(?:(?:\[dbo\]|(?i:dbo))\.)?(?P<table>""" + _IDENT + r"""|\w+))
+  | (?<!\w)(?P<cast>""" + _CAST + r""")
+  | (?<!\w)N?(?P<string>""" + _STRING + r""")
+  | (?P<unterminated>(?<!\w)N?'.*)
+  | (?P<ident>""" + _IDENT + r""")
+  | (?<!\w)0[xX](?P<binary>[0-9A-Fa-f]*)(?!\w)
+  | (?P<ws>\s+)
+""", re.VERBOSE | re.DOTALL)
+
+_INSERT_TABLE_RE = re.compile(
+    r"\s*(?i:INSERT)\s+(?:(?i:INTO)\s+)?(?:(?:\[dbo\]|(?i:dbo))\.)?(" + _IDENT + r"|\w+)")
+
+
+def quote_ident(name):
+    """PostgreSQL 큰따옴표 식별자"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unbracket(text):
+    if text.startswith('['):
+        return text[1:-1].replace(']]', ']')
+    return text
+
+
+def statement_table(sql):
+    """INSERT 문의 대상 테이블 이름 (INSERT 문이 아니면 None)
+
+    문장 맨 앞에서만 매칭하므로 SET IDENTITY_INSERT [dbo].[X] 같은
+    문장을 INSERT 로 착각하지 않는다.
+    """
+    match = _INSERT_TABLE_RE.match(sql)
+    if not match:
+        return None
+    return _unbracket(match.group(1))
+
+
+def bytea_literal(hex_digits):
+    """0x 바이너리 리터럴의 16진수 부분 → PostgreSQL bytea 리터럴"""
+    return "'\\x" + hex_digits + "'::bytea"
+
+
+def convert_statement(sql, table_name=quote_ident, column_name=quote_ident, binary=bytea_literal):
+    """T-SQL 문장 하나를 PostgreSQL 문장으로 변환 (선형 시간)
+
+    - INSERT [dbo].[T] → INSERT INTO "T"
+    - [Column] → "Column"
+    - N'문자열' → '문자열' ('' 이스케이프는 그대로)
+    - CAST(N'...' AS DateTime2) → '...'::timestamp
+    - CAST(12.50 AS Decimal(18, 2)) → CAST(12.50 AS decimal(18, 2))
+    - 0x89504E47... → '\\x89504E47...'::bytea
+    - 리터럴 밖의 연속 공백 → 공백 하나, 끝에 세미콜론 하나
+    table_name / column_name 으로 식별자 출력 방식을, binary 로 바이너리
+    리터럴 출력 방식을 바꿀 수 있다.
+    """
+
+    def replace(m):
+        kind = m.lastgroup
+        if kind == 'ws':
+            return ' '
+        if kind == 'string':
+            return m.group('string')
+        if kind == 'binary':
+            # 매칭된 구간의 16진수만 한 번 잘라 넘김 (문장 전체 재복사 없음)
+            return binary(m.group('binary'))
+        if kind == 'ident':
+            return column_name(_unbracket(m.group('ident')))
+        if kind == 'insert':
+            return 'INSERT INTO ' + table_name(_unbracket(m.group('table')))
+        if kind == 'cast':
+            value = m.group('cast_value') or m.group('cast_number')
+            pg_type = CAST_TYPES.get(m.group('cast_type').lower())
+            if pg_type is None:
+                # 모르는 타입은 CAST 형태를 유지 (Decimal(18, 2) 의 정밀도/스케일도 그대로)
+                size = (m.group('cast_size') or '').strip()
+                return 'CAST(' + value + ' AS ' + m.group('cast_type').lower() + size + ')'
+            return value + '::' + pg_type
+        if kind == 'unterminated':
+            raise TsqlSyntaxError(f"닫히지 않은 문자열 리터럴: {m.group(0)[:60]!r}")
+        return m.group(0)
+
+    stmt = _TOKEN_RE.sub(replace, sql.strip())
+    stmt = stmt.rstrip(' ;')
+    return stmt + ';'
+
+
+class Binary(str):
+    """0x 바이너리 리터럴 (16진수 문자열, 0x 제외)"""
+    __slots__ = ()
+
+
+class Cast(namedtuple('Cast', 'value type')):
+    """CAST(N'...' AS 타입) 값 (type 은 소문자 T-SQL 타입명)"""
+    __slots__ = ()
+
+
+InsertStatement = namedtuple('InsertStatement', 'table columns values')
+
+_HEADER_RE = re.compile(
+    r"\s*(?i:INSERT)\s+(?:(?i:INTO)\s+)?(?:(?:\[dbo\]|(?i:dbo))\.)?(?P<table>" + _IDENT + r"|\w+)"
+    r"\s*\((?P<columns>[^()]*)\)\s*(?i:VALUES)\s*\(")
+_COLUMN_RE = re.compile(_IDENT + r"|\w+")
+_VALUE_RE = re.compile(r"""
+    \s*(?:
+        N?(?P<string>""" + _STRING + r""")
+      | """ + _CAST + r"""
+      | 0[xX](?P<binary>[0-9A-Fa-f]*)
+      | (?P<number>""" + _NUMBER + r""")
+      | (?P<null>(?i:NULL))
+    )\s*(?P<sep>[,)])
+""", re.VERBOSE | re.DOTALL)
+
+
+def _unquote(literal):
+    return literal[1:-1].replace("''", "'")
+
+
+def _header_columns(header):
+    return [_unbracket(c) for c in _COLUMN_RE.findall(header.group('columns'))]
+
+
+def insert_columns(sql):
+    """INSERT 문의 컬럼 목록만 (값은 읽지 않음)"""
+    header = _HEADER_RE.match(sql)
+    if not header:
+        raise TsqlSyntaxError(f"INSERT ... VALUES 형식이 아님: {sql[:60]!r}")
+    return _header_columns(header)
+
+
+def _number(text):
+    return int(text) if text.lstrip('+-').isdigit() else Decimal(text)
+
+
+def _value(m):
+    """_VALUE_RE 매치 하나 → Python 값"""
+    if m.group('string') is not None:
+        return _unquote(m.group('string'))
+    if m.group('cast_value') is not None:
+        return Cast(_unquote(m.group('cast_value')), m.group('cast_type').lower())
+    if m.group('binary') is not None:
+        return Binary(m.group('binary'))
+    if m.group('cast_number') is not None:
+        # CAST(12.50 AS Decimal(18, 2)) 는 숫자 값 그대로
+        return _number(m.group('cast_number'))
+    if m.group('number') is not None:
+        return _number(m.group('number'))
+    return None
+
+
+def parse_insert(sql):
+    """INSERT 문을 (테이블, 컬럼 목록, 값 목록) 으로 분해
+
+    값은 None / int / Decimal / str / Binary / Cast 로 돌려준다.
+    단일 행 VALUES 만 지원 (SSMS 덤프 형식).
+    """
+    header = _HEADER_RE.match(sql)
+    if not header:
+        raise TsqlSyntaxError(f"INSERT ... VALUES 형식이 아님: {sql[:60]!r}")
+    table = _unbracket(header.group('table'))
+    columns = _header_columns(header)
+
+    values = []
+    pos = header.end()
+    while True:
+        m = _VALUE_RE.match(sql, pos)
+        if not m:
+            raise TsqlSyntaxError(f"값을 해석할 수 없음 ({table}): {sql[pos:pos + 60]!r}")
+        values.append(_value(m))
+        pos = m.end()
+        if m.group('sep') == ')':
+            break
+
+    if len(values) != len(columns):
+        raise TsqlSyntaxError(f"컬럼 {len(columns)}개, 값 {len(values)}개 ({table})")
+    return InsertStatement(table, columns, values)
+
+
+def insert_key(sql, column):
+    """INSERT 문에서 column 값 하나만 읽음 (그 앞의 값까지만 파싱)
+
+    IDENTITY 컬럼처럼 앞쪽 컬럼이면 서명 이미지 같은 큰 값은 건드리지 않는다.
+    """
+    header = _HEADER_RE.match(sql)
+    if not header:
+        raise TsqlSyntaxError(f"INSERT ... VALUES 형식이 아님: {sql[:60]!r}")
+    columns = _header_columns(header)
+    if column not in columns:
+        raise TsqlSyntaxError(f"컬럼 {column} 이 없음: {sql[:60]!r}")
+    pos = header.end()
+    for _ in range(columns.index(column) + 1):
+        m = _VALUE_RE.match(sql, pos)
+        if not m:
+            raise TsqlSyntaxError(f"값을 해석할 수 없음: {sql[pos:pos + 60]!r}")
+        pos = m.end()
+    return _value(m)
+
+
+def insert_values(sql, wanted):
+    """INSERT 문에서 wanted 컬럼들의 값만 {컬럼: 값} 으로 (가장 뒤 컬럼까지만 파싱)
+
+    INSERT 에 없는 컬럼은 결과에 넣지 않는다.
+    """
+    header = _HEADER_RE.match(sql)
+    if not header:
+        raise TsqlSyntaxError(f"INSERT ... VALUES 형식이 아님: {sql[:60]!r}")
+    columns = _header_columns(header)
+    stop = max((i for i, c in enumerate(columns) if c in wanted), default=-1)
+    values = {}
+    pos = header.end()
+    for column in columns[:stop + 1]:
+        m = _VALUE_RE.match(sql, pos)
+        if not m:
+            raise TsqlSyntaxError(f"값을 해석할 수 없음: {sql[pos:pos + 60]!r}")
+        if column in wanted:
+            values[column] = _value(m)
+        pos = m.end()
+    return values
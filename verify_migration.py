@@ -0,0 +1,576 @@
+#!/usr/bin/env python3
+"""원본 덤프와 변환 결과(또는 적재된 PostgreSQL)를 테이블별로 대조
+
+양쪽을 한 번씩 스트리밍하면서 테이블마다
+- 행 수
+- 행 다이제스트의 합 (mod 2^128, 행 순서와 무관)
+- PK 를 BUCKETS 개로 나눈 버킷별 다이제스트 합
+만 모은다 (메모리는 테이블 수 × 버킷 수로 일정). 다이제스트는 덤프 DDL 의
+컬럼 타입대로 정규화한 값으로 계산하므로 INSERT / insert-batch / COPY 출력,
+적재된 DB 어느 쪽과도 비교할 수 있다 (timestamp 는 마이크로초로 반올림,
+bit ↔ boolean, bytea 는 소문자 16진수). Prisma 에서 String 인 varbinary 컬럼은
+변환 결과 쪽 값을 base64 로 보고 풀어서 비교한다 (bytea 로 써 있어도 됨).
+
+합이 다른 테이블은 버킷 합이 다른 버킷의 행만 두 번째로 읽어 누락/추가/다른
+행을 PK 로 찾아 보여 준다.
+
+사용법:
+  python verify_migration.py [덤프] FoodieMatch/final_tbm_data.sql
+  python verify_migration.py [덤프] --dsn postgresql://... [--report verify.json]
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+try:
+    import psycopg2
+except ImportError:  # 파일끼리만 비교할 때는 없어도 됨
+    psycopg2 = None
+
+from final_sql_convert import target_tables
+from prisma_mapping import PRISMA_SCHEMA, IdentifierMap, load_text_binaries
+from sql_dump_reader import iter_lines, iter_statements
+from sql_table_writer import LOAD_ORDER
+from tbm_schema import DumpSchema, decode_row
+from tsql_lexer import parse_insert, quote_ident, statement_table
+
+BUCKETS = 256
+SHOW_ROWS = 20  # 테이블마다 보여 줄 차이 행 수
+
+_DIGEST_MOD = 1 << 128
+
+_COPY_RE = re.compile(r'COPY\s+(?P<table>"(?:[^"]|"")*"|\w+)\s*\((?P<columns>[^()]*)\)\s*FROM\s+(?i:stdin)',
+                      re.IGNORECASE)
+_PG_INSERT_RE = re.compile(
+    r'\s*INSERT\s+INTO\s+(?P<table>"(?:[^"]|"")*"|\w+)\s*\((?P<columns>[^()]*)\)\s*VALUES\s*',
+    re.IGNORECASE)
+_PG_IDENT_RE = re.compile(r'"((?:[^"]|"")*)"|(\w+)')
+_PG_VALUE_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*(?:''[^']*)*')(?:::\w+)?
+      | 0[xX](?P<binary>[0-9A-Fa-f]*)
+      | (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<bool>(?i:TRUE|FALSE))
+      | (?P<null>(?i:NULL))
+      | (?P<call>\w+\((?:[^()']|'[^']*(?:''[^']*)*')*\)(?:::\w+)?)
+    )\s*(?P<sep>[,)])
+""", re.VERBOSE | re.DOTALL)
+_ROW_SEP_RE = re.compile(r'\s*,\s*\(')
+_COPY_UNESCAPE_RE = re.compile(r'\\(.)')
+_COPY_UNESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v'}
+
+
+class VerifyError(ValueError):
+    """비교 대상을 읽을 수 없는 경우 (모르는 형식, DDL 에 없는 컬럼 등)"""
+
+
+def _round_fraction(text):
+    """'05:20:03.2400005' → ('05:20:03', 마이크로초) (7자리 이상은 반올림)"""
+    base, _, fraction = text.partition('.')
+    if not fraction:
+        return base, 0
+    return base, int((Decimal('0.' + fraction) * 1000000).to_integral_value())
+
+
+def _canonical_timestamp(value):
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat(' ')
+    text = value.strip().replace('T', ' ', 1)
+    base, micros = _round_fraction(text)
+    try:
+        return (datetime.fromisoformat(base) + timedelta(microseconds=micros)).isoformat(' ')
+    except ValueError:
+        return text
+
+
+def _canonical_timestamptz(value):
+    if isinstance(value, str):
+        text = value.strip().replace('T', ' ', 1)
+        zone = re.search(r'(Z|[+-]\d\d(?::?\d\d)?)$', text)
+        suffix = zone.group(1) if zone else ''
+        base, micros = _round_fraction(text[:len(text) - len(suffix)].strip())
+        if suffix == 'Z':
+            suffix = '+00:00'
+        elif len(suffix) == 3:
+            suffix += ':00'
+        try:
+            value = datetime.fromisoformat(base + suffix) + timedelta(microseconds=micros)
+        except ValueError:
+            return text
+    if value.tzinfo is not None:
+        value = value - value.utcoffset()
+    return value.replace(tzinfo=None).isoformat(' ')
+
+
+def _canonical_date(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return value.strip()[:10]
+
+
+def _canonical_time(value):
+    if isinstance(value, time):
+        return value.isoformat()
+    base, micros = _round_fraction(value.strip())
+    try:
+        return time.fromisoformat(base).replace(microsecond=min(micros, 999999)).isoformat()
+    except ValueError:
+        return value
+
+
+def _canonical_numeric(value):
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        return str(value)
+    return format(number.normalize(), 'f') if number else '0'
+
+
+def _canonical_boolean(value):
+    if isinstance(value, str):
+        return 't' if value.strip().lower() in ('t', 'true', '1', 'y', 'yes', 'on') else 'f'
+    return 't' if value else 'f'
+
+
+def _canonical_bytea(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    if value.startswith('\\x'):
+        value = value[2:]
+    return value.lower()
+
+
+def _canonical_base64(value):
+    # final_sql_convert 가 base64 로 쓴 Prisma String 컬럼. base64 만 받고, bytea 로
+    # 들어간 값(bytes, '\\x...')은 원본의 16진수와 다르게 남겨 다른 행으로 잡는다.
+    if not isinstance(value, str):
+        return '\\x' + bytes(value).hex()
+    try:
+        return base64.b64decode(value, validate=True).hex()
+    except (binascii.Error, ValueError):
+        return value
+
+
+CANONICAL = {
+    'integer': lambda value: str(int(value)),
+    'numeric': _canonical_numeric,
+    'boolean': _canonical_boolean,
+    'timestamp': _canonical_timestamp,
+    'timestamptz': _canonical_timestamptz,
+    'date': _canonical_date,
+    'time': _canonical_time,
+    'bytea': _canonical_bytea,
+    'base64': _canonical_base64,
+    'text': str,
+}
+
+
+class TableCanon:
+    """테이블 하나의 컬럼 순서/종류 (이름 → 위치는 대소문자 무시)"""
+
+    def __init__(self, table_def, text_columns=()):
+        self.table_def = table_def
+        self.table = table_def.name
+        self.columns = [c.name for c in table_def.columns]
+        self.kinds = ['base64' if c.name in text_columns else c.kind for c in table_def.columns]
+        self.positions = {name.lower(): i for i, name in enumerate(self.columns)}
+        pk = table_def.primary_key
+        self.key = self.positions[pk[0].lower()] if len(pk) == 1 and pk[0].lower() in self.positions else None
+
+    def layout(self, columns):
+        """출력 쪽 컬럼 목록 → DDL 위치 목록"""
+        try:
+            return [self.positions[c.lower()] for c in columns]
+        except KeyError as e:
+            raise VerifyError(f"{self.table} 에 없는 컬럼: {e.args[0]}") from None
+
+    def canonical(self, layout, values):
+        """값 목록(layout 순서) → DDL 순서의 정규화 문자열 목록 (NULL 은 None)"""
+        out = [None] * len(self.columns)
+        kinds = self.kinds
+        for i, value in zip(layout, values):
+            if value is not None:
+                out[i] = CANONICAL[kinds[i]](value)
+        return out
+
+
+def row_digest(values):
+    """정규화된 행의 128비트 다이제스트"""
+    h = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if value is None:
+            h.update(b'\x00')
+        else:
+            h.update(b'\x01' + value.encode('utf-8', 'surrogatepass') + b'\x1f')
+    return int.from_bytes(h.digest(), 'big')
+
+
+def row_key(canon, values, digest):
+    """행을 버킷/비교에 쓸 키 (PK 값, PK 가 없으면 다이제스트)"""
+    if canon.key is not None and values[canon.key] is not None:
+        return values[canon.key]
+    return f'#{digest:032x}'
+
+
+def bucket_of(key):
+    if key.lstrip('-').isdigit():
+        return int(key) % BUCKETS
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=4).digest(), 'big') % BUCKETS
+
+
+def iter_source_rows(path, canons):
+    """원본 덤프 → (테이블, 정규화 값 목록)"""
+    layouts = {}
+    for stmt in iter_statements(path):
+        table = statement_table(stmt)
+        canon = canons.get(table)
+        if canon is None:
+            continue
+        row = decode_row(canon.table_def, parse_insert(stmt))
+        layout = layouts.get(table)
+        if layout is None:
+            layout = layouts[table] = list(range(len(canon.columns)))
+        yield table, canon.canonical(layout, list(row))
+
+
+def _pg_ident(text):
+    m = _PG_IDENT_RE.fullmatch(text.strip())
+    if m is None:
+        raise VerifyError(f"식별자를 해석할 수 없음: {text!r}")
+    return m.group(1).replace('""', '"') if m.group(1) is not None else m.group(2)
+
+
+def _pg_columns(text):
+    return [_pg_ident(c) for c in text.split(',')]
+
+
+def _pg_value(m):
+    if m.group('string') is not None:
+        return m.group('string')[1:-1].replace("''", "'")
+    if m.group('binary') is not None:
+        # 변환되지 않은 T-SQL 0x 리터럴 (예전 스크립트 출력)
+        return m.group('binary')
+    if m.group('number') is not None:
+        return m.group('number')
+    if m.group('bool') is not None:
+        return m.group('bool').lower() == 'true'
+    if m.group('call') is not None:
+        # pg_read_binary_file('...') 등 파일 참조는 값 대신 호출문을 비교
+        return m.group('call')
+    return None
+
+
+def parse_pg_insert(sql):
+    """PostgreSQL INSERT (한 행 또는 여러 행 VALUES) → (테이블, 컬럼, [값 목록])"""
+    header = _PG_INSERT_RE.match(sql)
+    if not header:
+        raise VerifyError(f"INSERT ... VALUES 형식이 아님: {sql[:60]!r}")
+    table = _pg_ident(header.group('table'))
+    columns = _pg_columns(header.group('columns'))
+    rows = []
+    pos = header.end()
+    if sql[pos:pos + 1] != '(':
+        raise VerifyError(f"값 목록이 아님 ({table}): {sql[pos:pos + 60]!r}")
+    pos += 1
+    while True:
+        values = []
+        while True:
+            m = _PG_VALUE_RE.match(sql, pos)
+            if not m:
+                raise VerifyError(f"값을 해석할 수 없음 ({table}): {sql[pos:pos + 60]!r}")
+            values.append(_pg_value(m))
+            pos = m.end()
+            if m.group('sep') == ')':
+                break
+        rows.append(values)
+        sep = _ROW_SEP_RE.match(sql, pos)
+        if not sep:
+            return table, columns, rows
+        pos = sep.end()
+
+
+def _copy_field(field):
+    if field == '\\N':
+        return None
+    if '\\' not in field:
+        return field
+    return _COPY_UNESCAPE_RE.sub(lambda m: _COPY_UNESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def iter_output_rows(path, canons):
+    """변환 결과 파일 (INSERT / insert-batch / COPY 블록) → (테이블, 정규화 값 목록)
+
+    BEGIN/COMMIT, 주석, setval 등 행이 아닌 문장은 건너뛴다. 테이블 이름은
+    대소문자를 가리지 않는다 (convert_sql.py 처럼 Prisma 이름으로 낸 출력).
+    """
+    canons = {t.lower(): c for t, c in canons.items()}
+    copy = None  # COPY 블록 안이면 (canon, layout)
+    buf = []
+    quotes = 0
+    for line in iter_lines(path):
+        if copy is not None:
+            row = line.rstrip('\r\n')
+            if row == '\\.':
+                copy = None
+            elif copy[0] is not None:
+                canon, layout = copy
+                yield canon.table, canon.canonical(layout, [_copy_field(f) for f in row.split('\t')])
+            continue
+        if not buf:
+            head = line.lstrip()[:12].upper()
+            if head.startswith('COPY '):
+                m = _COPY_RE.match(line.lstrip())
+                if not m:
+                    raise VerifyError(f"COPY 머리를 해석할 수 없음: {line[:60]!r}")
+                canon = canons.get(_pg_ident(m.group('table')).lower())
+                copy = (canon, canon.layout(_pg_columns(m.group('columns'))) if canon else None)
+                continue
+            if not head.startswith('INSERT'):
+                continue
+        buf.append(line)
+        quotes += line.count("'")
+        if quotes % 2 or not line.rstrip().endswith(';'):
+            continue
+        table, columns, rows = parse_pg_insert(''.join(buf))
+        buf = []
+        quotes = 0
+        canon = canons.get(table.lower())
+        if canon is None:
+            continue
+        layout = canon.layout(columns)
+        for values in rows:
+            yield canon.table, canon.canonical(layout, values)
+    if buf:
+        raise VerifyError(f"끝나지 않은 INSERT 문: {''.join(buf)[:60]!r}")
+
+
+def iter_database_rows(dsn, canons, names=None, batch_rows=5000):
+    """적재된 PostgreSQL 테이블 → (테이블, 정규화 값 목록) (서버 쪽 커서로 스트리밍)
+
+    names 는 prisma_mapping 의 ResolvedNames (없으면 덤프 이름 그대로).
+    """
+    conn = psycopg2.connect(dsn)
+    try:
+        for table, canon in canons.items():
+            if names is not None and table in names.tables:
+                target = names.tables[table]
+                cols = ', '.join(names.columns[table].get(c, quote_ident(c)) for c in canon.columns)
+            else:
+                target = quote_ident(table)
+                cols = ', '.join(quote_ident(c) for c in canon.columns)
+            layout = list(range(len(canon.columns)))
+            with conn.cursor(name=f'verify_{table.lower()}') as cur:
+                cur.itersize = batch_rows
+                cur.execute(f'SELECT {cols} FROM {target}')
+                for values in cur:
+                    yield table, canon.canonical(layout, values)
+    finally:
+        conn.close()
+
+
+class TableSummary:
+    """테이블 하나의 행 수, 다이제스트 합, 버킷별 다이제스트 합"""
+
+    __slots__ = ('rows', 'digest', 'buckets')
+
+    def __init__(self):
+        self.rows = 0
+        self.digest = 0
+        self.buckets = [0] * BUCKETS
+
+
+def summarize(rows, canons):
+    """(테이블, 값 목록) 스트림 → {테이블: TableSummary}"""
+    summaries = {table: TableSummary() for table in canons}
+    for table, values in rows:
+        digest = row_digest(values)
+        s = summaries[table]
+        s.rows += 1
+        s.digest = (s.digest + digest) % _DIGEST_MOD
+        b = bucket_of(row_key(canons[table], values, digest))
+        s.buckets[b] = (s.buckets[b] + digest) % _DIGEST_MOD
+    return summaries
+
+
+def collect(rows, canons, wanted):
+    """버킷이 다른 행만 {테이블: {키: [다이제스트, ...]}} 로 모음 (두 번째 읽기)"""
+    found = {table: {} for table in wanted}
+    for table, values in rows:
+        buckets = wanted.get(table)
+        if buckets is None:
+            continue
+        digest = row_digest(values)
+        key = row_key(canons[table], values, digest)
+        if bucket_of(key) in buckets:
+            found[table].setdefault(key, []).append(digest)
+    return found
+
+
+def diff_rows(source, target):
+    """{키: [다이제스트]} 두 개 → (누락 키, 추가 키, 다른 키)"""
+    missing, extra, changed = [], [], []
+    for key in source.keys() | target.keys():
+        a = sorted(source.get(key, ()))
+        b = sorted(target.get(key, ()))
+        if a == b:
+            continue
+        if not b:
+            missing.append(key)
+        elif not a:
+            extra.append(key)
+        else:
+            changed.append(key)
+    order = lambda k: (not k.lstrip('-').isdigit(), int(k) if k.lstrip('-').isdigit() else 0, k)
+    return sorted(missing, key=order), sorted(extra, key=order), sorted(changed, key=order)
+
+
+class Side:
+    """비교 대상 하나 (원본 덤프 / 변환 결과 파일 / DB) — 워커 프로세스로 넘길 수 있음"""
+
+    def __init__(self, kind, location, canons, names=None):
+        self.kind = kind
+        self.location = location
+        self.canons = canons
+        self.names = names
+
+    def rows(self):
+        if self.kind == 'source':
+            return iter_source_rows(self.location, self.canons)
+        if self.kind == 'output':
+            return iter_output_rows(self.location, self.canons)
+        return iter_database_rows(self.location, self.canons, self.names)
+
+    def summarize(self):
+        return summarize(self.rows(), self.canons)
+
+    def collect(self, wanted):
+        return collect(self.rows(), self.canons, wanted)
+
+
+def _run(side, method, *args):
+    return getattr(side, method)(*args)
+
+
+def run_both(source, target, method, *args, jobs=2):
+    """양쪽을 동시에 읽음 (jobs=1 이면 차례로)"""
+    if jobs <= 1:
+        return _run(source, method, *args), _run(target, method, *args)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        a = pool.submit(_run, source, method, *args)
+        b = pool.submit(_run, target, method, *args)
+        return a.result(), b.result()
+
+
+def build_canons(schema, tables, text_binary=None):
+    """테이블별 TableCanon (text_binary 의 컬럼은 base64 로 읽음: 변환 결과/DB 쪽)"""
+    text_binary = text_binary or {}
+    canons = {}
+    for table in tables:
+        table_def = schema.tables.get(table)
+        if table_def is None:
+            continue
+        canons[table] = TableCanon(table_def, text_binary.get(table, ()))
+    return canons
+
+
+def verify(source, target, canons, jobs=2, show=SHOW_ROWS):
+    """두 대상을 비교해 테이블별 결과 dict 목록을 돌려줌"""
+    src, dst = run_both(source, target, 'summarize', jobs=jobs)
+    results = {}
+    wanted = {}
+    for table in canons:
+        a, b = src[table], dst[table]
+        results[table] = {'table': table, 'source_rows': a.rows, 'target_rows': b.rows,
+                          'source_hash': f'{a.digest:032x}', 'target_hash': f'{b.digest:032x}',
+                          'match': a.rows == b.rows and a.digest == b.digest}
+        if not results[table]['match']:
+            wanted[table] = {i for i in range(BUCKETS) if a.buckets[i] != b.buckets[i]}
+
+    if wanted:
+        # 버킷 합이 다른 행만 다시 읽어 PK 단위로 비교
+        found_src, found_dst = run_both(source, target, 'collect', wanted, jobs=jobs)
+        for table in wanted:
+            missing, extra, changed = diff_rows(found_src[table], found_dst[table])
+            key = canons[table].columns[canons[table].key] if canons[table].key is not None else None
+            results[table].update({'key': key, 'missing': len(missing), 'extra': len(extra),
+                                   'changed': len(changed), 'missing_keys': missing[:show],
+                                   'extra_keys': extra[:show], 'changed_keys': changed[:show]})
+    return [results[t] for t in canons]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='원본 덤프 ↔ 변환 결과/PostgreSQL 대조 검증')
+    parser.add_argument('source', nargs='?', default='attached_assets/script1_1760403229620.sql',
+                        help='원본 SQL Server 덤프')
+    parser.add_argument('output', nargs='?', help='변환 결과 파일 (INSERT / insert-batch / COPY)')
+    parser.add_argument('--dsn', help='변환 결과 대신 이 PostgreSQL 의 테이블과 비교')
+    parser.add_argument('--prisma-schema', default=PRISMA_SCHEMA,
+                        help='--dsn 의 테이블/컬럼 이름(@@map/@map)과 base64 로 들어간 String 컬럼을 알아낼 schema.prisma')
+    parser.add_argument('-j', '--jobs', type=int, default=2, help='1 이면 양쪽을 차례로 읽음')
+    parser.add_argument('--show', type=int, default=SHOW_ROWS, help='테이블마다 보여 줄 차이 행 수')
+    parser.add_argument('--report', metavar='FILE', help='결과를 JSON 으로 저장')
+    args = parser.parse_args()
+
+    if args.dsn:
+        if psycopg2 is None:
+            parser.error('psycopg2 가 필요합니다: pip install psycopg2-binary')
+    elif not args.output:
+        parser.error('변환 결과 파일 또는 --dsn 이 필요합니다')
+
+    schema = DumpSchema.scan(args.source)
+    tables = [t for t in LOAD_ORDER if t in target_tables]
+    canons = build_canons(schema, tables)
+    missing_ddl = [t for t in tables if t not in canons]
+    if missing_ddl:
+        print(f"⚠️  덤프에 CREATE TABLE 이 없어 건너뜀: {', '.join(missing_ddl)}")
+
+    source = Side('source', args.source, canons)
+    # 변환 결과/DB 쪽은 Prisma String 인 varbinary 를 base64 로 읽음
+    target_canons = build_canons(schema, tables, load_text_binaries(schema, args.prisma_schema))
+    if args.dsn:
+        names = None
+        if os.path.exists(args.prisma_schema):
+            names = IdentifierMap.load(args.prisma_schema).resolve(schema)
+        target = Side('database', args.dsn, target_canons, names)
+    else:
+        target = Side('output', args.output, target_canons)
+    try:
+        results = verify(source, target, canons, args.jobs, args.show)
+    except VerifyError as e:
+        sys.exit(f"❌ {e}")
+
+    label = args.dsn and 'PostgreSQL' or args.output
+    print(f"📊 검증: {args.source} ↔ {label}")
+    bad = 0
+    for r in results:
+        if r['match']:
+            print(f"   ✅ {r['table']}: {r['source_rows']}개 일치")
+            continue
+        bad += 1
+        print(f"   ❌ {r['table']}: 원본 {r['source_rows']}개 / 대상 {r['target_rows']}개 "
+              f"(누락 {r['missing']}, 추가 {r['extra']}, 다름 {r['changed']})")
+        for field, what in (('missing_keys', '누락'), ('extra_keys', '추가'), ('changed_keys', '다름')):
+            for key in r[field]:
+                print(f"      - {what} {r['key'] or '행'}={key}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'source': args.source, 'target': label, 'tables': results}, f,
+                      ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    if bad:
+        sys.exit(f"❌ {bad}개 테이블 불일치")
+    print("✅ 모든 테이블 일치")
+
+
+if __name__ == '__main__':
+    main()